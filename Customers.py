@@ -1,12 +1,39 @@
-from stateMachine import *
-from Dealership import *
+from __future__ import print_function
 
-from GameEntity import *
-import pygame
-from pygame.locals import *
+from stateMachine import State
 
-from helpers import *
-from random import randint
+from GameEntity import GameEntity
+from random import random
+
+class StateModel(object):
+    """
+    Chances of each move a customer makes when they think, and how many 
+    seconds they stay before an idle customer walks out.  The defaults are 
+    the original dice rolls.  A dealership's customers all share its 
+    state_model, which calibration.py fits to what a real showroom sees.
+    """
+    def __init__(self, idle_to_shopping=0.5, shopping_to_idle=0.2,
+                 shopping_engage=0.4, engaged_exit=0.5, time_limit=10,
+                 preferred_bonus=0.2):
+        self.idle_to_shopping = idle_to_shopping # randint(0, 1) == 1
+        self.shopping_to_idle = shopping_to_idle # randint(0, 4) == 0
+        self.shopping_engage = shopping_engage   # randint(0, 4) > 2
+        self.engaged_exit = engaged_exit         # randint(0, 1) == 1
+        self.time_limit = time_limit
+        # Extra chance to engage when the salesperson is the one they like
+        #  (randint(0, 4) == 2).  The analytic model leaves it out
+        self.preferred_bonus = preferred_bonus
+
+    def key(self):
+        return (self.idle_to_shopping, self.shopping_to_idle,
+                self.shopping_engage, self.engaged_exit, self.time_limit,
+                self.preferred_bonus)
+
+    def __repr__(self):
+        return ("StateModel(idle_to_shopping=%.3f, shopping_to_idle=%.3f, "
+                "shopping_engage=%.3f, engaged_exit=%.3f, time_limit=%d)" %
+                (self.idle_to_shopping, self.shopping_to_idle,
+                 self.shopping_engage, self.engaged_exit, self.time_limit))
 
 class newVehicleCustomer(GameEntity):
     """
@@ -21,12 +48,20 @@ class newVehicleCustomer(GameEntity):
                                #  customer
         self.near_by_sp = None # Tracks to see if there are any near by sales 
                                #  people ready
+        self.was_helped = False # Set once a salesperson has engaged them
+        self.engaged_time = 0.0 # Seconds spent engaged with salespeople
+        self.engaged_since = None # When the current engagement started
+        self.approached_by = None # The salesperson walking up to them, if any
+        self.preferences = None # What they would buy (an inventory.Preferences)
+        self.candidates = None # Rows of the dealership inventory that fit
+        self.helped_by = None # The last salesperson they engaged with
+        self.contact = None # Their crm.Contact once they have left before
+        self.needs = None # What a salesperson must be able to do for them (see routing)
         
         self.actions_per_second = 1 # Every 1 seconds actions are done
         self.last_action_time = 0        
         
         self.entered_store = self.dealership.elapsedTime
-        self.timeLimit = 10        
         
         self.previous_action = None
         
@@ -42,6 +77,43 @@ class newVehicleCustomer(GameEntity):
         self.brain.add_state(self.engaged_state)
         self.brain.add_state(self.left_state)
         
+    def reset(self):
+        # Clears everything about the last visit so a recycled customer can 
+        #  walk in as someone new (see customerPool).  The brain and its 
+        #  states are kept, they only point back at this customer
+        self.id = 0
+        self.preferred_sp = None
+        self.engaged_sp = None
+        self.near_by_sp = None
+        self.was_helped = False
+        self.engaged_time = 0.0
+        self.engaged_since = None
+        self.approached_by = None
+        self.preferences = None
+        self.candidates = None
+        self.helped_by = None
+        self.contact = None
+        self.needs = None
+        self.last_action_time = 0
+        self.entered_store = self.dealership.elapsedTime
+        self.previous_action = None
+        self.tp = 0
+        self.position = None
+        self.destination = None
+        self.brain.active_state = None
+        
+    def waiting(self):
+        # Free for any salesperson to walk up to
+        state = self.brain.active_state
+        return (state is not None and state.name in ("shopping", "idle")
+                and self.near_by_sp is None and self.approached_by is None)
+        
+    def look_up_vehicles(self):
+        # Finds the vehicles on the lot that fit what the customer wants
+        inventory = self.dealership.inventory
+        if inventory is not None and self.preferences is not None:
+            self.candidates = inventory.match(self.preferences)
+        
     def activity_check(self):
         # this function checks to see if the customer can move yet
         return self.dealership.elapsedTime - self.last_action_time > 1/self.actions_per_second        
@@ -61,17 +133,19 @@ class customer_idle(State):
         can_move = self.customer.activity_check()
         if can_move:
             # This means that the customer has not acted within the last 2 seconds
-            action_roll = randint(0, 1)
-            if action_roll == 1:
+            model = self.customer.dealership.state_model
+            action_roll = random()
+            if action_roll >= 1 - model.idle_to_shopping:
                 return "shopping"
-            elif self.customer.dealership.elapsedTime - self.customer.entered_store > self.customer.timeLimit:
+            elif self.customer.dealership.elapsedTime - self.customer.entered_store > model.time_limit:
                 return "left"
             
     def exit_actions(self): # Required
         self.previous_action = "idle"
     
     def entry_actions(self):  # Required
-        print "Customer", self.customer.id, "is now idle"
+        self.customer.destination = None # Stops to think where they are
+        print("Customer", self.customer.id, "is now idle")
 
             
 class customer_shopping(State):
@@ -80,13 +154,14 @@ class customer_shopping(State):
         self.customer = customer
     
     def find_near_by_sp(self):
-        # This checks to see if there are any salespeople near by ready to help
+        # This checks to see if there are any salespeople near by ready to help.
+        #  Only the salesperson that came over for this customer counts, so 
+        #  there is no need to look through the whole sales floor
         near_by_sp = None
-        for salesPerson in self.customer.dealership.salesPeople.values():
-            if salesPerson.helping_customer != None:
-                if salesPerson.helping_customer.id == self.customer.id:
-                    # There is a salesperson near by
-                    near_by_sp = salesPerson
+        salesPerson = self.customer.approached_by
+        if salesPerson is not None and salesPerson.reached(self.customer):
+            # There is a salesperson near by
+            near_by_sp = salesPerson
         # Save result of search
         self.customer.near_by_sp = near_by_sp
 
@@ -100,15 +175,20 @@ class customer_shopping(State):
         can_move = self.customer.activity_check()
         if can_move:
             # This means that the customer has not acted within the last 2 seconds            
-            action_roll = randint(0, 4)
+            model = self.customer.dealership.state_model
+            action_roll = random()
             self.find_near_by_sp() # Find any near by Salespeople
             
+            # The roll's range is split into bands: idle at the bottom, 
+            #  engaging at the top and the preferred salesperson bonus just 
+            #  below it
+            engage_from = 1 - model.shopping_engage
             #print self.customer.id, "Customer shopping", action_roll, "near by Salesperson", self.customer.near_by_sp.id
-            if action_roll == 0:
+            if action_roll < model.shopping_to_idle:
                 return "idle"
-            elif action_roll > 2 and self.customer.near_by_sp != None:
+            elif action_roll >= engage_from and self.customer.near_by_sp != None:
                 return "engaged"
-            elif (action_roll == 2 
+            elif (engage_from - model.preferred_bonus <= action_roll < engage_from
                 and self.customer.near_by_sp == self.customer.preferred_sp 
                 and self.customer.near_by_sp != None):
                 # This is the extra bonus for having the preferred SP around
@@ -118,7 +198,9 @@ class customer_shopping(State):
         self.customer.previous_action = "shopping"
     
     def entry_actions(self): # Required
-        print "Customer", self.customer.id, "is now shopping"
+        self.customer.head_to("vehicles")
+        self.customer.look_up_vehicles()
+        print("Customer", self.customer.id, "is now shopping")
   
   
 class customer_engaged_with_sp(State):
@@ -134,8 +216,8 @@ class customer_engaged_with_sp(State):
         #  presently doing.
         can_move = self.customer.activity_check()
         if can_move:
-            action_roll = randint(0, 1)
-            if action_roll == 1:
+            action_roll = random()
+            if action_roll >= 1 - self.customer.dealership.state_model.engaged_exit:
                 # The salesperson didn't help the customer find what they were 
                 #  looking for. 
                 self.customer.near_by_sp = None
@@ -144,15 +226,24 @@ class customer_engaged_with_sp(State):
             
     def exit_actions(self): # Required
         self.previous_action = "engaged"
+        customer = self.customer
+        customer.engaged_time += customer.dealership.elapsedTime - customer.engaged_since
+        customer.engaged_since = None
     
     def entry_actions(self): # Required
+        self.customer.engaged_since = self.customer.dealership.elapsedTime
         self.customer.engaged_sp = self.customer.near_by_sp
-        print "Customer", self.customer.id, "is now engaged with salesperson", self.customer.engaged_sp.id
+        self.customer.helped_by = self.customer.engaged_sp
+        self.customer.destination = None
+        if not self.customer.was_helped:
+            self.customer.was_helped = True
+            self.customer.dealership.record_wait(self.customer)
+        print("Customer", self.customer.id, "is now engaged with salesperson", self.customer.engaged_sp.id)
    
    
 class customer_left(State):
-    # Customer left the store.  They stay in the dealer's CRM and in the future
-    #  can return (Not yet implemented)
+    # Customer left the store.  They stay in the dealer's CRM and may come 
+    #  back for another visit (see crm.Crm)
     def __init__(self, customer):
         State.__init__(self, "left")
         self.customer = customer
@@ -167,6 +258,9 @@ class customer_left(State):
         pass
     
     def entry_actions(self): # Required
-        print "Customer", self.customer.id, "has left the dealership"
+        print("Customer", self.customer.id, "has left the dealership")
+        if not self.customer.was_helped:
+            self.customer.dealership.record_abandon(self.customer)
+        self.customer.dealership.record_visit(self.customer)
         self.customer.dealership.remove_customer(self.customer)    
     
\ No newline at end of file
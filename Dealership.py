@@ -4,22 +4,22 @@ Created on Sat May 28 10:59:14 2016
 
 @author: DavidCreech
 """
-import os, sys
-import pygame
+from __future__ import print_function
 
-from pygame.locals import *
-from helpers import *
-from Customers import *
-from SalesPerson import *
+from Customers import newVehicleCustomer, StateModel
+from SalesPerson import newVehicleSalesPerson
+from spatialHash import SpatialHash
 
-from random import randint
+from random import random
+import heapq
+
+DAY = 24 * 60 * 60 # Simulated seconds in a day
 
 class Dealership(object): # Class that stores basically EVERYTHING!
 
-    def __init__(self):
+    def __init__(self, salesPeople_count=1, customer_count=1, floor=None):
 
 
-        self.clock = pygame.time.Clock()
         self.elapsedTime = 0.0
         self.waitTime = 1
         
@@ -30,10 +30,44 @@ class Dealership(object): # Class that stores basically EVERYTHING!
         # Customers that have left the dealership
         self.left_customers = {}
         self.left_customer_id = 0
+        
+        # The showroom floor (a flowField.FloorPlan).  When set, everyone has a
+        #  position and walks around it, otherwise the dealership has no 
+        #  spatial model and salespeople reach customers instantly
+        self.floor = floor
+        
+        # With a floor, customers waiting for a salesperson and idle 
+        #  salespeople are kept in spatial hashes so "who is near" doesn't 
+        #  look at everyone in the building.  reach is how many cells away a 
+        #  salesperson will go after a customer
+        self.waiting_hash = None
+        self.idle_hash = None
+        self.reach = 6
+        
+        # Vehicles on the lot (an inventory.Inventory).  When set, every 
+        #  customer walks in with preferences and shops for what matches them
+        self.inventory = None
+        
+        # Sends free salespeople to the waiting customer their skills suit 
+        #  best (a routing.Router).  None leaves it to find_customer
+        self.router = None
+        
+        # The CRM (a crm.Crm) remembers customers who leave and brings some of
+        #  them back for another visit.  None means nobody ever comes back
+        self.crm = None
+        
+        # The dealer group's link to its other stores (a network.StoreLink), 
+        #  told about everyone who walks out so they can cross-shop
+        self.network = None
+        
+        # When set, customers come from and go back to a CustomerPool instead
+        #  of being created on arrival and kept in left_customers
+        self.customer_pool = None
 
         self.idle = 0
         self.shopping = 0
         self.engaged = 0
+        self.waiting = 0 # Customers no salesperson is with or going to
         
 
         # Each sales person is given a unique ID so that the program can find it
@@ -42,6 +76,47 @@ class Dealership(object): # Class that stores basically EVERYTHING!
         
         
         self.last_customer_time = 0
+        self.arrival_chance = 0.2 # Chance each second that a customer walks in
+        
+        # How customers behave once they are in (see Customers.StateModel)
+        self.state_model = StateModel()
+        
+        # When set (e.g. a traceArrivals.TraceArrivals), walk-ins come from 
+        #  its due(time) instead of rolling against arrival_chance
+        self.arrival_source = None
+        
+        # Hours the showroom is open as (opening, closing) seconds after 
+        #  midnight.  None keeps the doors open around the clock
+        self.open_hours = None
+        
+        # How many people are on the floor when the game starts.  A shift 
+        #  scheduler starts with no one and clocks salespeople in itself
+        self.salesPeople_count = salesPeople_count
+        self.customer_count = customer_count
+        
+        # Scheduled events are kept in a heap of (time, event_id, action, args)
+        #  so the next one due is always at the front.  The event_id breaks 
+        #  ties so that events due at the same time run in the order they 
+        #  were scheduled
+        self.events = []
+        self.event_id = 0
+        
+        # How long customers waited before a salesperson engaged them
+        self.wait_times = []
+        self.served = 0
+        self.abandoned = 0
+        
+        # (seconds in the store, was helped, seconds engaged) for every 
+        #  visit, kept only when this is set to a list (see calibration)
+        self.visit_log = None
+        
+        # Salespeople seen busy / working, summed every time agents act
+        self.busy_samples = 0
+        self.staff_samples = 0
+        
+        # Scheduled events run plus agents that have thought, for watching 
+        #  how fast a run goes (see metricsServer)
+        self.events_handled = 0
         
         self.new_game()
         # 
@@ -58,34 +133,70 @@ class Dealership(object): # Class that stores basically EVERYTHING!
         self.salesPeople = {}
         self.salesPerson_id = 0
         
+        if self.floor is not None:
+            self.waiting_hash = SpatialHash(self.floor)
+            self.idle_hash = SpatialHash(self.floor)
+        
+        self.events = []
+        self.event_id = 0
+        
+        self.wait_times = []
+        self.served = 0
+        self.abandoned = 0
+        
         self.start_game()
     
     def start_game(self):
         # Start game
         # Start by generating all of the Salespeople and customers
-        salesPeople_count = 1
-        customer_count = 1
+        salesPeople_count = self.salesPeople_count
+        customer_count = self.customer_count
 
-        for salesPeople_no in xrange(salesPeople_count):
+        for salesPeople_no in range(salesPeople_count):
             new_sp = newVehicleSalesPerson(self, "image")
             new_sp.brain.set_state("idle")
             self.add_salesPerson(new_sp)
        
-        for customer_no in xrange(customer_count):
-            new_customer = newVehicleCustomer(self, "image")
+        for customer_no in range(customer_count):
+            new_customer = self.new_customer()
             new_customer.brain.set_state("shopping")
             self.add_customer(new_customer)
    
+    def new_customer(self):
+        if self.customer_pool is not None:
+            return self.customer_pool.acquire()
+        return newVehicleCustomer(self, "image")
+   
     def add_customer(self, customer): # Used to add customers
         self.customers[self.customer_id] = customer
         customer.id = self.customer_id
-        print "Customer", customer.id, "walked into the dealership"
+        if self.inventory is not None:
+            if customer.preferences is None: # Returning customers know already
+                customer.preferences = self.inventory.random_preferences()
+            customer.look_up_vehicles()
+        if self.floor is not None:
+            customer.position = self.floor.pick("door")
+        self.update_waiting(customer)
+        print("Customer", customer.id, "walked into the dealership")
         self.customer_id += 1
+        if self.idle_hash is not None and self.router is None and customer.waiting():
+            # The closest free salesperson comes over to greet them
+            salesPerson = self.nearest_idle_salesPerson(customer.position)
+            if salesPerson is not None:
+                salesPerson.greet(customer)
        
     def remove_customer(self, customer): #function for removing customers
-        self.left_customers[self.left_customer_id] = customer
+        if self.crm is not None:
+            self.crm.remember(customer)
+        if self.network is not None:
+            self.network.departed(customer)
+        if self.customer_pool is not None:
+            self.customer_pool.release(customer)
+        else:
+            self.left_customers[self.left_customer_id] = customer
         self.left_customer_id += 1
         del self.customers[customer.id]
+        self.update_waiting(customer)
   
     def get_customer(self, customer_id):
         out_customer = None
@@ -99,48 +210,173 @@ class Dealership(object): # Class that stores basically EVERYTHING!
     def add_salesPerson(self, salesPerson): # Used to add customers 
         self.salesPeople[self.salesPerson_id] = salesPerson
         salesPerson.id = self.salesPerson_id
+        if self.floor is not None:
+            salesPerson.position = self.floor.pick("desks")
+            self.moved(salesPerson)
         self.salesPerson_id += 1
        
     def remove_salesPerson(self, salesPerson): #function for removing customers
         del self.salesPeople[salesPerson.id]     
+        if self.idle_hash is not None:
+            self.idle_hash.remove(salesPerson)
+        if self.router is not None:
+            self.router.clock_out(salesPerson)
+        
+    def moved(self, agent):
+        # Keeps the spatial hashes and router in step with an agent's 
+        #  position and state
+        if self.waiting_hash is None and self.router is None:
+            return
+        if agent.name == "Customer":
+            self.update_waiting(agent)
+        elif self.idle_hash is not None:
+            self.idle_hash.move(agent)
+            
+    def update_waiting(self, customer):
+        # Called whenever a customer may have started or stopped waiting
+        if self.waiting_hash is None and self.router is None:
+            return
+        waiting = customer.waiting() and self.customers.get(customer.id) is customer
+        if self.waiting_hash is not None:
+            if waiting:
+                self.waiting_hash.update(customer)
+            else:
+                self.waiting_hash.remove(customer)
+        if self.router is not None:
+            self.router.update(customer, waiting)
+            
+    def set_idle(self, salesPerson, idle):
+        # Salespeople are only in the idle hash while they are free to help
+        if self.idle_hash is not None:
+            if idle:
+                self.idle_hash.insert(salesPerson)
+            else:
+                self.idle_hash.remove(salesPerson)
+                
+    def nearest_idle_salesPerson(self, position, max_distance=None):
+        # Closest on duty salesperson with no customer on the floor, None if 
+        #  there isn't one
+        return self.idle_hash.nearest(position, lambda salesPerson: salesPerson.on_duty,
+                                      max_distance)
+        
+    def schedule_event(self, event_time, action, *args):
+        # Runs action(*args) once the simulation reaches event_time
+        heapq.heappush(self.events, (event_time, self.event_id, action, args))
+        self.event_id += 1
+        
+    def run_events(self, time_passed):
+        # Runs every event that is due by time_passed, earliest first
+        while self.events and self.events[0][0] <= time_passed:
+            event_time, event_id, action, args = heapq.heappop(self.events)
+            action(*args)
+            self.events_handled += 1
+            
+    def is_open(self, time_passed):
+        if self.open_hours is None:
+            return True
+        opening, closing = self.open_hours
+        return opening <= time_passed % DAY < closing
+        
+    def record_wait(self, customer):
+        # Called the first time a salesperson engages the customer
+        self.wait_times.append(self.elapsedTime - customer.entered_store)
+        self.served += 1
+        
+    def record_abandon(self, customer):
+        # Called when a customer leaves without ever being engaged.  Their 
+        #  whole visit counts as time spent waiting
+        self.wait_times.append(self.elapsedTime - customer.entered_store)
+        self.abandoned += 1
+        
+    def record_visit(self, customer):
+        # Called as a customer walks out
+        if self.visit_log is not None:
+            self.visit_log.append((self.elapsedTime - customer.entered_store,
+                                   customer.was_helped, customer.engaged_time))
         
     def dealershipActions(self, time_passed):
+        # Run anything scheduled to happen by now (shift changes etc.)
+        self.run_events(time_passed)
+        if self.crm is not None:
+            self.crm.advance(time_passed)
+        
         # Check to see if a new customer walks in
 
         if time_passed - self.last_customer_time < self.waitTime:
             pass
         else:
             self.last_customer_time = time_passed
+            if not self.is_open(time_passed):
+                # No one new walks in after closing, but the customers still 
+                #  on the floor finish their visit
+                if self.customers:
+                    self.process(time_passed)
+                return
+            
+            if self.arrival_source is not None:
+                arrivals = self.arrival_source.due(time_passed)
+                for visit in arrivals:
+                    self.walk_in(visit.get("preferences"))
+                if arrivals:
+                    self.process(time_passed)
+                return
             
-            new_customer_chance = randint(0, 9)
+            new_customer_chance = random()
             #print "Trying to add new customer.  Rolled a", new_customer_chance
-            if new_customer_chance > 7:
-                new_customer = newVehicleCustomer(self, "image")
-                new_customer.brain.set_state("shopping")
-                self.add_customer(new_customer)
+            if new_customer_chance < self.arrival_chance:
+                self.walk_in()
                 self.process(time_passed)
+                
+    def walk_in(self, preferences=None):
+        # A new customer comes through the door and starts shopping
+        new_customer = self.new_customer()
+        new_customer.preferences = preferences
+        new_customer.brain.set_state("shopping")
+        self.add_customer(new_customer)
+        return new_customer
             
     def count_States(self):
-        self.idle = 0
-        self.shopping = 0
+        # Counted first and then set, so anyone reading them from another 
+        #  thread never sees a count halfway through
+        idle = 0
+        shopping = 0
+        engaged = 0
+        waiting = 0
         
         for customer in self.customers.values():
             if customer.brain.active_state.name == "idle":
-                self.idle += 1
+                idle += 1
             elif customer.brain.active_state.name == "shopping":
-                self.shopping += 1
+                shopping += 1
             elif customer.brain.active_state.name == "engaged":
-                self.engaged += 1
+                engaged += 1
             else:
-                print "Customer brain state not counted", customer.brain.active_state.name
+                print("Customer brain state not counted", customer.brain.active_state.name)
+            if customer.waiting():
+                waiting += 1
+        self.idle = idle
+        self.shopping = shopping
+        self.engaged = engaged
+        self.waiting = waiting
+                
+        for salesPerson in self.salesPeople.values():
+            if salesPerson.brain.active_state.name in ("near_by", "helping"):
+                self.busy_samples += 1
+                self.staff_samples += 1
+            elif salesPerson.on_duty:
+                self.staff_samples += 1
                 
     def process(self, time_passed):
-        for customer in self.customers.values():
+        self.events_handled += len(self.customers) + len(self.salesPeople)
+        # Customers leave while everyone acts, so go through copies
+        for customer in list(self.customers.values()):
             customer.process(time_passed)
             
-        for salesPerson in self.salesPeople.values():
+        for salesPerson in list(self.salesPeople.values()):
             salesPerson.process(time_passed)
         self.count_States()
+        if self.customer_pool is not None:
+            self.customer_pool.recycle()
        
        
        
@@ -4,11 +4,7 @@ Created on Sat May 28 12:06:11 2016
 
 @author: DavidCreech
 """
-from Dealership import *
-from stateMachine import *
-
-import pygame
-from pygame.locals import *
+from stateMachine import StateMachine
 
 class GameEntity(object):
     def __init__(self, dealership, name, image):
@@ -23,10 +19,32 @@ class GameEntity(object):
         self.id = 0
         
         self.tp = 0
+        
+        # Only used when the dealership has a floor plan (see flowField).  
+        #  position is a cell on the floor, destination is a cell or another
+        #  agent to follow
+        self.position = None
+        self.destination = None
 
     def render(self, surface):
         pass
+        
+    def head_to(self, place):
+        # Walk toward one of the cells of a named place on the floor
+        floor = self.dealership.floor
+        if floor is not None:
+            self.destination = floor.pick(place)
+            
+    def reached(self, other):
+        # Without a floor everyone is within reach of everyone else
+        floor = self.dealership.floor
+        if floor is None or self.position is None or other.position is None:
+            return True
+        return floor.distance(self.position, other.position) <= 1
 
     def process(self, time_passed):
         self.brain.think()
+        if self.dealership.floor is not None:
+            self.dealership.floor.step(self)
+        self.dealership.moved(self)
         self.tp = time_passed
\ No newline at end of file
@@ -1,13 +1,9 @@
 
-from stateMachine import *
-from Dealership import *
+from __future__ import print_function
 
-from GameEntity import *
-import pygame
-from pygame.locals import *
+from stateMachine import State
 
-from helpers import *
-from random import randint
+from GameEntity import GameEntity
 
 class newVehicleSalesPerson(GameEntity):
     """
@@ -24,23 +20,78 @@ class newVehicleSalesPerson(GameEntity):
         
         self.helping_customer = None # Tracks which customer the Salesperson is
                                      #  currently helping
+        self.on_duty = True # Cleared by the shift scheduler for breaks, lunch 
+                            #  and the time between shifts
+        self.skills = frozenset() # Needs they can cover (see routing)
         self.idle_state = salesPerson_idle(self)
         self.near_by_state = salesPerson_near_by(self)
         self.helping_state = salesPerson_helping(self)
+        self.off_duty_state = salesPerson_off_duty(self)
         
         self.brain.add_state(self.idle_state)
         self.brain.add_state(self.near_by_state)
         self.brain.add_state(self.helping_state)
+        self.brain.add_state(self.off_duty_state)
         
     def find_customer(self):
-        # This finds out if there are any customers in need of help         
+        # This finds out if there are any customers in need of help.  With a 
+        #  router it is the one routed to this salesperson, on a floor plan 
+        #  the closest one within reach, otherwise anyone in the building
         customer_to_help = None
         
-        for customer in self.dealership.customers.values():
-            if customer.brain.active_state.name in ("shopping", "idle") and customer.near_by_sp == None:
-                customer_to_help = customer                           
+        # Customers another salesperson is already walking up to are left 
+        #  alone, otherwise every idle salesperson goes after the same one
+        router = self.dealership.router
+        waiting_hash = self.dealership.waiting_hash
+        if router is not None:
+            # Whoever the router picks for this salesperson's skills
+            customer_to_help = router.next_for(self)
+        elif waiting_hash is not None and self.position is not None:
+            customer_to_help = waiting_hash.nearest(self.position,
+                                                    max_distance=self.dealership.reach)
+        else:
+            # The newest one, by id so it doesn't hang on the dict's order
+            #  (Python 2 walks integer keys in hash order)
+            for customer in self.dealership.customers.values():
+                if customer.waiting() and (customer_to_help is None or
+                                           customer.id > customer_to_help.id):
+                    customer_to_help = customer
         # If no customers are found to help, this sets helping_customer to None                
         self.helping_customer = customer_to_help    
+        if customer_to_help is not None:
+            customer_to_help.approached_by = self
+            self.dealership.update_waiting(customer_to_help)
+            
+    def greet(self, customer):
+        # Sent over to a customer who just walked in, as the closest free 
+        #  salesperson on the floor (see Dealership.add_customer)
+        self.helping_customer = customer
+        customer.approached_by = self
+        self.dealership.update_waiting(customer)
+        self.brain.set_state("near_by")
+        
+    def let_go(self):
+        # Stop going after the current customer
+        customer = self.helping_customer
+        self.helping_customer = None
+        if customer is not None and customer.approached_by is self:
+            customer.approached_by = None
+            self.dealership.update_waiting(customer)
+        
+    def clock_in(self):
+        # Start of a shift or back from a break
+        self.on_duty = True
+        if self.brain.active_state is None or self.brain.active_state.name == "off_duty":
+            self.brain.set_state("idle")
+            
+    def clock_out(self):
+        # End of a shift or going on a break.  Salespeople that are with a 
+        #  customer finish up first, the idle state sends them off duty
+        self.on_duty = False
+        if self.dealership.router is not None:
+            self.dealership.router.clock_out(self)
+        if self.brain.active_state is None or self.brain.active_state.name == "idle":
+            self.brain.set_state("off_duty")
         
     def activity_check(self):
         # this function checks to see if the customer can move yet
@@ -54,6 +105,8 @@ class salesPerson_idle(State):
               
     def check_conditions(self): # Required
         # Check to see if there are any customers in need of help     
+        if not self.salesPerson.on_duty:
+            return "off_duty"
         can_move = self.salesPerson.activity_check()
         if can_move:
             self.salesPerson.find_customer()
@@ -61,11 +114,13 @@ class salesPerson_idle(State):
                 return "near_by"
         
     def exit_actions(self): # Required
-        pass
+        self.salesPerson.dealership.set_idle(self.salesPerson, False)
     
     def entry_actions(self):  # Required
-        self.salesPerson.helping_customer = None
-        print "Salesperson", self.salesPerson.id, "is now idle"
+        self.salesPerson.let_go()
+        self.salesPerson.head_to("desks")
+        self.salesPerson.dealership.set_idle(self.salesPerson, True)
+        print("Salesperson", self.salesPerson.id, "is now idle")
     
     def do_actions(self): # Required
         pass
@@ -93,6 +148,10 @@ class salesPerson_near_by(State):
                     # This means that the customer is engaged with a different
                     #  salesperson
                     return "idle"
+            elif (customer_brain_state in ("shopping", "idle") 
+                  and not self.salesPerson.reached(helping_customer)):
+                # Still walking up to the customer
+                return None
             else:
                 # This means that the customer didn't engaged with the sp
                 #TODO: Add logic here to find a different customer
@@ -102,7 +161,8 @@ class salesPerson_near_by(State):
         pass
     
     def entry_actions(self):  # Required
-        print "Salesperson", self.salesPerson.id, "walks up to customer", self.salesPerson.helping_customer.id
+        self.salesPerson.destination = self.salesPerson.helping_customer
+        print("Salesperson", self.salesPerson.id, "walks up to customer", self.salesPerson.helping_customer.id)
     
     def do_actions(self): # Required
         pass    
@@ -132,8 +192,29 @@ class salesPerson_helping(State):
         pass
     
     def entry_actions(self):  # Required
-        print "Salesperson", self.salesPerson.id, "starts helping customer", self.salesPerson.helping_customer.id
+        print("Salesperson", self.salesPerson.id, "starts helping customer", self.salesPerson.helping_customer.id)
     
     def do_actions(self): # Required
-        pass    
-    
\ No newline at end of file
+        pass
+    
+    
+class salesPerson_off_duty(State):
+    # Off duty sales people are on a break, at lunch or between shifts
+    def __init__(self, salesPerson):
+        State.__init__(self, "off_duty")
+        self.salesPerson = salesPerson
+        
+    def check_conditions(self): # Required
+        if self.salesPerson.on_duty:
+            return "idle"
+    
+    def exit_actions(self): # Required
+        pass
+    
+    def entry_actions(self):  # Required
+        self.salesPerson.let_go()
+        self.salesPerson.head_to("desks")
+        print("Salesperson", self.salesPerson.id, "is now off duty")
+    
+    def do_actions(self): # Required
+        pass
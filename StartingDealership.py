@@ -1,7 +1,6 @@
 #! /usr/bin/env python
 
 import levelBase
-from helpers import load_image
 
 
 
@@ -12,6 +11,7 @@ class level(levelBase.Level):
         self.BLOCK = 1
         self.SNAKE = 2
         self.PELLET = 0
+        self.OUTSIDE = 9
     
     def getLayout(self):
         return [[9, 9, 9 ,9, 9, 9, 9, 9],\
@@ -21,13 +21,36 @@ class level(levelBase.Level):
                 [9, 0, 1, 1, 0, 1, 1, 9],\
                 [9, 0, 2, 0, 0, 0, 0, 9],\
                 [9, 0, 1, 1, 0, 1, 0, 9],\
-                [9, 0, 0, 0, 0, 1, 0, 9]
+                [9, 0, 0, 0, 0, 1, 0, 9]]
              
                 
         
+    def getLocations(self):
+        """Named places on the floor as lists of (column, row) cells"""
+        layout = self.getLayout()
+        floor = (self.PELLET, self.SNAKE)
+        # Customers look at the vehicles on display from the floor next to 
+        #  them.  Everything from row 4 down is display space
+        vehicles = []
+        for row in range(4, len(layout)):
+            for column in range(len(layout[row])):
+                if layout[row][column] not in floor:
+                    continue
+                neighbours = [layout[r][c] for r, c in ((row - 1, column), (row + 1, column),
+                                                        (row, column - 1), (row, column + 1))
+                              if 0 <= r < len(layout) and 0 <= c < len(layout[r])]
+                if self.BLOCK in neighbours:
+                    vehicles.append((column, row))
+        return {"door": [(2, 5)],
+                "desks": [(1, 3), (3, 3), (6, 3)],
+                "vehicles": vehicles}
+        
     def getSprites(self):
-        block, rect = load_image('')
-        pellet, rect = load_image('pellet.png',-1)
-        snake, rect = load_image('snake.png',-1)
-        return [pellet,block,snake]
+        """Tile images keyed by the values used in the layout"""
+        from helpers import load_image  # Keeps pygame out of headless runs
+        floor, rect = load_image('Floor.gif', 'Walls')
+        block, rect = load_image('Side.gif', 'Walls')
+        corner, rect = load_image('Corner.gif', 'Walls')
+        return {self.PELLET: floor, self.BLOCK: block, self.SNAKE: floor,
+                self.OUTSIDE: corner}
         
\ No newline at end of file
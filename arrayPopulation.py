@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Nov 14 10:12:37 2026
+
+@author: DavidCreech
+
+The agents of many dealerships at once, held in NumPy arrays instead of one
+object per agent.
+
+Every row is a store and every column a customer slot (or a salesperson),
+and each field of the agents in Customers.py and SalesPerson.py is an array:
+state, entered_store, was_helped, near_by_sp, approached_by.  tick() moves
+every store to its next walk-in and runs one round of thinking for all of
+their agents, which is what Dealership.process does for one store:
+
+    - the customer walks in and starts shopping
+    - every customer rolls and moves the way customer_idle, customer_shopping
+      and customer_engaged_with_sp would
+    - the salespeople, in order, do what salesPerson_idle, salesPerson_near_by
+      and salesPerson_helping would, the idle ones walking up to the newest
+      customer nobody is helping
+    - busy and on duty salespeople are counted for utilization
+
+The stores don't share anything, so a population is also a batch of
+independent replications of the same scenario.  Only what a plain
+run_headless run has is covered: a fixed staff all on duty, no floor, open
+hours, CRM or inventory.  Customers here never have a preferred
+salesperson (the CRM gives them one), so the state model's preferred_bonus
+never comes up.
+
+The round of thinking is a compiled Numba kernel when Numba is installed,
+otherwise the same rules as NumPy masks over every store at once.  The
+kernel runs each store through all of its walk-ins before the next one, so
+a store's agents stay in the cache, and rolls from a splitmix64 stream per
+store.  The two backends agree in distribution but not number for number.
+validate() compares either against the object engine.
+
+    python arrayPopulation.py --stores 10000 --salespeople 4    # speed
+    python arrayPopulation.py --validate --runs 200
+"""
+import time
+import argparse
+
+import numpy as np
+
+from Customers import StateModel
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Customer states.  LEFT only lasts to the end of the tick it happens in, so
+#  a salesperson going after them still sees they walked out
+EMPTY, SHOPPING, IDLE, ENGAGED, LEFT = range(5)
+# Salesperson states
+SP_IDLE, NEAR_BY, HELPING = range(3)
+NOBODY = -1
+
+# Per store totals, columns of ArrayPopulation.tallies
+SERVED, ABANDONED, WAIT_SUM, BUSY, STAFF, TICKS, DECISIONS = range(7)
+TALLIES = 7
+WAIT_BINS = 601 # A second each, the last holds everything from 600 s up
+GOLDEN = np.uint64(0x9E3779B97F4A7C15) # splitmix64's step
+
+BACKENDS = ("numba", "numpy") if numba is not None else ("numpy",)
+
+
+def _unit(z):
+    # splitmix64's output for step z of a stream, as a number in [0, 1).
+    #  Every store has its own stream, so a run only depends on its seed
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)) * 2.0 ** -53
+
+
+def _move(store, source, target, state, entered, helped, near, approached, serial,
+          sp_state, helping):
+    # Moves a customer to another slot, and the salesperson after them too
+    state[store, target] = state[store, source]
+    entered[store, target] = entered[store, source]
+    helped[store, target] = helped[store, source]
+    near[store, target] = near[store, source]
+    approached[store, target] = approached[store, source]
+    serial[store, target] = serial[store, source]
+    for sp in range(sp_state.shape[1]):
+        if helping[store, sp] == source:
+            helping[store, sp] = target
+
+
+def _think_store(store, t, state, entered, helped, near, approached, serial,
+                 sp_state, helping, next_id, in_store, tallies, waits, params,
+                 streams):
+    # One round of thinking in one store at time t, as loops for Numba to
+    #  compile.  The store's customers are kept in its first in_store slots
+    #  and it needs one more free for the customer walking in
+    idle_to_shopping = params[0]
+    shopping_to_idle = params[1]
+    shopping_engage = params[2]
+    engaged_exit = params[3]
+    time_limit = params[4]
+    salespeople = sp_state.shape[1]
+    last_bin = waits.shape[1] - 1
+
+    used = in_store[store]
+    state[store, used] = SHOPPING
+    entered[store, used] = t
+    helped[store, used] = False
+    near[store, used] = NOBODY
+    approached[store, used] = NOBODY
+    serial[store, used] = next_id[store]
+    used += 1
+    next_id[store] += 1
+    in_store[store] = used
+    tallies[store, TICKS] += 1
+    tallies[store, DECISIONS] += used + salespeople
+
+    left = 0
+    if t > 1: # activity_check
+        stream = streams[store]
+        for slot in range(used):
+            current = state[store, slot]
+            stream += GOLDEN
+            roll = _unit(stream)
+            if current == SHOPPING:
+                near[store, slot] = approached[store, slot]
+                if roll < shopping_to_idle:
+                    state[store, slot] = IDLE
+                elif roll >= 1 - shopping_engage and near[store, slot] != NOBODY:
+                    state[store, slot] = ENGAGED
+                    if not helped[store, slot]:
+                        helped[store, slot] = True
+                        wait = t - entered[store, slot]
+                        tallies[store, SERVED] += 1
+                        tallies[store, WAIT_SUM] += wait
+                        waits[store, min(int(wait), last_bin)] += 1
+            elif current == IDLE:
+                if roll >= 1 - idle_to_shopping:
+                    state[store, slot] = SHOPPING
+                elif t - entered[store, slot] > time_limit:
+                    state[store, slot] = LEFT
+                    left += 1
+                    if not helped[store, slot]:
+                        wait = t - entered[store, slot]
+                        tallies[store, ABANDONED] += 1
+                        tallies[store, WAIT_SUM] += wait
+                        waits[store, min(int(wait), last_bin)] += 1
+            elif roll >= 1 - engaged_exit:
+                state[store, slot] = SHOPPING
+                near[store, slot] = NOBODY
+        streams[store] = stream
+
+        for sp in range(salespeople):
+            if sp_state[store, sp] == SP_IDLE:
+                best = NOBODY
+                newest = -1
+                for slot in range(used):
+                    current = state[store, slot]
+                    if ((current == SHOPPING or current == IDLE)
+                            and near[store, slot] == NOBODY
+                            and approached[store, slot] == NOBODY
+                            and serial[store, slot] > newest):
+                        best = slot
+                        newest = serial[store, slot]
+                if best != NOBODY:
+                    approached[store, best] = sp
+                    helping[store, sp] = best
+                    sp_state[store, sp] = NEAR_BY
+                continue
+            customer = helping[store, sp]
+            current = state[store, customer]
+            if sp_state[store, sp] == NEAR_BY:
+                if current == ENGAGED and near[store, customer] == sp:
+                    sp_state[store, sp] = HELPING
+                    continue
+            elif current != SHOPPING and current != IDLE:
+                continue
+            # Back to idle, letting go of the customer
+            if approached[store, customer] == sp:
+                approached[store, customer] = NOBODY
+            helping[store, sp] = NOBODY
+            sp_state[store, sp] = SP_IDLE
+
+    for sp in range(salespeople):
+        if sp_state[store, sp] != SP_IDLE:
+            tallies[store, BUSY] += 1
+    tallies[store, STAFF] += salespeople
+
+    # Fill the holes the leavers left with the last customers
+    if left:
+        for slot in range(used - 1, -1, -1):
+            if state[store, slot] == LEFT:
+                used -= 1
+                if slot != used:
+                    _move(store, used, slot, state, entered, helped, near, approached,
+                          serial, sp_state, helping)
+                state[store, used] = EMPTY
+        in_store[store] = used
+
+
+def _think(now, active, state, entered, helped, near, approached, serial,
+           sp_state, helping, next_id, in_store, tallies, waits, params, streams):
+    # One round in every active store
+    for store in range(state.shape[0]):
+        if active[store]:
+            _think_store(store, now[store], state, entered, helped, near, approached,
+                         serial, sp_state, helping, next_id, in_store, tallies, waits,
+                         params, streams)
+
+
+def _run(now, until, arrival_chance, start, state, entered, helped, near,
+         approached, serial, sp_state, helping, next_id, in_store, tallies,
+         waits, params, streams):
+    # Every store from start on, one after the other, through all of its
+    #  walk-ins up to until.  A store stays in the cache for its whole run
+    #  this way.  Returns the store that ran out of customer slots, -1 when
+    #  every store is done
+    capacity = state.shape[1]
+    stay = np.log(1 - arrival_chance) if arrival_chance < 1 else -np.inf
+    for store in range(start, state.shape[0]):
+        while True:
+            if in_store[store] >= capacity:
+                return store
+            # Seconds to the next walk-in, as in headlessSim.fast_forward
+            streams[store] += GOLDEN
+            arrival = now[store] + 1 + int(np.log(1 - _unit(streams[store])) / stay)
+            if arrival > until:
+                now[store] = until
+                break
+            now[store] = arrival
+            _think_store(store, arrival, state, entered, helped, near, approached,
+                         serial, sp_state, helping, next_id, in_store, tallies, waits,
+                         params, streams)
+    return -1
+
+
+if numba is not None:
+    _unit = numba.njit(cache=True)(_unit)
+    _move = numba.njit(cache=True)(_move)
+    _think_store = numba.njit(cache=True)(_think_store)
+    _think_compiled = numba.njit(cache=True)(_think)
+    _run_compiled = numba.njit(cache=True)(_run)
+
+
+class ArrayPopulation(object):
+    def __init__(self, stores=1, salespeople=1, arrival_chance=0.2,
+                 state_model=None, capacity=32, seed=None, backend=None):
+        if not 0 < arrival_chance <= 1:
+            raise ValueError("arrival_chance must be in (0, 1]")
+        backend = backend or BACKENDS[0]
+        if backend not in BACKENDS:
+            raise ValueError("No %s backend here (have %s)" % (backend, ", ".join(BACKENDS)))
+        self.backend = backend
+        self.stores = stores
+        self.salespeople = salespeople
+        self.arrival_chance = arrival_chance
+        self.state_model = state_model or StateModel()
+        model = self.state_model
+        self.params = np.array([model.idle_to_shopping, model.shopping_to_idle,
+                                model.shopping_engage, model.engaged_exit,
+                                model.time_limit], dtype=np.float64)
+        self.rng = np.random.RandomState(seed)
+        # The compiled kernel's rolls, a stream per store
+        self.streams = self.rng.randint(2 ** 62, size=stores,
+                                        dtype=np.int64).astype(np.uint64)
+
+        self.now = np.zeros(stores)
+        self.state = np.full((stores, capacity), EMPTY, dtype=np.int8)
+        self.entered = np.zeros((stores, capacity))
+        self.helped = np.zeros((stores, capacity), dtype=bool)
+        self.near = np.full((stores, capacity), NOBODY, dtype=np.int32)
+        self.approached = np.full((stores, capacity), NOBODY, dtype=np.int32)
+        self.serial = np.zeros((stores, capacity), dtype=np.int64)
+        self.sp_state = np.full((stores, salespeople), SP_IDLE, dtype=np.int8)
+        self.helping = np.full((stores, salespeople), NOBODY, dtype=np.int32)
+        self.next_id = np.ones(stores, dtype=np.int64)
+        self.in_store = np.ones(stores, dtype=np.int64)
+        self.tallies = np.zeros((stores, TALLIES))
+        self.waits = np.zeros((stores, WAIT_BINS), dtype=np.int64)
+        # Like a new Dealership, every store opens with one customer shopping
+        self.state[:, 0] = SHOPPING
+
+    @property
+    def capacity(self):
+        return self.state.shape[1]
+
+    def _grow(self):
+        # Twice the customer slots, the new ones empty
+        stores, capacity = self.state.shape
+        for name, fill in (("state", EMPTY), ("entered", 0), ("helped", False),
+                           ("near", NOBODY), ("approached", NOBODY), ("serial", 0)):
+            old = getattr(self, name)
+            new = np.full((stores, capacity * 2), fill, dtype=old.dtype)
+            new[:, :capacity] = old
+            setattr(self, name, new)
+
+    def tick(self, until=np.inf):
+        """
+        Moves every store to its next walk-in and lets its agents think,
+        unless that falls after until, in which case the store's clock goes
+        to until and nothing happens there.  Returns which stores ticked.
+        """
+        arrival = self.now + self.rng.geometric(self.arrival_chance, self.stores)
+        active = arrival <= until
+        self.now = np.where(active, arrival, until)
+        if not active.any():
+            return active
+        while (self.in_store[active] >= self.capacity).any():
+            self._grow()
+        if self.backend == "numba":
+            _think_compiled(self.now, active, *self._arrays())
+        else:
+            self._think_masked(self.now, active, *self._arrays())
+        return active
+
+    def _arrays(self):
+        # What the kernels work on, in their argument order
+        return (self.state, self.entered, self.helped, self.near, self.approached,
+                self.serial, self.sp_state, self.helping, self.next_id, self.in_store,
+                self.tallies, self.waits, self.params, self.streams)
+
+    def _think_masked(self, now, active, state, entered, helped, near, approached,
+                      serial, sp_state, helping, next_id, in_store, tallies, waits,
+                      params, streams):
+        # The same round as _think_store, in every store at once
+        idle_to_shopping, shopping_to_idle, shopping_engage, engaged_exit, time_limit = params
+        rows = np.flatnonzero(active)
+        salespeople = self.salespeople
+        last_bin = waits.shape[1] - 1
+
+        slot = (state[rows] == EMPTY).argmax(axis=1)
+        state[rows, slot] = SHOPPING
+        entered[rows, slot] = now[rows]
+        helped[rows, slot] = False
+        near[rows, slot] = NOBODY
+        approached[rows, slot] = NOBODY
+        serial[rows, slot] = next_id[rows]
+        next_id[rows] += 1
+        in_store[rows] += 1
+        tallies[rows, TICKS] += 1
+        tallies[rows, DECISIONS] += in_store[rows] + salespeople
+
+        moving = (active & (now > 1))[:, None] # activity_check
+        rolls = self.rng.random_sample(state.shape)
+        waited = now[:, None] - entered
+        shopping = moving & (state == SHOPPING)
+        idle = moving & (state == IDLE)
+        engaged = moving & (state == ENGAGED)
+
+        np.copyto(near, approached, where=shopping)
+        to_idle = shopping & (rolls < shopping_to_idle)
+        to_engaged = shopping & ~to_idle & (rolls >= 1 - shopping_engage) & (near != NOBODY)
+        to_shopping = idle & (rolls >= 1 - idle_to_shopping)
+        to_left = idle & ~to_shopping & (waited > time_limit)
+        done = engaged & (rolls >= 1 - engaged_exit)
+        served = to_engaged & ~helped
+        abandoned = to_left & ~helped
+
+        state[to_idle] = IDLE
+        state[to_engaged] = ENGAGED
+        state[to_shopping | done] = SHOPPING
+        state[to_left] = LEFT
+        near[done] = NOBODY
+        helped |= to_engaged
+        in_store -= to_left.sum(axis=1)
+        tallies[:, SERVED] += served.sum(axis=1)
+        tallies[:, ABANDONED] += abandoned.sum(axis=1)
+        recorded = served | abandoned
+        tallies[:, WAIT_SUM] += np.where(recorded, waited, 0).sum(axis=1)
+        stores, slots = np.nonzero(recorded)
+        np.add.at(waits, (stores, np.minimum(waited[stores, slots], last_bin).astype(np.int64)), 1)
+
+        # Salespeople one after the other, each seeing what the ones before
+        #  them did
+        moving = moving[:, 0]
+        everyone = np.arange(len(state))
+        for sp in range(salespeople):
+            current = sp_state[:, sp]
+            free = ((state == SHOPPING) | (state == IDLE)) & (near == NOBODY) & (approached == NOBODY)
+            newest = np.where(free, serial, -1)
+            best = newest.argmax(axis=1)
+            pick = moving & (current == SP_IDLE) & (newest[everyone, best] >= 0)
+
+            customer = np.maximum(helping[:, sp], 0)
+            customer_state = state[everyone, customer]
+            to_helping = (moving & (current == NEAR_BY) & (customer_state == ENGAGED)
+                          & (near[everyone, customer] == sp))
+            let_go = moving & (((current == NEAR_BY) & ~to_helping) |
+                               ((current == HELPING) & ((customer_state == SHOPPING) |
+                                                        (customer_state == IDLE))))
+
+            sp_state[to_helping, sp] = HELPING
+            mine = let_go & (approached[everyone, customer] == sp)
+            approached[everyone[mine], customer[mine]] = NOBODY
+            helping[let_go, sp] = NOBODY
+            sp_state[let_go, sp] = SP_IDLE
+            approached[everyone[pick], best[pick]] = sp
+            helping[pick, sp] = best[pick]
+            sp_state[pick, sp] = NEAR_BY
+
+        tallies[rows, BUSY] += (sp_state[rows] != SP_IDLE).sum(axis=1)
+        tallies[rows, STAFF] += salespeople
+        state[state == LEFT] = EMPTY
+
+    def run(self, duration):
+        """
+        Runs every store for duration simulated seconds.  Compiled, each
+        store goes all the way before the next one starts.
+        """
+        if self.backend != "numba":
+            while self.tick(duration).any():
+                pass
+            return self
+        store = 0
+        while True:
+            store = _run_compiled(self.now, float(duration), self.arrival_chance, store,
+                                  *self._arrays())
+            if store < 0:
+                return self
+            self._grow()
+
+    def decisions(self):
+        # Agents that have thought, summed over every tick and store
+        return int(self.tallies[:, DECISIONS].sum())
+
+    def wait_percentile(self, store, q):
+        # Nearest rank, like headlessSim.percentile, to the second
+        counts = self.waits[store]
+        total = counts.sum()
+        if not total:
+            return 0.0
+        rank = int(round(q / 100.0 * (total - 1)))
+        return float(np.searchsorted(np.cumsum(counts), rank, side="right"))
+
+    def kpis(self):
+        """Each store's KPIs, named like headlessSim.summarize's."""
+        results = []
+        for store in range(self.stores):
+            served, abandoned, wait_sum, busy, staff = self.tallies[store, :TICKS].tolist()
+            visits = served + abandoned
+            results.append({
+                "sim_time": float(self.now[store]),
+                "customers": int(self.next_id[store]),
+                "served": int(served),
+                "abandoned": int(abandoned),
+                "abandon_rate": abandoned / visits if visits else 0.0,
+                "wait_mean": wait_sum / visits if visits else 0.0,
+                "wait_p95": self.wait_percentile(store, 95),
+                "in_store": int(self.in_store[store]),
+                "utilization": busy / staff if staff else 0.0,
+                "returns": 0,
+            })
+        return results
+
+
+METRICS = ("customers", "served", "abandon_rate", "wait_mean", "wait_p95",
+           "in_store", "utilization")
+
+
+def _spread(values):
+    # Mean and standard error
+    values = np.asarray(values, dtype=float)
+    return values.mean(), values.std(ddof=1) / np.sqrt(len(values))
+
+
+def validate(salespeople=2, arrival_chance=0.3, duration=4 * 60 * 60, runs=100,
+             backend=None, processes=None, seed=0):
+    """
+    Runs the object engine and an array population of as many stores on
+    the same scenario and compares every KPI's mean across runs.  Returns
+    (metric, object mean, array mean, z) rows, where z is the difference
+    over its standard error and should mostly stay within +-3.
+    """
+    from headlessSim import run_many
+
+    configs = [dict(duration=duration, seed=seed + run, pooled=True,
+                    salesPeople_count=salespeople, arrival_chance=arrival_chance)
+               for run in range(runs)]
+    objects = run_many(configs, processes)
+    population = ArrayPopulation(runs, salespeople, arrival_chance, seed=seed,
+                                 backend=backend).run(duration)
+    arrays = population.kpis()
+    rows = []
+    for metric in METRICS:
+        object_mean, object_error = _spread([run[metric] for run in objects])
+        array_mean, array_error = _spread([run[metric] for run in arrays])
+        error = np.hypot(object_error, array_error)
+        z = (array_mean - object_mean) / error if error else 0.0
+        rows.append((metric, object_mean, array_mean, z))
+    return rows
+
+
+def benchmark(stores=10000, salespeople=4, arrival_chance=0.3, duration=3600,
+              backend=None, seed=0):
+    """Agent decisions a second for one population run."""
+    if backend == "numba" or (backend is None and BACKENDS[0] == "numba"):
+        # Compiling (or loading the cached kernel) isn't part of the run
+        ArrayPopulation(2, salespeople, arrival_chance, seed=seed,
+                        backend="numba").run(10)
+    population = ArrayPopulation(stores, salespeople, arrival_chance, seed=seed,
+                                 backend=backend)
+    start = time.time()
+    population.run(duration)
+    took = time.time() - start
+    return population.decisions() / took, population.decisions(), took
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run many stores' agents as arrays and time or validate them")
+    parser.add_argument("--stores", type=int, default=10000)
+    parser.add_argument("--salespeople", type=int, default=4)
+    parser.add_argument("--arrival-chance", type=float, default=0.3)
+    parser.add_argument("--hours", type=float, default=1)
+    parser.add_argument("--backend", choices=("numba", "numpy"), default=None,
+                        help="default numba when it is installed")
+    parser.add_argument("--validate", action="store_true",
+                        help="compare KPIs against the object engine")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.validate:
+        rows = validate(args.salespeople, args.arrival_chance, args.hours * 3600,
+                        args.runs, args.backend, args.processes)
+        print("%-14s %10s %10s %7s" % ("", "objects", "arrays", "z"))
+        for metric, object_mean, array_mean, z in rows:
+            print("%-14s %10.3f %10.3f %+7.2f" % (metric, object_mean, array_mean, z))
+        return
+
+    for backend in ([args.backend] if args.backend else BACKENDS):
+        rate, decisions, took = benchmark(args.stores, args.salespeople,
+                                          args.arrival_chance, args.hours * 3600,
+                                          backend)
+        print("%-6s %6.1f M agent decisions/s  (%d in %.2f s)" % (
+            backend, rate / 1e6, decisions, took))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Nov  6 09:48:25 2026
+
+@author: DavidCreech
+
+Runs many what-if branches from one dealership's current state, like the
+forecasts of a liveTwin.LiveTwin.
+
+Every branch is a child process forked from this one.  Forking doesn't copy
+the dealership at all: the child starts out sharing every page of memory
+with the parent and the kernel copies a page only when one side writes to
+it, so a branch pays for the agents it actually changes rather than for the
+whole object graph, and the cost of starting one hardly grows with the size
+of the dealership.  The child runs the branch, pickles the result back over
+a pipe and exits without cleaning up.  Up to workers branches run at once.
+
+Where there is no os.fork (Windows) the branches run one after the other on
+copy_dealership copies instead.
+
+    python branches.py --branches 100 --salespeople 100
+"""
+import gc
+import os
+import copy
+import time
+import types
+import select
+import random
+import argparse
+import traceback
+import multiprocessing
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+try:
+    import copy_reg
+except ImportError:
+    copy_reg = None # Python 3 copies bound methods itself
+
+if copy_reg is not None:
+    # The event queue holds bound methods (salesPerson.clock_in etc.).  A
+    #  copy needs them bound to the copied salesperson
+    def _reduce_method(method):
+        return getattr, (method.__self__, method.__func__.__name__)
+
+    copy_reg.pickle(types.MethodType, _reduce_method)
+
+can_fork = hasattr(os, "fork")
+
+
+def copy_dealership(dlr):
+    """
+    A copy of the dealership to run ahead on.  The floor plan, inventory and
+    state model are only read by the agents and are shared with the copy.
+    The copy has no CRM, network, arrival source, customer pool or history,
+    as a branch neither needs them nor should touch the originals.
+    """
+    memo = {}
+    for shared in (dlr.floor, dlr.inventory, dlr.state_model):
+        if shared is not None:
+            memo[id(shared)] = shared
+    for left_out, replacement in ((dlr.crm, None), (dlr.network, None),
+                                  (dlr.arrival_source, None),
+                                  (dlr.customer_pool, None), (dlr.visit_log, None),
+                                  (dlr.wait_times, []), (dlr.left_customers, {})):
+        if left_out is not None:
+            memo[id(left_out)] = replacement
+    return copy.deepcopy(dlr, memo)
+
+
+def detach(dlr):
+    # What copy_dealership leaves out, for a branch running on the
+    #  dealership itself in a forked child
+    dlr.crm = None
+    dlr.network = None
+    dlr.arrival_source = None
+    dlr.customer_pool = None
+    dlr.visit_log = None
+    dlr.wait_times = []
+    dlr.left_customers = {}
+
+
+def _branch_seed(seed, number):
+    return None if seed is None else seed + number
+
+
+def _run_child(dlr, run, number, seed, out):
+    # In the forked child.  Never returns
+    try:
+        gc.disable() # Collections would touch (and so copy) every page
+        random.seed(_branch_seed(seed, number)) # Not the parent's sequence
+        detach(dlr)
+        data = pickle.dumps((True, run(dlr, number)), 2)
+    except BaseException:
+        data = pickle.dumps((False, traceback.format_exc()), 2)
+    try:
+        while data:
+            data = data[os.write(out, data):]
+    finally:
+        os._exit(0)
+
+
+def _run_copy(dlr, run, number, seed):
+    # A branch in this process, on a copy and with its own random numbers
+    state = random.getstate()
+    try:
+        random.seed(_branch_seed(seed, number))
+        return run(copy_dealership(dlr), number)
+    finally:
+        random.setstate(state)
+
+
+def run_branches(dlr, run, count, workers=None, seed=None, use_fork=True):
+    """
+    run(dealership, branch number) on count branches of dlr's current
+    state, returning the results in branch order.  Branch n's random
+    numbers are seeded with seed + n, or from the system when seed is None.
+    results must pickle.  dlr itself is never changed.
+    """
+    if not (use_fork and can_fork):
+        return [_run_copy(dlr, run, number, seed) for number in range(count)]
+
+    workers = workers or multiprocessing.cpu_count()
+    results = [None] * count
+    running = {} # pipe -> (pid, branch number, chunks read)
+    upcoming = iter(range(count))
+    launched = 0
+    while launched < count or running:
+        while launched < count and len(running) < workers:
+            number = next(upcoming)
+            read_end, write_end = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(read_end)
+                _run_child(dlr, run, number, seed, write_end)
+            os.close(write_end)
+            running[read_end] = (pid, number, [])
+            launched += 1
+        ready, unused, unused = select.select(list(running), [], [])
+        for read_end in ready:
+            pid, number, chunks = running[read_end]
+            data = os.read(read_end, 1 << 16)
+            if data:
+                chunks.append(data)
+                continue
+            os.close(read_end)
+            os.waitpid(pid, 0)
+            del running[read_end]
+            if not chunks:
+                raise RuntimeError("Branch %d died without a result" % number)
+            ok, result = pickle.loads(b"".join(chunks))
+            if not ok:
+                raise RuntimeError("Branch %d failed:\n%s" % (number, result))
+            results[number] = result
+    return results
+
+
+def benchmark(dlr, branches=100, run=None):
+    """Seconds to run the branches forked and on copies."""
+    run = run or (lambda dealership, number: len(dealership.customers))
+    timings = {}
+    for use_fork in (True, False):
+        start = time.time()
+        run_branches(dlr, run, branches, seed=0, use_fork=use_fork)
+        timings["fork" if use_fork else "copy"] = time.time() - start
+    return timings
+
+
+def main():
+    from headlessSim import build_dealership, advance, fast_forward, muted
+
+    parser = argparse.ArgumentParser(description="Time forked branches against copies")
+    parser.add_argument("--branches", type=int, default=100)
+    parser.add_argument("--salespeople", type=int, default=4)
+    parser.add_argument("--arrival-chance", type=float, default=0.9)
+    parser.add_argument("--ahead", type=float, default=60,
+                        help="seconds each branch runs ahead")
+    args = parser.parse_args()
+    if not can_fork:
+        parser.error("os.fork isn't available here")
+
+    random.seed(0)
+    with muted():
+        dlr = build_dealership(args.salespeople, arrival_chance=args.arrival_chance,
+                               pooled=True, floor=True)
+        advance(dlr, 900)
+    print("%d customers and %d salespeople" % (len(dlr.customers), len(dlr.salesPeople)))
+
+    def ahead(dealership, number):
+        fast_forward(dealership, dealership.elapsedTime + args.ahead)
+        return len(dealership.customers)
+
+    with muted():
+        spawn = benchmark(dlr, args.branches)
+        ran = benchmark(dlr, args.branches, ahead)
+    for name in ("fork", "copy"):
+        print("%-4s  %5.1f ms a branch to start, %5.1f ms with %g s ahead" % (
+            name, spawn[name] / args.branches * 1000,
+            ran[name] / args.branches * 1000, args.ahead))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Nov  4 09:07:26 2026
+
+@author: DavidCreech
+
+Fits the customers' StateModel (the chances behind the dice rolls in
+Customers.py and the time limit) to what a real showroom sees: how long each
+visit lasted, whether a salesperson ever engaged the customer and, if the
+salespeople log it, how many seconds they spent engaged.
+
+The fit has two stages.  The first takes its likelihood from the analytic
+chain in queueModel instead of from simulations.  For a given StateModel the
+chain gives, for every second, the chance a visit ends then with or without
+the customer having been helped.  The observed visits are binned by second
+once, so the log likelihood of any number of visits is two dot products.
+The three customer chances are fitted with Nelder-Mead for each candidate
+time limit, in parallel over a process pool, in a few seconds.
+
+The chain shares queueModel's mean-field view of the salespeople: anyone
+free is as likely to be picked up as anyone else.  Salespeople actually go to
+the newest customer, so the first stage is biased (0.41 for a true 0.35
+idle_to_shopping on the demo), and visit lengths can't tell engaged_exit apart
+from that bias.  So there engaged_exit is held, at a guess from the mean
+engaged seconds if there are any.
+
+The second stage starts from the first and compares simulations with the
+observations (headlessSim.run_many, twice as many visits as were observed):
+histograms of visit length split by helped, and of engaged seconds, binned so
+each bin holds about as many observed visits.  The simulations are too noisy
+to walk downhill on, so each round simulates points around the current fit,
+fits a straight line per bin through them and takes the weighted least
+squares step those call for, with the rounds closing in (simulated minimum
+distance).  engaged_exit is fitted here when there are engaged seconds, and
+the time limit moves a second at a time while a neighbour simulates closer.
+On one core the demo takes about five minutes and lands within a couple of
+hundredths of the truth.
+
+    python calibration.py visits.csv --salespeople 3 --arrival-chance 0.15
+    python calibration.py --demo          # recover a made up StateModel
+"""
+import csv
+import math
+import time
+import argparse
+import multiprocessing
+
+import numpy as np
+
+from Customers import StateModel
+from queueModel import (QueueModel, STATES, SHOP, IDLE, SHOP_ASSIGNED,
+                        IDLE_ASSIGNED, ENGAGED)
+
+_EPS = 1e-12
+
+
+def visit_distribution(model, a, seconds, tail=1e-9):
+    """
+    Chance a visit ends on each of the first seconds seconds, split by
+    whether the customer was ever engaged.  Returns (helped, not helped).
+
+    Everyone in a visit is the same age, so the chain can be run a second at
+    a time: the customer thinks on the second they walk in and then on each
+    second someone else does (arrival_chance), and is past the time limit
+    exactly when the second is.  That keeps how long they stayed and whether
+    they were overdue together, which counting ticks would lose.
+    """
+    on_time = slice(0, STATES)
+    overdue = slice(model.ages * STATES, (model.ages + 1) * STATES)
+    think = {False: model.think[on_time, on_time], True: model.think[overdue, overdue]}
+    leaving = {False: np.zeros(STATES), True: model.left[overdue]}
+
+    grab = np.eye(STATES) # Salespeople pick up who's free after the customers think
+    for state, assigned in ((SHOP, SHOP_ASSIGNED), (IDLE, IDLE_ASSIGNED)):
+        grab[state, state] = 1 - a
+        grab[state, assigned] = a
+
+    engaged = np.zeros(STATES)
+    engaged[ENGAGED] = 1.0
+    time_limit = model.state_model.time_limit
+    waited = np.zeros(STATES) # Not helped yet
+    waited[SHOP] = 1.0
+    helped = np.zeros(STATES)
+    helped_at = np.zeros(seconds)
+    unhelped_at = np.zeros(seconds)
+    for second in range(seconds):
+        chance = 1.0 if second == 0 else model.arrival_chance
+        late = second > time_limit
+        helped_at[second] = chance * helped.dot(leaving[late])
+        unhelped_at[second] = chance * waited.dot(leaving[late])
+        thought_waited = waited.dot(think[late])
+        thought_helped = helped.dot(think[late]) + thought_waited * engaged
+        thought_waited *= 1 - engaged
+        waited = (1 - chance) * waited + chance * thought_waited.dot(grab)
+        helped = (1 - chance) * helped + chance * thought_helped.dot(grab)
+        if waited.sum() + helped.sum() < tail:
+            break
+    return helped_at, unhelped_at
+
+
+class Observations(object):
+    """
+    Visits binned by whole seconds, split by whether they were helped, and
+    if known the seconds the helped ones spent engaged with a salesperson.
+    """
+    def __init__(self, seconds, helped, engaged=None):
+        seconds = np.round(np.asarray(seconds, dtype=float)).astype(int)
+        helped = np.asarray(helped, dtype=bool)
+        self.count = len(seconds)
+        self.length = int(seconds.max()) + 1 if self.count else 1
+        self.helped = np.bincount(seconds[helped], minlength=self.length)
+        self.unhelped = np.bincount(seconds[~helped], minlength=self.length)
+        self.engaged = None
+        if engaged is not None:
+            engaged = np.round(np.asarray(engaged, dtype=float)).astype(int)[helped]
+            self.engaged = np.bincount(engaged, minlength=1)
+
+    @classmethod
+    def from_visits(cls, visits):
+        # visits as (seconds, was helped[, seconds engaged]), like
+        #  Dealership.visit_log
+        visits = list(visits)
+        engaged = None
+        if visits and all(len(visit) > 2 for visit in visits):
+            engaged = [visit[2] for visit in visits]
+        return cls([visit[0] for visit in visits], [visit[1] for visit in visits],
+                   engaged)
+
+    def summary(self):
+        seconds = np.arange(self.length)
+        total = self.helped + self.unhelped
+        summary = {"visits": self.count,
+                   "helped_rate": self.helped.sum() / float(max(1, self.count)),
+                   "mean_seconds": total.dot(seconds) / float(max(1, self.count))}
+        if self.engaged is not None:
+            summary["mean_engaged"] = (self.engaged.dot(np.arange(len(self.engaged)))
+                                       / float(max(1, self.engaged.sum())))
+        return summary
+
+
+def log_likelihood(state_model, observations, salespeople, arrival_chance):
+    model = QueueModel(state_model, arrival_chance)
+    a, counts = model.assignment_chance(salespeople)
+    helped, unhelped = visit_distribution(model, a, observations.length)
+    return (observations.helped.dot(np.log(helped + _EPS)) +
+            observations.unhelped.dot(np.log(unhelped + _EPS)))
+
+
+def predicted(state_model, salespeople, arrival_chance, seconds=3600):
+    # What the chain expects to see, to set next to Observations.summary
+    model = QueueModel(state_model, arrival_chance)
+    a, counts = model.assignment_chance(salespeople)
+    helped, unhelped = visit_distribution(model, a, seconds)
+    total = helped + unhelped
+    return {"helped_rate": helped.sum() / total.sum(),
+            "mean_seconds": total.dot(np.arange(seconds)) / total.sum()}
+
+
+def _logistic(x):
+    return 1.0 / (1.0 + math.exp(-x))
+
+
+def _logit(p):
+    p = min(max(p, 1e-6), 1 - 1e-6)
+    return math.log(p / (1 - p))
+
+
+def to_state_model(x, time_limit, engaged_exit=None):
+    """
+    Free parameters to a StateModel.  Shopping splits one roll three ways
+    (idle, engage, keep shopping), so those two chances come from a softmax.
+    Without an engaged_exit it is the fourth parameter.
+    """
+    if engaged_exit is None:
+        engaged_exit = _logistic(x[3])
+    idle_to_shopping = _logistic(x[0])
+    weights = np.exp([x[1], x[2], 0.0])
+    weights /= weights.sum()
+    return StateModel(idle_to_shopping=idle_to_shopping,
+                      shopping_to_idle=weights[0], shopping_engage=weights[1],
+                      engaged_exit=engaged_exit, time_limit=time_limit)
+
+
+def from_state_model(state_model, engaged_exit=False):
+    # engaged_exit adds it as the fourth parameter
+    rest = max(1e-6, 1 - state_model.shopping_to_idle - state_model.shopping_engage)
+    x = [_logit(state_model.idle_to_shopping),
+         math.log(max(1e-6, state_model.shopping_to_idle) / rest),
+         math.log(max(1e-6, state_model.shopping_engage) / rest)]
+    if engaged_exit:
+        x.append(_logit(state_model.engaged_exit))
+    return np.array(x)
+
+
+def nelder_mead(f, x0, step=0.5, tolerance=1e-4, iterations=400):
+    """Minimizes f from x0.  Returns (x, f(x))."""
+    n = len(x0)
+    simplex = [np.array(x0, dtype=float)]
+    for i in range(n):
+        point = np.array(x0, dtype=float)
+        point[i] += step
+        simplex.append(point)
+    values = [f(point) for point in simplex]
+    for iteration in range(iterations):
+        order = np.argsort(values)
+        simplex = [simplex[i] for i in order]
+        values = [values[i] for i in order]
+        if abs(values[-1] - values[0]) < tolerance * (1 + abs(values[0])):
+            break
+        centroid = np.mean(simplex[:-1], axis=0)
+        reflected = centroid + (centroid - simplex[-1])
+        value = f(reflected)
+        if value < values[0]:
+            expanded = centroid + 2 * (centroid - simplex[-1])
+            expanded_value = f(expanded)
+            if expanded_value < value:
+                simplex[-1], values[-1] = expanded, expanded_value
+            else:
+                simplex[-1], values[-1] = reflected, value
+        elif value < values[-2]:
+            simplex[-1], values[-1] = reflected, value
+        else:
+            contracted = centroid + 0.5 * (simplex[-1] - centroid)
+            contracted_value = f(contracted)
+            if contracted_value < values[-1]:
+                simplex[-1], values[-1] = contracted, contracted_value
+            else:
+                # Shrink everything toward the best point
+                for i in range(1, n + 1):
+                    simplex[i] = simplex[0] + 0.5 * (simplex[i] - simplex[0])
+                    values[i] = f(simplex[i])
+    best = int(np.argmin(values))
+    return simplex[best], values[best]
+
+
+def fit_time_limit(job):
+    """The best chances for one time limit.  Returns (log likelihood, StateModel)."""
+    time_limit, observations, salespeople, arrival_chance, start = job
+
+    def cost(x):
+        state_model = to_state_model(x, time_limit, start.engaged_exit)
+        return -log_likelihood(state_model, observations, salespeople,
+                               arrival_chance) / observations.count
+
+    x, value = nelder_mead(cost, from_state_model(start))
+    return -value * observations.count, to_state_model(x, time_limit, start.engaged_exit)
+
+
+def fit(observations, salespeople, arrival_chance, time_limits=range(2, 31),
+        start=None, processes=None):
+    """
+    The StateModel that best explains the observed visits, its log
+    likelihood, and the best log likelihood found for each time limit.
+    The fit starts from start, and start's engaged_exit is kept as it is.
+    """
+    start = start or StateModel()
+    jobs = [(time_limit, observations, salespeople, arrival_chance, start)
+            for time_limit in time_limits]
+    if processes == 1 or len(jobs) <= 1:
+        results = [fit_time_limit(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(processes)
+        try:
+            results = pool.map(fit_time_limit, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    profile = [(state_model.time_limit, value) for value, state_model in results]
+    value, state_model = max(results, key=lambda result: result[0])
+    return state_model, value, profile
+
+
+def load_visits(path):
+    """
+    Observations from a CSV with seconds and helped (0/1) columns, and
+    optionally engaged (seconds spent with salespeople, as they log it).
+    """
+    seconds, helped, engaged = [], [], []
+    with open(path) as data:
+        reader = csv.DictReader(data)
+        for row in reader:
+            seconds.append(float(row["seconds"]))
+            helped.append(row["helped"].strip().lower() in ("1", "true", "yes"))
+            if "engaged" in reader.fieldnames:
+                engaged.append(float(row["engaged"] or 0))
+    return Observations(seconds, helped, engaged if engaged else None)
+
+
+def simulate_visits(state_model, salespeople, arrival_chance, duration, seeds,
+                    processes=None):
+    """Visits from the simulator, a batch of seeded runs over a process pool."""
+    from headlessSim import run_many
+    configs = [dict(duration=duration, seed=seed, salesPeople_count=salespeople,
+                    arrival_chance=arrival_chance, state_model=state_model,
+                    visit_log=True, pooled=True)
+               for seed in seeds]
+    visits = []
+    for kpis in run_many(configs, processes):
+        visits.extend(kpis["visits"])
+    return Observations.from_visits(visits)
+
+
+def _quantile_edges(counts, bins):
+    # The last second of each of about bins bins with as many counts each
+    cumulative = np.cumsum(counts) / float(max(1, counts.sum()))
+    return np.unique(np.searchsorted(cumulative, np.linspace(0, 1, bins + 1)[1:-1]))
+
+
+def _cells(counts, edges):
+    # Counts per second summed into the bins that end at each edge, the last
+    #  bin taking everything after the last edge
+    bounds = np.concatenate([[0], np.asarray(edges) + 1, [max(len(counts), edges[-1] + 2)]])
+    totals = np.concatenate([[0], np.cumsum(counts)])
+    bounds = np.minimum(bounds, len(counts))
+    return np.diff(totals[bounds])
+
+
+class SimulatedMoments(object):
+    """
+    Binned histograms of the observed visits (visit length split by helped,
+    and engaged seconds if there are any) and of visits simulated with
+    headlessSim.run_many for a StateModel.  The bins are set once from the
+    observed visits so each holds about as many of them, and the weights are
+    one over each bin's variance, both the observed sampling and that of the
+    ratio times as many simulated visits.  Every simulation runs the same
+    seeds.
+    """
+    def __init__(self, observations, salespeople, arrival_chance, duration=6 * 60 * 60,
+                 ratio=2.0, seed=1000, processes=None, length_bins=12, engaged_bins=8):
+        self.observations = observations
+        self.salespeople = salespeople
+        self.arrival_chance = arrival_chance
+        self.duration = duration
+        runs = int(math.ceil(ratio * observations.count / (arrival_chance * duration)))
+        self.seeds = range(seed, seed + max(1, runs))
+        self.processes = processes
+        self.length_edges = _quantile_edges(observations.helped + observations.unhelped,
+                                            length_bins)
+        self.engaged_edges = None
+        if observations.engaged is not None and observations.engaged.sum():
+            self.engaged_edges = _quantile_edges(observations.engaged, engaged_bins)
+        self.target = self.moments(observations)
+        sizes = np.full(len(self.target), float(observations.count))
+        if self.engaged_edges is not None:
+            sizes[2 * (len(self.length_edges) + 1):] = observations.engaged.sum()
+        variance = (self.target + 0.5 / sizes) / sizes * (1 + 1.0 / ratio)
+        self.weights = 1 / variance
+        self.calls = 0
+
+    def moments(self, observations):
+        """The share of visits in each length bin, helped then not, then the
+        share of helped visits in each engaged bin."""
+        count = float(max(1, observations.count))
+        parts = [_cells(observations.helped, self.length_edges) / count,
+                 _cells(observations.unhelped, self.length_edges) / count]
+        if self.engaged_edges is not None:
+            engaged = observations.engaged
+            parts.append(_cells(engaged, self.engaged_edges) / float(max(1, engaged.sum())))
+        return np.concatenate(parts)
+
+    def simulate(self, state_model):
+        self.calls += 1
+        return simulate_visits(state_model, self.salespeople, self.arrival_chance,
+                               self.duration, self.seeds, self.processes)
+
+    def chi_square(self, moments):
+        return float(((moments - self.target) ** 2).dot(self.weights))
+
+    def __call__(self, state_model):
+        return self.chi_square(self.moments(self.simulate(state_model)))
+
+
+def _with_time_limit(state_model, time_limit):
+    return StateModel(state_model.idle_to_shopping, state_model.shopping_to_idle,
+                      state_model.shopping_engage, state_model.engaged_exit,
+                      time_limit, state_model.preferred_bonus)
+
+
+def refine_time_limit(moments, start, time_limit, fit_engaged_exit=True,
+                      radii=(0.5, 0.3, 0.15, 0.1), points=24, seed=0):
+    """
+    The chances (and engaged_exit if fit_engaged_exit) that bring the
+    simulated moments closest to the observed ones for one time limit.
+
+    Simulations don't give a smooth function of the chances, since a changed
+    chance changes how many rolls everyone makes after it and the dice drift
+    apart.  So each round simulates points scattered within a radius of the
+    current fit, fits every moment as a straight line through them, and takes
+    the weighted least squares (Gauss-Newton) step those lines call for, no
+    further than the radius.  preferred_bonus is kept at start's.  Returns
+    (chi square, StateModel), the chi square being the lines' at the end.
+    """
+    random = np.random.RandomState(seed)
+    held = None if fit_engaged_exit else start.engaged_exit
+
+    def model(x):
+        state_model = to_state_model(x, time_limit, held)
+        state_model.preferred_bonus = start.preferred_bonus
+        return state_model
+
+    x = from_state_model(start, fit_engaged_exit)
+    root_weights = np.sqrt(moments.weights)
+    value = None
+    for radius in radii:
+        offsets = radius * random.uniform(-1, 1, (points, len(x)))
+        simulated = np.array([
+            moments.moments(moments.simulate(model(x + offset)))
+            for offset in offsets])
+        lines = np.linalg.lstsq(np.column_stack([np.ones(points), offsets]), simulated,
+                                rcond=None)[0]
+        center, slopes = lines[0], lines[1:].T
+        step = np.linalg.lstsq(slopes * root_weights[:, None],
+                               (moments.target - center) * root_weights, rcond=None)[0]
+        length = np.linalg.norm(step)
+        if length > radius:
+            step *= radius / length
+        x = x + step
+        value = moments.chi_square(center + slopes.dot(step))
+    return value, model(x)
+
+
+def refine(moments, start, fit_engaged_exit=True, **options):
+    """
+    Simulation fit from start (usually the analytic fit), moving the time
+    limit a second at a time while the refined chances simulated with a
+    neighbouring time limit come closer.  Returns the best StateModel, its
+    chi square and the chi square of each time limit refined.
+    """
+    results = {}
+    time_limit = start.time_limit
+    while time_limit not in results:
+        results[time_limit] = refine_time_limit(moments, start, time_limit,
+                                                fit_engaged_exit, **options)
+        value, start = results[time_limit]
+        neighbours = [(moments(_with_time_limit(start, limit)), limit)
+                      for limit in (time_limit - 1, time_limit + 1)
+                      if limit >= 1 and limit not in results]
+        if neighbours and min(neighbours)[0] < value:
+            time_limit = min(neighbours)[1]
+    profile = sorted((limit, value) for limit, (value, state_model) in results.items())
+    value, state_model = min(results.values(), key=lambda result: result[0])
+    return state_model, value, profile
+
+
+def engaged_exit_guess(observations, arrival_chance, default):
+    """
+    A starting engaged_exit from the mean seconds helped visits spent
+    engaged.  Customers only roll it on seconds someone arrives, so a
+    conversation lasts about 1 / (arrival_chance * engaged_exit) seconds.
+    """
+    mean = observations.summary().get("mean_engaged")
+    if not mean:
+        return default
+    return min(0.95, max(0.02, 1.0 / (arrival_chance * mean)))
+
+
+def print_fit(state_model, observations, expected, held=False, truth=None):
+    # expected is the summary of visits predicted or simulated from state_model
+    print("Fitted %r" % state_model)
+    if truth is not None:
+        print("Truth  %r" % truth)
+    if held:
+        print("engaged_exit was held at %.3f, not fitted" % state_model.engaged_exit)
+    seen = observations.summary()
+    for name in ("helped_rate", "mean_seconds", "mean_engaged"):
+        if name in seen and name in expected:
+            print("%-14s observed %8.3f  fitted %8.3f" % (name, seen[name], expected[name]))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fit the customer state model to observed visits")
+    parser.add_argument("visits", nargs="?",
+                        help="CSV of visits with seconds and helped columns, and "
+                        "optionally engaged")
+    parser.add_argument("--salespeople", type=int, default=2)
+    parser.add_argument("--arrival-chance", type=float, default=0.2)
+    parser.add_argument("--max-time-limit", type=int, default=30)
+    parser.add_argument("--engaged-exit", type=float, default=None,
+                        help="hold engaged_exit at this instead of fitting it (it can "
+                        "only be fitted from engaged seconds, without them it is "
+                        "held at the StateModel's)")
+    parser.add_argument("--preferred-bonus", type=float, default=None,
+                        help="held, not fitted (default the StateModel's, or the "
+                        "truth for --demo)")
+    parser.add_argument("--analytic-only", action="store_true",
+                        help="skip the simulation fit, engaged_exit is then held")
+    parser.add_argument("--ratio", type=float, default=2.0,
+                        help="simulated visits per observed visit in the simulation fit")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--demo", action="store_true",
+                        help="fit visits simulated from a made up state model")
+    args = parser.parse_args()
+
+    time_limits = range(2, args.max_time_limit + 1)
+    truth = None
+    preferred_bonus = StateModel().preferred_bonus
+    if args.demo:
+        truth = StateModel(idle_to_shopping=0.35, shopping_to_idle=0.3,
+                           shopping_engage=0.25, engaged_exit=0.3,
+                           time_limit=18, preferred_bonus=0.0)
+        preferred_bonus = truth.preferred_bonus
+        start = time.time()
+        observations = simulate_visits(truth, args.salespeople, args.arrival_chance,
+                                       duration=6 * 60 * 60, seeds=range(8),
+                                       processes=args.processes)
+        print("Simulated %d visits in %.1f s from %r" %
+              (observations.count, time.time() - start, truth))
+    elif args.visits:
+        observations = load_visits(args.visits)
+    else:
+        parser.error("give a visits file or --demo")
+    if args.preferred_bonus is not None:
+        preferred_bonus = args.preferred_bonus
+
+    held = args.engaged_exit is not None or observations.engaged is None
+    if args.engaged_exit is not None:
+        engaged_exit = args.engaged_exit
+    else:
+        engaged_exit = engaged_exit_guess(observations, args.arrival_chance,
+                                          StateModel().engaged_exit)
+    start = time.time()
+    state_model, value, profile = fit(observations, args.salespeople,
+                                      args.arrival_chance, time_limits,
+                                      StateModel(engaged_exit=engaged_exit),
+                                      args.processes)
+    state_model.preferred_bonus = preferred_bonus
+    print("Analytic fit in %.1f s, log likelihood %.1f over %d visits" %
+          (time.time() - start, value, observations.count))
+    if args.analytic_only:
+        print_fit(state_model, observations,
+                  predicted(state_model, args.salespeople, args.arrival_chance),
+                  held=True, truth=truth)
+        return
+    print("Analytic %r" % state_model)
+
+    moments = SimulatedMoments(observations, args.salespeople, args.arrival_chance,
+                               ratio=args.ratio, processes=args.processes)
+    start = time.time()
+    state_model, value, profile = refine(moments, state_model, fit_engaged_exit=not held)
+    print("Simulation fit in %.1f s (%d simulations), chi square %.1f over %d bins" %
+          (time.time() - start, moments.calls, value, len(moments.target)))
+    print("Chi square by time limit: %s" % ", ".join("%d: %.1f" % pair for pair in profile))
+    print_fit(state_model, observations, moments.simulate(state_model).summary(),
+              held=held, truth=truth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov  2 14:02:51 2026
+
+@author: DavidCreech
+
+The dealer's CRM.  Every customer who leaves is kept as a Contact, and some
+of them come back days later for another visit, asking for the salesperson
+who helped them last time.  Customers who were helped also get a follow up
+call, which brings some of them back sooner.
+
+Return visits and follow up calls are timers on a timingWheel.TimingWheel,
+so a CRM with millions of contacts waiting to come back costs the same per
+visit as one with a handful.
+
+    python crm.py --days 30      # a month with return visits
+"""
+import time
+import argparse
+from random import random, expovariate
+
+from Dealership import DAY
+from timingWheel import TimingWheel
+
+
+class Contact(object):
+    # One per person who ever walked in, kept small as there can be millions
+    __slots__ = ("contact_id", "preferences", "salesPerson_id", "visits",
+                 "return_timer", "follow_up_timer")
+
+    def __init__(self, contact_id):
+        self.contact_id = contact_id
+        self.preferences = None
+        self.salesPerson_id = None # Who helped them last
+        self.visits = 0
+        self.return_timer = None
+        self.follow_up_timer = None
+
+
+class Crm(object):
+    def __init__(self, dealership, return_chance=0.3, mean_return_days=7.0,
+                 follow_up_days=1.0, follow_up_success=0.5, resolution=60.0):
+        self.dealership = dealership
+        self.return_chance = return_chance # Chance a customer ever comes back
+        self.mean_return_days = mean_return_days
+        self.follow_up_days = follow_up_days # None for no follow up calls
+        self.follow_up_success = follow_up_success # Chance a call moves the visit up
+
+        # Visits only need to land within the minute
+        self.wheel = TimingWheel(resolution, dealership.elapsedTime)
+        self.contacts = {}
+        self.contact_id = 0
+        self.returns = 0
+        self.follow_ups = 0
+
+    def __len__(self):
+        # Return visits and calls still to come
+        return len(self.wheel)
+
+    def remember(self, customer):
+        """Called as a customer leaves the dealership."""
+        contact = customer.contact
+        if contact is None:
+            contact = customer.contact = Contact(self.contact_id)
+            self.contacts[self.contact_id] = contact
+            self.contact_id += 1
+        contact.visits += 1
+        contact.preferences = customer.preferences
+        if customer.helped_by is not None:
+            contact.salesPerson_id = customer.helped_by.id
+
+        now = self.dealership.elapsedTime
+        if random() < self.return_chance:
+            days = expovariate(1.0 / self.mean_return_days)
+            contact.return_timer = self.wheel.schedule(now + days * DAY,
+                                                       self.walk_in, contact)
+            if customer.was_helped and self.follow_up_days is not None:
+                contact.follow_up_timer = self.wheel.schedule(
+                    now + self.follow_up_days * DAY, self.follow_up, contact)
+
+    def follow_up(self, contact):
+        # The salesperson calls.  Some customers move their visit up to
+        #  sometime in the next day or so
+        contact.follow_up_timer = None
+        self.follow_ups += 1
+        if contact.return_timer is not None and random() < self.follow_up_success:
+            self.wheel.cancel(contact.return_timer)
+            contact.return_timer = self.wheel.schedule(
+                self.dealership.elapsedTime + expovariate(1.0) * DAY,
+                self.walk_in, contact)
+
+    def next_opening(self, now):
+        # Some time while the showroom is open, after now
+        opening, closing = self.dealership.open_hours
+        day_start = now - now % DAY
+        if now % DAY >= opening:
+            day_start += DAY
+        return day_start + opening + random() * (closing - opening)
+
+    def walk_in(self, contact):
+        dlr = self.dealership
+        contact.return_timer = None
+        if not dlr.is_open(dlr.elapsedTime):
+            contact.return_timer = self.wheel.schedule(
+                self.next_opening(dlr.elapsedTime), self.walk_in, contact)
+            return
+        if contact.follow_up_timer is not None:
+            # No need to call someone who's already here
+            self.wheel.cancel(contact.follow_up_timer)
+            contact.follow_up_timer = None
+        customer = dlr.new_customer()
+        customer.contact = contact
+        customer.preferences = contact.preferences
+        customer.preferred_sp = dlr.salesPeople.get(contact.salesPerson_id)
+        customer.brain.set_state("shopping")
+        dlr.add_customer(customer)
+        self.returns += 1
+
+    def advance(self, time_passed):
+        self.wheel.advance(time_passed)
+
+
+def main():
+    from headlessSim import run_headless
+
+    parser = argparse.ArgumentParser(description="Run the dealership with return visits")
+    parser.add_argument("--days", type=float, default=30)
+    parser.add_argument("--salespeople", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.time()
+    kpis = run_headless(args.days * DAY, seed=args.seed, pooled=True, crm=True,
+                        salesPeople_count=args.salespeople)
+    took = time.time() - start
+    for name in sorted(kpis):
+        print("%-14s %s" % (name, kpis[name]))
+    print("%.1f s for %g days" % (took, args.days))
+
+
+if __name__ == "__main__":
+    main()
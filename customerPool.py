@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 09:05:27 2026
+
+@author: DavidCreech
+
+Recycles customers instead of building a new one (plus its brain and four
+states) for every arrival and throwing it away when they leave.
+
+A customer who leaves is not reused straight away: salespeople act after the
+customers, and one walking up to that customer still holds a reference until
+it sees them gone.  Departed customers wait in pending until the end of the
+current Dealership.process pass and only then become free for reuse.
+
+    python customerPool.py      # throughput with and without the pool
+"""
+import gc
+import time
+
+from Dealership import DAY
+from Customers import newVehicleCustomer
+
+
+class CustomerPool(object):
+    def __init__(self, dealership):
+        self.dealership = dealership
+        self.free = []
+        self.pending = []
+        self.created = 0 # How many customers were actually constructed
+        self.reused = 0
+
+    def acquire(self):
+        # Hands out a customer ready to walk in, recycling one if possible
+        if self.free:
+            customer = self.free.pop()
+            customer.reset()
+            self.reused += 1
+        else:
+            customer = newVehicleCustomer(self.dealership, "image")
+            self.created += 1
+        return customer
+
+    def release(self, customer):
+        self.pending.append(customer)
+
+    def recycle(self):
+        # Called once every agent has acted for this pass
+        if self.pending:
+            self.free.extend(self.pending)
+            del self.pending[:]
+
+
+def tune_gc(threshold=None, freeze=False):
+    """
+    GC hook for long runs.  With the pool in place almost nothing the sim
+    allocates is garbage, so the generation 0 threshold can be raised to make
+    collections rarer.  freeze moves everything allocated so far out of the
+    collector's view (Python 3.7+ only).  Returns the previous thresholds and
+    whether it froze, to be handed to restore_gc.
+    """
+    previous = gc.get_threshold()
+    if threshold is not None:
+        gc.set_threshold(*threshold)
+    froze = freeze and hasattr(gc, "freeze")
+    if froze:
+        gc.freeze()
+    return previous, froze
+
+
+def restore_gc(settings):
+    # Only unfreezes what tune_gc froze, a caller may have frozen its own heap
+    previous, froze = settings
+    gc.set_threshold(*previous)
+    if froze:
+        gc.unfreeze()
+
+
+def benchmark_lifecycle(dealership, visits=100000):
+    """Seconds to put visits customers through walk in and walk out."""
+    start = time.time()
+    for visit in range(visits):
+        customer = newVehicleCustomer(dealership, "image")
+        customer.brain.active_state = customer.shopping_state
+    built = time.time() - start
+
+    pool = CustomerPool(dealership)
+    start = time.time()
+    for visit in range(visits):
+        customer = pool.acquire()
+        customer.brain.active_state = customer.shopping_state
+        pool.release(customer)
+        pool.recycle()
+    return built, time.time() - start
+
+
+def benchmark(duration=DAY, arrival_chance=0.9, salespeople=4):
+    """
+    Steady-state simulated seconds per wall second over a busy day, with and
+    without the pool.  Without it every departed customer stays reachable
+    from left_customers, so each full collection has more to walk the longer
+    the run goes.
+    """
+    from headlessSim import run_headless
+
+    results = []
+    for label, options in (("new objects", dict(pooled=False)),
+                           ("pooled", dict(pooled=True)),
+                           ("pooled + gc", dict(pooled=True,
+                                                gc_threshold=(50000, 20, 20)))):
+        start = time.time()
+        run_headless(duration, seed=0, arrival_chance=arrival_chance,
+                     salesPeople_count=salespeople, **options)
+        results.append((label, duration / (time.time() - start)))
+    return results
+
+
+if __name__ == "__main__":
+    from Dealership import Dealership
+
+    built, recycled = benchmark_lifecycle(Dealership(salesPeople_count=0,
+                                                     customer_count=0))
+    print("Walk in / walk out: %.2f us new, %.2f us pooled" %
+          (built * 10, recycled * 10))
+    for label, speed in benchmark():
+        print("%-12s %10.0f sim seconds / second" % (label, speed))
@@ -4,11 +4,16 @@ Created on Sat May 28 12:20:14 2016
 
 @author: DavidCreech
 """
+from __future__ import print_function
+
+import argparse
+
 import pygame
 
-pygame.init()
-        
-from Dealership import *
+from Dealership import Dealership
+from hud import Hud
+from frameOverlay import FrameOverlay
+from uiProfile import Phases, SessionProfiler, add_arguments
 from datetime import datetime
 
 black = (  0,   0,   0)
@@ -17,8 +22,8 @@ blue =  (  0,   0, 255)
 green = (  0, 255,   0)
 red =   (255,   0,   0)
 
-if not pygame.font: print 'Warning, fonts disabled'
-if not pygame.mixer: print 'Warning, sound disabled'
+if not pygame.font: print('Warning, fonts disabled')
+if not pygame.mixer: print('Warning, sound disabled')
 
 class DealershipSim:
     """The Main PyMan Class - This class handles the main 
@@ -40,42 +45,11 @@ class DealershipSim:
         
         self.paused = False
         
-    def printInfo(self, label, value, xlocation, ylocation, debug = False):
-         """
-         Prints information about what is currently going on in the dealership 
-         """               
-         self.screen.blit(self.background, (0, 0))     
-         if pygame.font:
-            font = pygame.font.Font(None, 20)
-            text = font.render(label + " %s" % value
-                                , 1, (255, 0, 0))
-            textpos = text.get_rect(left = xlocation, bottom = ylocation)
-            self.screen.blit(text, textpos)
-            pygame.display.update(textpos)
-            if debug:
-                print label, value, xlocation, ylocation    
-                
-    def text_objects(self, text, font):
-        textSurface = font.render(text, True, black)
-        return textSurface, textSurface.get_rect()
+        # Time spent in each part of a frame, and the simulated second to 
+        #  quit at (for --profile)
+        self.phases = Phases()
+        self.stop_at = None
         
-    def button(self, msg,x,y,w,h,action=None):
-        mouse = pygame.mouse.get_pos()
-        click = pygame.mouse.get_pressed()
-        #print(click)
-        if x+w > mouse[0] > x and y+h > mouse[1] > y:
-            pygame.draw.rect(self.screen, blue,(x,y,w,h))
-    
-            if click[0] == 1 and action != None:
-                action()         
-        else:
-            pygame.draw.rect(self.screen, green, (x,y,w,h))
-    
-        smallText = pygame.font.SysFont("comicsansms",20)
-        textSurf, textRect = self.text_objects(msg, smallText)
-        textRect.center = ( (x+(w/2)), (y+(h/2)) )
-        self.screen.blit(textSurf, textRect)            
-
     def pause(self):
         if self.paused == True:
             self.paused = False
@@ -90,30 +64,53 @@ class DealershipSim:
         self.background = pygame.Surface(self.screen.get_size())
         self.background = self.background.convert()
         self.background.fill((0,0,0))
+        self.screen.blit(self.background, (0, 0))
+        pygame.display.flip()
+        
+        """ The HUD only redraws what changed, see hud.py """
+        self.hud = Hud(self.screen, self.background)
+        self.hud.add_button("pause", "Pause Game", 0, 0, 200, 100, self.pause)
+        self.hud.add_label("time", "Elapsed Time", 0, self.height)
+        self.hud.add_label("customers", "Customers in Store", 0, self.height - 20)
+        self.hud.add_label("idle", "Customers idling", 0, self.height - 40)
+        self.hud.add_label("shopping", "Customers shopping", 0, self.height - 60)
+        self.hud.add_label("paused", "The simulation is", 0, self.height - 80)
+        self.hud.set("paused", "paused")
+        
+        """ Frame times per phase, F3 shows and hides it, see frameOverlay.py """
+        self.overlay = FrameOverlay(self.phases, (self.width - 250, 10))
+        
+        clock = pygame.time.Clock()
+        phase = self.phases.phase
         
         running = True
         while running:
 
             """ Section for handleing exiting the game """
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        print "Exiting game..."
+            with phase("events"):
+                for event in pygame.event.get():
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            print("Exiting game...")
+                            running = False
+                            break
+                        if event.key == pygame.K_F3:
+                            self.overlay.toggle()
+                    if event.type == pygame.QUIT:
+                        print("Quiting")
                         running = False
                         break
-                if event.type == pygame.QUIT:
-                    print "Quiting"
-                    running = False
-                    break
-            if (self.paused == False):
-                pauseText = "Pause Game"
-            else:
-                pauseText = "Unpause Game"
-                
-            self.button(pauseText, 0, 0, 200, 100, self.pause)            
+                if (self.paused == False):
+                    pauseText = "Pause Game"
+                else:
+                    pauseText = "Unpause Game"
+                    
+                self.hud.buttons["pause"].set_text(pauseText)
+                self.hud.poll()
             # Keep track of how much time has elapsed for timer purposes
             #self.elapsedTime += self.waitTime * 0.001
-            dlr.clock.tick(20)
+            with phase("wait"):
+                clock.tick(20)
 
             """ 
             Here is the main loop where all actions will take place
@@ -125,22 +122,43 @@ class DealershipSim:
                 
                 dlr.elapsedTime += 1.0/20
                 # Run Game Actions
-                dlr.dealershipActions(dlr.elapsedTime)
+                with phase("sim"):
+                    dlr.dealershipActions(dlr.elapsedTime)
                 
-                # Update Display         
-                pygame.display.flip()
-                self.printInfo("Elapsed Time", int(dlr.elapsedTime), 0, self.height);
-                self.printInfo("Customers in Store", len(dlr.customers), 0, self.height - 20);
-                self.printInfo("Customers idling", dlr.idle, 0, self.height - 40);
-                self.printInfo("Customers shopping", dlr.shopping, 0, self.height - 60);
-                
-                #pygame.display.flip()
-            else:
-                self.printInfo("The simulation is", "paused", 0, self.height-80);
+                with phase("ui"):
+                    self.hud.set("time", int(dlr.elapsedTime))
+                    self.hud.set("customers", len(dlr.customers))
+                    self.hud.set("idle", dlr.idle)
+                    self.hud.set("shopping", dlr.shopping)
+                if self.stop_at is not None and dlr.elapsedTime >= self.stop_at:
+                    running = False
+            self.hud.labels["paused"].show(self.paused)
+            
+            # Update Display, only the parts of the HUD that changed
+            with phase("render"):
+                self.hud.update()
+                rect = self.overlay.draw(self.screen, self.background)
+                if rect is not None:
+                    pygame.display.update(rect)
+            self.overlay.end_frame()
             
         pygame.quit()    
         
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dealership simulation window")
+    add_arguments(parser)
+    args = parser.parse_args()
+    
     MainWindow = DealershipSim()
-    MainWindow.MainLoop()   
\ No newline at end of file
+    if args.profile is None:
+        MainWindow.MainLoop()
+    else:
+        MainWindow.stop_at = args.profile * 60
+        profiler = SessionProfiler(MainWindow.phases, args.profiler)
+        profiler.start()
+        MainWindow.MainLoop()
+        profiler.stop()
+        profiler.report()
+        for path in profiler.write(args.profile_out or "profile_dealershipSim"):
+            print("Wrote", path)   
\ No newline at end of file
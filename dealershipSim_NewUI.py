@@ -1,5 +1,5 @@
 #!/usr/bin/env python
-from __future__ import division
+from __future__ import division, print_function
 
 #Interphase - Copyright (C) 2009 James Garnon <http://gatc.ca/>
 #Released under the MIT License <http://opensource.org/licenses/MIT>
@@ -14,8 +14,11 @@ from __future__ import division
 import interphase
 import pygame
 import random
+import argparse
 
-from Dealership import *
+from Dealership import Dealership
+from uiProfile import Phases, SessionProfiler, add_arguments
+from frameOverlay import FrameOverlay
 
 __docformat__ = 'restructuredtext'
 
@@ -29,6 +32,10 @@ class dealershipSim_NewUI(interphase.Interface):
     """
 
     def __init__(self):
+        # Time spent in each part of a frame, and the simulated second to 
+        #  quit at (for --profile)
+        self.phases = Phases()
+        self.stop_at = None
         self.pygame_initiate()
         interphase.Interface.__init__(self, position=(250,450), color=(43,50,58), size=(400,400), moveable=False, position_offset=(0,95), control_minsize=(25,25), control_size='auto', font_color=(175,180,185), tips_fontcolor=(175,180,185), scroll_button='both')
         self.dealership_initiate()
@@ -88,6 +95,8 @@ class dealershipSim_NewUI(interphase.Interface):
         self.screen = pygame.display.set_mode((500,500))
         self.background = pygame.Surface((500,500))
         self.clock = pygame.time.Clock()
+        self.sim_clock = pygame.time.Clock() # Paces the simulation at 20 steps a second
+        self.overlay = FrameOverlay(self.phases, (10, 10)) # F3, see frameOverlay.py
         pygame.display.flip()
 
     def dealership_initiate(self):
@@ -107,9 +116,12 @@ class dealershipSim_NewUI(interphase.Interface):
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     terminate = True
+                elif event.key == pygame.K_F3:
+                    self.overlay.toggle()
             elif event.type == pygame.QUIT:
                 terminate = True
-        self.clock.tick(40)
+        with self.phases.phase("wait"):
+            self.clock.tick(40)
         return terminate
 
     def pause(self):
@@ -121,7 +133,7 @@ class dealershipSim_NewUI(interphase.Interface):
     def updateCustomerAttributes(self, dlr, state):
         customerList = dlr.customers
         customerListString = ' '.join(map(str, customerList)) # Converts list to string
-        print customerListString
+        print(customerListString)
         debugOutput = state.controls['agent_type_select'].get_value()
         state.controls['InfoBox'].set_value(debugOutput)
 
@@ -154,7 +166,7 @@ class dealershipSim_NewUI(interphase.Interface):
             state.controls['agent_select'].set_list(agentList)
             self.showCustomerAttributes(dlr, state)
         elif state.controls['agent_type_select'].get_value() == "Salesperson":
-            agentList = range(0, len(dlr.salesPeople))
+            agentList = list(range(0, len(dlr.salesPeople)))
             state.controls['agent_select'].set_list(agentList)
             self.showSalespersonAttributes(dlr, state)
     
@@ -175,45 +187,72 @@ class dealershipSim_NewUI(interphase.Interface):
             value:              Control value
             values:             Panel control values
         """
-        dlr.clock.tick(20)
-        state = interphase.Interface.update(self)
-        if state.control:
-            print "state.control", state.control
-            if state.control == "PauseGame":
-                self.pause()
-            #elif state.control == "ShowCustomerAttributes":
-            #    self.updateCustomerAttributes(dlr, state)
-            elif state.control in ("agent_type_select", "agent_select"):
-                self.updateAgentList(dlr, state)
+        phase = self.phases.phase
+        with phase("wait"):
+            self.sim_clock.tick(20)
+        with phase("ui"):
+            state = interphase.Interface.update(self)
+            if state.control:
+                print("state.control", state.control)
+                if state.control == "PauseGame":
+                    self.pause()
+                #elif state.control == "ShowCustomerAttributes":
+                #    self.updateCustomerAttributes(dlr, state)
+                elif state.control in ("agent_type_select", "agent_select"):
+                    self.updateAgentList(dlr, state)
             
-        if self.pygame_check():
-            self.deactivate()
+        with phase("events"):
+            if self.pygame_check():
+                self.deactivate()
         if self.paused == False:
             dlr.elapsedTime += 1.0/20
             #self.get_control("InfoBox").set_
-            dlr.dealershipActions(dlr.elapsedTime)
+            with phase("sim"):
+                dlr.dealershipActions(dlr.elapsedTime)
+            if self.stop_at is not None and dlr.elapsedTime >= self.stop_at:
+                self.deactivate()
         return state
         
-def run():
-    panel = dealershipSim_NewUI()
+def run(panel=None):
+    panel = panel or dealershipSim_NewUI()
     dlr = Dealership()
     
     run_demo = True
     while run_demo:
         panel.update(dlr)
         if panel.is_active():
-            if panel.is_update():
-                panel.clear(panel.screen,panel.background)
-                panel.update_rect.extend( panel.draw(panel.screen) )
-            if panel.update_rect:
-                pygame.display.update(panel.update_rect)
-                panel.update_rect = []
+            with panel.phases.phase("render"):
+                if panel.is_update():
+                    panel.clear(panel.screen,panel.background)
+                    panel.update_rect.extend( panel.draw(panel.screen) )
+                rect = panel.overlay.draw(panel.screen, panel.background)
+                if rect is not None:
+                    panel.update_rect.append(rect)
+                if panel.update_rect:
+                    pygame.display.update(panel.update_rect)
+                    panel.update_rect = []
+            panel.overlay.end_frame()
         else:
             run_demo = False
     pygame.quit()   
 
 def main():
-    run()
+    parser = argparse.ArgumentParser(description="Dealership simulation with the interphase panel")
+    add_arguments(parser)
+    args = parser.parse_args()
+    
+    panel = dealershipSim_NewUI()
+    if args.profile is None:
+        run(panel)
+        return
+    panel.stop_at = args.profile * 60
+    profiler = SessionProfiler(panel.phases, args.profiler)
+    profiler.start()
+    run(panel)
+    profiler.stop()
+    profiler.report()
+    for path in profiler.write(args.profile_out or "profile_dealershipSim_NewUI"):
+        print("Wrote", path)
 
 if __name__ == '__main__':
     main()
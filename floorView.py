@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 27 10:03:35 2026
+
+@author: DavidCreech
+
+Draws the showroom floor and the people on it.
+
+The tiles never change, so they are baked once into a background surface.
+Every customer and salesperson is a DirtySprite in a LayeredDirty group and
+only gets redrawn when it moves or changes state, with the group clearing
+from the baked background, so a frame only touches the regions that changed.
+Sprites of the same kind and state share one image.  Agents are drawn in
+their floor plan cell when the dealership has one (see flowField).
+
+    python floorView.py --speed 60      # 60 simulated seconds per frame
+"""
+import argparse
+
+import pygame
+
+import StartingDealership
+
+TILE = 64   # Pixels per layout cell
+AGENT = 12  # Pixels across an agent
+SLOTS = 4   # Agents per row within a tile
+
+CUSTOMER_COLORS = {
+    "shopping": (  0, 200,   0),
+    "idle":     (150, 150, 150),
+    "engaged":  (255, 200,   0),
+    "left":     ( 60,  60,  60),
+}
+SALESPERSON_COLORS = {
+    "idle":     (  0, 100, 255),
+    "near_by":  (  0, 220, 255),
+    "helping":  (255,   0, 255),
+    "off_duty": ( 40,  40, 100),
+}
+
+
+class AgentSprite(pygame.sprite.DirtySprite):
+    def __init__(self, image, position):
+        pygame.sprite.DirtySprite.__init__(self)
+        self.image = image
+        self.rect = image.get_rect(center=position)
+
+    def show(self, image, position):
+        # Only flags the sprite for redraw when something visible changed
+        if image is not self.image:
+            self.image = image
+            self.dirty = 1
+        if self.rect.center != position:
+            self.rect.center = position
+            self.dirty = 1
+
+
+class FloorView(object):
+    def __init__(self, level=None, tile=TILE):
+        self.level = level or StartingDealership.level()
+        self.layout = self.level.getLayout()
+        self.tile = tile
+        self.size = (len(self.layout[0]) * tile, len(self.layout) * tile)
+
+        # Tiles agents can stand on, in reading order
+        self.walkable = [(column, row)
+                         for row, cells in enumerate(self.layout)
+                         for column, cell in enumerate(cells)
+                         if cell in (self.level.PELLET, self.level.SNAKE)]
+
+        self.images = {}        # (kind, state) -> shared agent image
+        self.agent_sprites = {} # agent -> AgentSprite
+        self.sprites = pygame.sprite.LayeredDirty()
+        self.background = None
+
+    def bake(self):
+        """Draws every tile once into the background.  Needs a display mode set."""
+        tiles = self.level.getSprites()
+        scaled = {}
+        for code, image in tiles.items():
+            scaled[code] = pygame.transform.scale(image, (self.tile, self.tile))
+        self.background = pygame.Surface(self.size).convert()
+        for row, cells in enumerate(self.layout):
+            for column, cell in enumerate(cells):
+                self.background.blit(scaled[cell], (column * self.tile, row * self.tile))
+        return self.background
+
+    def agent_image(self, kind, state):
+        key = (kind, state)
+        image = self.images.get(key)
+        if image is None:
+            colors = CUSTOMER_COLORS if kind == "Customer" else SALESPERSON_COLORS
+            image = pygame.Surface((AGENT, AGENT)).convert()
+            image.fill((0, 0, 0))
+            image.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            pygame.draw.circle(image, colors.get(state, (255, 255, 255)),
+                               (AGENT // 2, AGENT // 2), AGENT // 2)
+            if kind != "Customer":
+                pygame.draw.circle(image, (255, 255, 255),
+                                   (AGENT // 2, AGENT // 2), AGENT // 2, 1)
+            self.images[key] = image
+        return image
+
+    def agent_position(self, agent, index):
+        # Agents on a floor plan stand in their own cell, spread over a few 
+        #  slots so people sharing a cell stay visible.  Without a floor plan
+        #  they get a slot on a walkable tile: customers spread across the 
+        #  floor, salespeople from the end
+        step = self.tile // SLOTS
+        if agent.position is not None:
+            column = agent.position % len(self.layout[0])
+            row = agent.position // len(self.layout[0])
+            slot = index % (SLOTS * SLOTS)
+            return (column * self.tile + (slot % SLOTS) * step + step // 2,
+                    row * self.tile + (slot // SLOTS) * step + step // 2)
+        spots = len(self.walkable) * SLOTS * SLOTS
+        if agent.name != "Customer":
+            index = spots - 1 - index
+        index %= spots
+        column, row = self.walkable[index // (SLOTS * SLOTS)]
+        slot = index % (SLOTS * SLOTS)
+        return (column * self.tile + (slot % SLOTS) * step + step // 2,
+                row * self.tile + (slot // SLOTS) * step + step // 2)
+
+    def sync(self, dlr):
+        """Brings the sprites in line with the agents in the dealership."""
+        live = set()
+        for layer, agents in ((1, dlr.customers), (2, dlr.salesPeople)):
+            for agent_id, agent in agents.items():
+                state = agent.brain.active_state
+                image = self.agent_image(agent.name, state.name if state else None)
+                position = self.agent_position(agent, agent_id)
+                sprite = self.agent_sprites.get(agent)
+                if sprite is None:
+                    sprite = self.agent_sprites[agent] = AgentSprite(image, position)
+                    self.sprites.add(sprite, layer=layer)
+                else:
+                    sprite.show(image, position)
+                live.add(agent)
+
+        for agent in list(self.agent_sprites):
+            if agent not in live:
+                self.agent_sprites.pop(agent).kill()
+
+    def draw(self, screen):
+        """Draws the changed sprites and returns the dirty rectangles."""
+        if self.background is None:
+            self.bake()
+            screen.blit(self.background, (0, 0))
+            self.sprites.clear(screen, self.background)
+            return [screen.get_rect()]
+        return self.sprites.draw(screen)
+
+
+def main():
+    from Dealership import Dealership
+    from customerPool import CustomerPool
+    from flowField import FloorPlan
+    from headlessSim import muted
+
+    parser = argparse.ArgumentParser(description="Watch the showroom floor")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="simulated seconds per frame")
+    parser.add_argument("--salespeople", type=int, default=4)
+    parser.add_argument("--arrival-chance", type=float, default=0.2)
+    parser.add_argument("--fps", type=int, default=60)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    view = FloorView()
+    screen = pygame.display.set_mode(view.size)
+    clock = pygame.time.Clock()
+
+    with muted():
+        dlr = Dealership(salesPeople_count=args.salespeople,
+                         floor=FloorPlan.for_level(view.level))
+    dlr.arrival_chance = args.arrival_chance
+    dlr.customer_pool = CustomerPool(dlr)
+
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and
+                                             event.key == pygame.K_ESCAPE):
+                running = False
+        with muted():
+            target = dlr.elapsedTime + args.speed
+            while dlr.elapsedTime < target:
+                dlr.elapsedTime += min(1.0, args.speed)
+                dlr.dealershipActions(dlr.elapsedTime)
+        view.sync(dlr)
+        pygame.display.update(view.draw(screen))
+        clock.tick(args.fps)
+        pygame.display.set_caption("Dealership floor - %d agents, %.0f fps" %
+                                   (len(view.agent_sprites), clock.get_fps()))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 28 09:41:20 2026
+
+@author: DavidCreech
+
+Grid movement on the showroom layout.
+
+For every cell someone walks toward, a breadth first search from that cell
+gives the distance of every other cell, and from it a flow field: for each
+cell, the neighbouring cell one step closer.  Both are NumPy arrays and are
+kept for the life of the layout, so moving an agent is one array lookup
+(next_cell[position]) and moving a whole array of agents is one fancy index.
+
+Positions are flat cell numbers, row * width + column.
+"""
+import random
+from collections import deque
+
+import numpy as np
+
+UNREACHABLE = np.iinfo(np.int32).max
+
+_plans = {}
+
+
+def distance_field(walkable, target):
+    """Steps from every cell to target (a (row, column) pair) by BFS."""
+    height, width = walkable.shape
+    distance = np.full((height, width), UNREACHABLE, dtype=np.int32)
+    distance[target] = 0
+    frontier = deque([target])
+    while frontier:
+        row, column = frontier.popleft()
+        steps = distance[row, column] + 1
+        for r, c in ((row - 1, column), (row + 1, column),
+                     (row, column - 1), (row, column + 1)):
+            if (0 <= r < height and 0 <= c < width and walkable[r, c]
+                    and distance[r, c] == UNREACHABLE):
+                distance[r, c] = steps
+                frontier.append((r, c))
+    return distance
+
+
+def flow_field(distance):
+    """For each cell, the flat number of the neighbour closest to the target."""
+    height, width = distance.shape
+    cells = np.arange(height * width).reshape(height, width)
+    best = distance.copy()
+    next_cell = cells.copy()
+
+    padded_distance = np.pad(distance, 1, mode="constant", constant_values=UNREACHABLE)
+    padded_cells = np.pad(cells, 1, mode="constant", constant_values=-1)
+    for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+        neighbour_distance = padded_distance[1 + dr:1 + dr + height, 1 + dc:1 + dc + width]
+        neighbour_cells = padded_cells[1 + dr:1 + dr + height, 1 + dc:1 + dc + width]
+        closer = neighbour_distance < best
+        best = np.where(closer, neighbour_distance, best)
+        next_cell = np.where(closer, neighbour_cells, next_cell)
+    return next_cell.ravel()
+
+
+class FloorPlan(object):
+    """
+    A layout plus the flow fields toward each cell.  Fields for the named
+    places (door, desks, vehicles) are built up front, any other cell's the
+    first time someone walks toward it.
+    """
+    def __init__(self, layout, floor_codes, locations):
+        self.walkable = np.isin(np.array(layout), floor_codes)
+        self.height, self.width = self.walkable.shape
+        self.places = {}
+        for name, cells in locations.items():
+            self.places[name] = [self.cell(column, row) for column, row in cells]
+
+        self.distances = {}  # target cell -> flat distance array
+        self.next_cells = {} # target cell -> flat flow field
+        for cells in self.places.values():
+            for cell in cells:
+                self.field(cell)
+
+    @classmethod
+    def for_level(cls, level):
+        # One plan per distinct layout, however many dealerships use it
+        layout = level.getLayout()
+        key = tuple(map(tuple, layout))
+        plan = _plans.get(key)
+        if plan is None:
+            plan = _plans[key] = cls(layout, (level.PELLET, level.SNAKE),
+                                     level.getLocations())
+        return plan
+
+    def cell(self, column, row):
+        return row * self.width + column
+
+    def coords(self, cell):
+        # (column, row) of a flat cell number
+        return cell % self.width, cell // self.width
+
+    def field(self, target):
+        next_cell = self.next_cells.get(target)
+        if next_cell is None:
+            column, row = self.coords(target)
+            distance = distance_field(self.walkable, (row, column))
+            next_cell = self.next_cells[target] = flow_field(distance)
+            self.distances[target] = distance.ravel()
+        return next_cell
+
+    def distance(self, start, target):
+        self.field(target)
+        return int(self.distances[target][start])
+
+    def pick(self, place):
+        return random.choice(self.places[place])
+
+    def step(self, agent):
+        """Moves an agent one cell toward its destination."""
+        target = agent.destination
+        target = getattr(target, "position", target) # Following another agent
+        if target is None or agent.position is None:
+            return
+        agent.position = int(self.field(target)[agent.position])
+
+    def step_many(self, positions, target):
+        """One step toward target for a whole array of positions."""
+        return self.field(target)[positions]
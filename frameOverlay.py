@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Nov 19 10:12:47 2026
+
+@author: DavidCreech
+
+A live frame time graph for the pygame windows, toggled with F3 in both
+dealershipSim.py and dealershipSim_NewUI.py.
+
+Each column is one frame, stacked from the bottom in the order the frame
+runs: event polling (pygame_check), the sim step (dealershipActions), the
+panel/HUD update and drawing plus the display flip.  Waiting for the next
+frame is left out, so the bar is the work done and the line across the
+graph is the frame budget at 20 frames a second.  A stall shows up as a
+tall column in the colour of whatever caused it, and a red tick on top when
+it is taller than the graph.
+
+The times come from the same Phases the --profile option uses (uiProfile).
+The last few hundred frames are kept in a ring buffer whether the overlay
+is showing or not, and the graph is a cached surface that is scrolled left
+by however many frames came in since it was last drawn with only the new
+columns painted, so showing it costs one small blit a frame.
+"""
+import pygame
+
+PHASES = ("events", "sim", "ui", "render")
+COLORS = {"events": (70, 130, 230),
+          "sim": (240, 150, 40),
+          "ui": (80, 200, 90),
+          "render": (200, 80, 200)}
+BACKGROUND = (20, 20, 28)
+BUDGET_COLOR = (110, 110, 120)
+CLIPPED_COLOR = (255, 40, 40)
+TEXT_COLOR = (220, 220, 220)
+LINE_HEIGHT = 14
+
+
+class FrameOverlay(object):
+    """
+    Per phase frame times of the last frames, drawn as a scrolling graph.
+    scale is pixels per millisecond and budget the milliseconds the line
+    across the graph marks.
+    """
+    def __init__(self, phases, position=(0, 0), frames=240, height=120,
+                 scale=2.0, budget=50.0, names=PHASES, legend_every=10):
+        self.phases = phases
+        self.names = names
+        self.frames = frames
+        self.height = height
+        self.scale = scale
+        self.budget = budget
+        self.legend_every = legend_every
+        # The ring buffer, a row of milliseconds per phase.  next is the
+        #  column the next frame goes in, which is also the oldest one
+        self.history = [[0.0] * frames for name in names]
+        self.next = 0
+        self.last = [0.0] * len(names) # Phase totals at the end of the last frame
+        self.pending = frames # Frames recorded since the graph was last drawn
+        self.shown = False
+        self.cleared = True # Nothing of the overlay left on screen
+        self.graph = pygame.Surface((frames, height))
+        self.legend = None
+        self.legend_age = 0
+        self.font = None
+        self.rect = pygame.Rect(position, (frames, height + LINE_HEIGHT * len(names)))
+
+    def toggle(self):
+        self.shown = not self.shown
+
+    def end_frame(self):
+        """Records the frame that just finished, call once a frame outside any phase."""
+        totals = self.phases.totals
+        column = self.next
+        for row, name in enumerate(self.names):
+            total = totals.get(name, 0.0)
+            self.history[row][column] = (total - self.last[row]) * 1000.0
+            self.last[row] = total
+        self.next = (column + 1) % self.frames
+        self.pending += 1
+        self.legend_age += 1
+
+    def _paint(self, x, column):
+        # Paints one frame into column x of the graph, bottom up
+        graph = self.graph
+        height = self.height
+        graph.fill(BACKGROUND, (x, 0, 1, height))
+        graph.set_at((x, height - 1 - int(self.budget * self.scale)), BUDGET_COLOR)
+        bottom = height
+        for row, name in enumerate(self.names):
+            size = int(self.history[row][column] * self.scale + 0.5)
+            if size <= 0:
+                continue
+            if size >= bottom:
+                graph.fill(COLORS.get(name, TEXT_COLOR), (x, 0, 1, bottom))
+                graph.fill(CLIPPED_COLOR, (x, 0, 1, 2))
+                break
+            bottom -= size
+            graph.fill(COLORS.get(name, TEXT_COLOR), (x, bottom, 1, size))
+
+    def _catch_up(self):
+        # Scrolls the cached graph by the frames that came in since it was
+        #  last drawn and paints just those (all of it after a long gap)
+        new = min(self.pending, self.frames)
+        self.pending = 0
+        if new == 0:
+            return
+        if new < self.frames:
+            self.graph.scroll(-new, 0)
+        for x in range(self.frames - new, self.frames):
+            self._paint(x, (self.next + x) % self.frames)
+
+    def _render_legend(self):
+        # Mean and worst milliseconds per phase over the buffer
+        if self.font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.font = pygame.font.Font(None, LINE_HEIGHT + 2)
+        legend = self.legend
+        if legend is None:
+            legend = self.legend = pygame.Surface((self.frames, LINE_HEIGHT * len(self.names)))
+        legend.fill(BACKGROUND)
+        for row, name in enumerate(self.names):
+            times = self.history[row]
+            y = row * LINE_HEIGHT
+            legend.fill(COLORS.get(name, TEXT_COLOR), (2, y + 3, 8, 8))
+            text = "%-7s %5.1f ms  max %5.1f" % (name, sum(times) / self.frames, max(times))
+            legend.blit(self.font.render(text, True, TEXT_COLOR), (14, y + 1))
+        self.legend_age = 0
+
+    def draw(self, surface, background):
+        """
+        Blits the overlay, or the background over it once after it's hidden,
+        and returns the rect that changed (None if nothing did).
+        """
+        if not self.shown:
+            if self.cleared:
+                return None
+            surface.blit(background, self.rect, self.rect)
+            self.cleared = True
+            return self.rect
+        self._catch_up()
+        if self.legend is None or self.legend_age >= self.legend_every:
+            self._render_legend()
+        surface.blit(self.graph, self.rect)
+        surface.blit(self.legend, (self.rect.left, self.rect.top + self.height))
+        self.cleared = False
+        return self.rect
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:40:02 2026
+
+@author: DavidCreech
+
+Runs the dealership without a window, as fast as the CPU allows.
+
+run_headless runs one simulation and returns its KPIs.  run_many runs a list
+of configurations over a process pool, which is what the optimizers use to
+try lots of scenarios at once.
+"""
+import sys
+import math
+import random
+import contextlib
+import multiprocessing
+
+from Dealership import Dealership, DAY
+from shiftSchedule import ShiftScheduler
+from customerPool import CustomerPool, tune_gc, restore_gc
+from crm import Crm
+import StartingDealership
+
+WEEK = 7 * DAY
+
+_inventories = {}
+
+
+class _Mute(object):
+    # Swallows the play-by-play the agents print so headless runs stay quiet
+    def write(self, text):
+        pass
+
+    def flush(self):
+        pass
+
+
+@contextlib.contextmanager
+def muted(quiet=True):
+    # Silences the agents for the duration of a with block (if quiet)
+    if not quiet:
+        yield
+        return
+    stdout = sys.stdout
+    sys.stdout = _Mute()
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+
+
+def percentile(values, q):
+    # Nearest-rank percentile, q between 0 and 100
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = int(round(q / 100.0 * (len(ordered) - 1)))
+    return ordered[rank]
+
+
+def summarize(dlr):
+    """Key numbers from a finished run."""
+    wait_times = dlr.wait_times
+    visits = dlr.served + dlr.abandoned
+    kpis = {
+        "sim_time": dlr.elapsedTime,
+        "customers": dlr.customer_id,
+        "served": dlr.served,
+        "abandoned": dlr.abandoned,
+        "abandon_rate": dlr.abandoned / float(visits) if visits else 0.0,
+        "wait_mean": sum(wait_times) / float(len(wait_times)) if wait_times else 0.0,
+        "wait_p95": percentile(wait_times, 95),
+        "in_store": len(dlr.customers),
+        "utilization": (dlr.busy_samples / float(dlr.staff_samples)
+                        if dlr.staff_samples else 0.0),
+        "returns": dlr.crm.returns if dlr.crm is not None else 0,
+    }
+    if dlr.visit_log is not None:
+        kpis["visits"] = dlr.visit_log
+    return kpis
+
+
+def load_inventory(inventory):
+    # Inventories given by path are loaded once per process
+    if inventory is None or not isinstance(inventory, str):
+        return inventory
+    loaded = _inventories.get(inventory)
+    if loaded is None:
+        from inventory import Inventory # Needs NumPy
+        loaded = _inventories[inventory] = Inventory.load(inventory)
+    return loaded
+
+
+def build_dealership(salesPeople_count=1, roster=None, open_hours=None, days=1,
+                     arrival_chance=0.2, pooled=False, floor=False,
+                     inventory=None, crm=False, trace=None, state_model=None,
+                     visit_log=False, routing=False):
+    """
+    Sets up a dealership for a run, staffed from the roster if given.  floor
+    puts everyone on the StartingDealership layout.  inventory is an
+    inventory.Inventory or the path of a file to load one from.  crm brings
+    departed customers back for return visits.  trace replays walk-ins from
+    a file (see traceArrivals) instead of rolling against arrival_chance.
+    state_model replaces the customers' default Customers.StateModel and
+    visit_log keeps (seconds, was helped, seconds engaged) for every visit.
+    routing gives the salespeople random skills and routes customers to them
+    by need (see routing).
+    """
+    if roster is not None:
+        salesPeople_count = 0
+    plan = None
+    if floor:
+        from flowField import FloorPlan # Needs NumPy
+        plan = FloorPlan.for_level(StartingDealership.level())
+    dlr = Dealership(salesPeople_count=salesPeople_count, floor=plan)
+    if pooled:
+        dlr.customer_pool = CustomerPool(dlr)
+    dlr.inventory = load_inventory(inventory)
+    if state_model is not None:
+        dlr.state_model = state_model
+    if visit_log:
+        dlr.visit_log = []
+    if crm:
+        dlr.crm = Crm(dlr)
+    if trace is not None:
+        from traceArrivals import TraceArrivals
+        dlr.arrival_source = TraceArrivals(trace)
+    dlr.open_hours = open_hours
+    dlr.arrival_chance = arrival_chance
+    if roster is not None:
+        ShiftScheduler(dlr, roster, days).start()
+    if routing:
+        from routing import Router, assign_skills
+        dlr.router = Router(dlr)
+        assign_skills(dlr.salesPeople.values())
+        # start_game has already let the first customers in
+        for customer in list(dlr.customers.values()):
+            dlr.update_waiting(customer)
+    return dlr
+
+
+def advance(dlr, until, step=1.0):
+    # Steps the dealership forward until its clock reaches until
+    while dlr.elapsedTime < until:
+        dlr.elapsedTime += step
+        dlr.dealershipActions(dlr.elapsedTime)
+
+
+def catch_up(dlr, until):
+    # Moves the clock to until, running whatever was scheduled on the way at
+    #  the second advance would have run it, but letting no one in and not
+    #  waking the agents
+    while dlr.events and dlr.events[0][0] <= until:
+        dlr.elapsedTime = max(dlr.elapsedTime, min(until, math.ceil(dlr.events[0][0])))
+        dlr.run_events(dlr.elapsedTime)
+    dlr.elapsedTime = until
+    dlr.last_customer_time = until
+    dlr.run_events(until)
+    if dlr.crm is not None:
+        dlr.crm.advance(until)
+
+
+def fast_forward(dlr, until):
+    """
+    Same as advance, one second at a time, but jumps straight from one
+    walk-in to the next.  The agents only think when someone walks in, so
+    the seconds in between only ever ran events and rolled for an arrival.
+    The gap to the next arrival is drawn from the same geometric
+    distribution those rolls add up to, so a run has the same statistics as
+    advance (not the same numbers for a seed).  An empty showroom skips to
+    opening time, customers finishing up after closing and replayed
+    arrivals are stepped a second at a time.
+    """
+    chance = dlr.arrival_chance
+    while dlr.elapsedTime < until:
+        now = dlr.elapsedTime
+        if not dlr.is_open(now + 1) and not dlr.customers:
+            # Nothing happens in an empty closed showroom until it opens
+            opening = now + 1 - (now + 1) % DAY + dlr.open_hours[0]
+            if opening <= now + 1:
+                opening += DAY
+            catch_up(dlr, min(until, opening - 1))
+            dlr.elapsedTime += 1
+            dlr.dealershipActions(dlr.elapsedTime)
+            continue
+        if (dlr.arrival_source is not None or not 0 < chance < 1
+                or not dlr.is_open(now + 1)):
+            dlr.elapsedTime += 1
+            dlr.dealershipActions(dlr.elapsedTime)
+            continue
+        # Last second before closing, or the end of the run
+        limit = until
+        if dlr.open_hours is not None:
+            limit = min(limit, now + 1 - (now + 1) % DAY + dlr.open_hours[1] - 1)
+        # Rolls don't remember, so when the next arrival falls past the limit
+        #  the clock can go straight there and roll again from it
+        arrival = now + 1 + int(math.log(1 - random.random()) / math.log(1 - chance))
+        if arrival > limit:
+            catch_up(dlr, limit)
+            continue
+        catch_up(dlr, arrival)
+        dlr.walk_in()
+        dlr.process(arrival)
+
+
+def run_headless(duration=DAY, seed=None, salesPeople_count=1, roster=None,
+                 open_hours=None, arrival_chance=0.2, step=1.0, quiet=True,
+                 pooled=False, gc_threshold=None, floor=False, inventory=None,
+                 crm=False, trace=None, state_model=None, visit_log=False,
+                 routing=False, result=summarize):
+    """
+    Runs one simulation for duration simulated seconds and returns its KPIs,
+    or whatever result makes of the finished dealership.
+    step is the simulated time per loop, the agents only act once a second so
+    anything below that just burns CPU.  pooled recycles customers and
+    gc_threshold is handed to customerPool.tune_gc for the length of the run.
+    """
+    random.seed(seed)
+    gc_settings = tune_gc(gc_threshold)
+    try:
+        with muted(quiet):
+            days = int(duration // DAY) + 1
+            dlr = build_dealership(salesPeople_count, roster, open_hours, days,
+                                   arrival_chance, pooled, floor, inventory, crm,
+                                   trace, state_model, visit_log, routing)
+            advance(dlr, duration, step)
+    finally:
+        restore_gc(gc_settings)
+    return result(dlr)
+
+
+def _run_config(config):
+    return run_headless(**config)
+
+
+def run_many(configs, processes=None):
+    """
+    Runs every configuration (a dict of run_headless arguments) and returns
+    the KPIs in the same order.  processes=1 runs them in this process.
+    """
+    if processes == 1 or len(configs) <= 1:
+        return [_run_config(config) for config in configs]
+    pool = multiprocessing.Pool(processes)
+    try:
+        return pool.map(_run_config, configs)
+    finally:
+        pool.close()
+        pool.join()
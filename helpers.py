@@ -1,23 +1,22 @@
 #! /usr/bin/env python
+from __future__ import print_function
 
 import os, sys
 import pygame
 from pygame.locals import *
 
-from Dealership import *
-
 
 def load_image(name, imgType, colorkey=None):
-    fullname = os.path.join('images', imgType)
+    fullname = os.path.join('Images', imgType)
     fullname = os.path.join(fullname, name)
     try:
         image = pygame.image.load(fullname)
-    except pygame.error, message:
-        print 'Cannot load image:', fullname
-        raise SystemExit, message
+    except pygame.error as message:
+        print('Cannot load image:', fullname)
+        raise SystemExit(message)
     image = image.convert()
     if colorkey is not None:
-        if colorkey is -1:
+        if colorkey == -1:
             colorkey = image.get_at((0,0))
         image.set_colorkey(colorkey, RLEACCEL)
     return image, image.get_rect()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 26 09:22:48 2026
+
+@author: DavidCreech
+
+Retained-mode heads up display for the pygame windows.
+
+Labels and buttons are created once.  Fonts are loaded once and shared, text
+is only rendered again when the value shown changes, and each frame hands
+back just the rectangles that changed so the caller can push them with
+pygame.display.update instead of flipping the whole screen.
+"""
+import pygame
+
+black = (  0,   0,   0)
+blue =  (  0,   0, 255)
+green = (  0, 255,   0)
+red =   (255,   0,   0)
+
+
+class HudLabel(object):
+    """ "label value" text anchored at its bottom left corner """
+    def __init__(self, font, label, xlocation, ylocation, color=red):
+        self.font = font
+        self.label = label
+        self.xlocation = xlocation
+        self.ylocation = ylocation
+        self.color = color
+        self.value = None
+        self.visible = True
+        self.rect = None # Where it was last drawn
+        self.dirty = True
+
+    def set_value(self, value):
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def show(self, visible):
+        if visible != self.visible:
+            self.visible = visible
+            self.dirty = True
+
+    def draw(self, surface, background):
+        # Returns the area that needs pushing to the display, or None
+        if not self.dirty:
+            return None
+        self.dirty = False
+        old_rect = self.rect
+        if old_rect is not None:
+            surface.blit(background, old_rect, old_rect)
+        self.rect = None
+        if self.visible and self.font is not None:
+            text = self.font.render(self.label + " %s" % self.value, 1, self.color)
+            self.rect = text.get_rect(left=self.xlocation, bottom=self.ylocation)
+            surface.blit(text, self.rect)
+        if old_rect is None:
+            return self.rect
+        if self.rect is None:
+            return old_rect
+        return old_rect.union(self.rect)
+
+
+class HudButton(object):
+    """
+    A clickable box.  Rendered text is kept per message, so toggling between
+    two captions never renders again after the first time each is shown.
+    """
+    def __init__(self, font, msg, x, y, w, h, action=None):
+        self.font = font
+        self.msg = msg
+        self.rect = pygame.Rect(x, y, w, h)
+        self.action = action
+        self.hover = False
+        self.was_pressed = False
+        self.texts = {}
+        self.dirty = True
+
+    def set_text(self, msg):
+        if msg != self.msg:
+            self.msg = msg
+            self.dirty = True
+
+    def poll(self, mouse, click):
+        hover = self.rect.collidepoint(mouse)
+        if hover != self.hover:
+            self.hover = hover
+            self.dirty = True
+        # Only act on the frame the button goes down, not every frame it's held
+        pressed = click[0] == 1
+        if hover and pressed and not self.was_pressed and self.action is not None:
+            self.action()
+        self.was_pressed = pressed
+
+    def draw(self, surface, background):
+        if not self.dirty:
+            return None
+        self.dirty = False
+        pygame.draw.rect(surface, blue if self.hover else green, self.rect)
+        if self.font is not None:
+            text = self.texts.get(self.msg)
+            if text is None:
+                text = self.texts[self.msg] = self.font.render(self.msg, True, black)
+            surface.blit(text, text.get_rect(center=self.rect.center))
+        return self.rect
+
+
+class Hud(object):
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        self.fonts = {}
+        self.labels = {}
+        self.buttons = {}
+        self.order = [] # Draw order
+
+    def font(self, size, name=None, system=False):
+        # Fonts are expensive to open, keep one per (name, size)
+        if not pygame.font:
+            return None
+        key = (name, size, system)
+        font = self.fonts.get(key)
+        if font is None:
+            if system:
+                font = pygame.font.SysFont(name, size)
+            else:
+                font = pygame.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def add_label(self, key, label, xlocation, ylocation, size=20):
+        self.labels[key] = HudLabel(self.font(size), label, xlocation, ylocation)
+        self.order.append(self.labels[key])
+        return self.labels[key]
+
+    def add_button(self, key, msg, x, y, w, h, action=None):
+        self.buttons[key] = HudButton(self.font(20, "comicsansms", True),
+                                      msg, x, y, w, h, action)
+        self.order.append(self.buttons[key])
+        return self.buttons[key]
+
+    def set(self, key, value):
+        self.labels[key].set_value(value)
+
+    def poll(self):
+        mouse = pygame.mouse.get_pos()
+        click = pygame.mouse.get_pressed()
+        for button in self.buttons.values():
+            button.poll(mouse, click)
+
+    def draw(self):
+        """Redraws whatever changed and returns the dirty rectangles."""
+        rects = []
+        for item in self.order:
+            rect = item.draw(self.screen, self.background)
+            if rect is not None:
+                rects.append(rect)
+        return rects
+
+    def update(self):
+        rects = self.draw()
+        if rects:
+            pygame.display.update(rects)
+        return rects
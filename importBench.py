@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 23 08:31:09 2026
+
+@author: DavidCreech
+
+Cold start check for batch workers.  Starts fresh interpreters that import
+the simulation core and a headless run's modules, times the imports, and
+fails if any of them takes longer than the budget or pulls in pygame.
+
+    python importBench.py --budget 100
+"""
+import sys
+import argparse
+import subprocess
+
+MODULES = ("Dealership", "headlessSim")
+
+_PROBE = """
+import sys, time
+start = time.time()
+import %s
+took = time.time() - start
+print("%%f %%d" %% (took * 1000, "pygame" in sys.modules))
+"""
+
+
+def time_import(module, python=sys.executable):
+    """Milliseconds to import module in a new interpreter, and whether pygame came along."""
+    output = subprocess.check_output([python, "-c", _PROBE % module])
+    took, has_pygame = output.decode().split()
+    return float(took), has_pygame == "1"
+
+
+def time_startup(python=sys.executable):
+    # Wall time of an interpreter that does nothing, for comparison
+    import time
+    start = time.time()
+    subprocess.check_call([python, "-c", "pass"])
+    return (time.time() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time cold imports of the simulation core")
+    parser.add_argument("--budget", type=float, default=100.0,
+                        help="milliseconds allowed per import")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    failed = False
+    startup = min(time_startup() for repeat in range(args.repeats))
+    print("%-14s %8.1f ms" % ("interpreter", startup))
+    for module in MODULES:
+        runs = [time_import(module) for repeat in range(args.repeats)]
+        best = min(took for took, has_pygame in runs)
+        has_pygame = any(has_pygame for took, has_pygame in runs)
+        print("%-14s %8.1f ms%s" % (module, best,
+                                    "  (imports pygame!)" if has_pygame else ""))
+        if best > args.budget or has_pygame:
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
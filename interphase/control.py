@@ -492,7 +492,7 @@ class Control(object):
             for num, item in enumerate(listing_icon):
                 img = surface[num]
                 if color_key:
-                    if color_key is -1:
+                    if color_key == -1:
                         color_key = img.get_at((0,0))
                     img.set_colorkey(color_key, engine.RLEACCEL)
                 control_icon[item] = img
@@ -661,7 +661,7 @@ class Control(object):
         elif surface:
             self.control_image['bg'] = surface.copy()
             if color_key:
-                if color_key is -1:
+                if color_key == -1:
                     color_key = self.control_image['bg'].get_at((0,0))
                 self.control_image['bg'].set_colorkey(color_key, engine.RLEACCEL)
         else:
@@ -528,7 +528,7 @@ class Interface(engine.sprite.Sprite):
         elif surface:
             self._panel_image = surface.copy()
             if color_key:
-                if color_key is -1:
+                if color_key == -1:
                     color_key = self._panel_image.get_at((0,0))
                 self._panel_image.set_colorkey(color_key, engine.RLEACCEL)
             if self._panel_image.get_size() != self._size:
@@ -555,7 +555,7 @@ class Interface(engine.sprite.Sprite):
         elif surface:
             self._control_image['bg'] = surface.copy()
             if color_key:
-                if color_key is -1:
+                if color_key == -1:
                     color_key = self._control_image['bg'].get_at((0,0))
                 self._control_image['bg'].set_colorkey(color_key, engine.RLEACCEL)
         else:
@@ -599,7 +599,7 @@ class Interface(engine.sprite.Sprite):
             for num, frame in enumerate(['t','b']):
                 img = surface[num].copy()
                 if color_key:
-                    if color_key is -1:
+                    if color_key == -1:
                         color_key = img.get_at((0,0))
                     img.set_colorkey(color_key, engine.RLEACCEL)
                 self._button_image[frame] = engine.transform.smoothscale(img, self._button_size)
@@ -613,11 +613,11 @@ class Interface(engine.sprite.Sprite):
 
     def get_clipboard(self):
         """Retrieve text from clipboard."""
-        raise AttributeError, "clipboard unavailable"
+        raise AttributeError("clipboard unavailable")
 
     def set_clipboard(self, text):
         """Save text to clipboard."""
-        raise AttributeError, "clipboard unavailable"
+        raise AttributeError("clipboard unavailable")
 
     def _clipboard_init(self):
         if not Interface._clipboard:
@@ -999,7 +999,7 @@ class Interface(engine.sprite.Sprite):
                     try:
                         if self._control_hover:
                             if len(self._controls[self._control_hover].tips) == 1:
-                                tip = self._controls[self._control_hover].tips[self._controls[self._control_hover].tips.keys()[0]]
+                                tip = next(iter(self._controls[self._control_hover].tips.values()))
                             else:
                                 tip = self._controls[self._control_hover].tips[self._controls[self._control_hover].value]
                             pos = mouse_x-(self._x-(self._size[0]//2)), mouse_y-(self._y-(self._size[1]//2))
@@ -402,7 +402,7 @@ def load_image(filename, frames=1, path='data', zipobj=None, fileobj=None, color
         else:
             image = image.convert()
         if colorkey is not None:
-            if colorkey is -1:
+            if colorkey == -1:
                 colorkey = image.get_at((0,0))
             image.set_colorkey(colorkey, engine.RLEACCEL)
         return image
@@ -450,7 +450,7 @@ def load_image(filename, frames=1, path='data', zipobj=None, fileobj=None, color
                 image_frame = convert_image(image_frame, colorkey)
                 images.append(image_frame)
             return images
-    except engine.error, message:
+    except engine.error as message:
         if errorhandle:
             raise
         else:
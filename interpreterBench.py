@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Nov 13 09:18:44 2026
+
+@author: DavidCreech
+
+Throughput of the simulation core on different Python interpreters.
+
+Each interpreter runs the same headless scenario in a fresh process and
+reports agent ticks per second, where one tick is one agent thinking (a
+customer or salesperson's process call).  Ticks are counted rather than
+simulated seconds because interpreters order the dealership's agents
+differently (Python 2 walks integer keyed dicts in hash order, Python 3 in
+insertion order), so the same seed doesn't give the same run everywhere
+and the amount of work per simulated second differs a little.
+
+Interpreters that aren't installed are skipped.
+
+    python interpreterBench.py python2.7 python3.12 pypy3
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+SCENARIO = dict(duration=4 * 60 * 60, seed=0, salesPeople_count=4,
+                arrival_chance=0.5, pooled=True)
+
+
+def measure(repeats=3, scenario=SCENARIO):
+    """Best agent ticks per second over repeats runs, in this interpreter."""
+    from Dealership import Dealership
+    from headlessSim import run_headless
+
+    ticks = [0]
+    process = Dealership.process
+
+    def counted(dlr, time_passed):
+        ticks[0] += len(dlr.customers) + len(dlr.salesPeople)
+        process(dlr, time_passed)
+
+    Dealership.process = counted
+    best = None
+    try:
+        for repeat in range(repeats):
+            ticks[0] = 0
+            start = time.time()
+            kpis = run_headless(**scenario)
+            took = time.time() - start
+            if best is None or ticks[0] / took > best["ticks_per_second"]:
+                best = {"ticks_per_second": ticks[0] / took, "ticks": ticks[0],
+                        "seconds": took, "customers": kpis["customers"]}
+    finally:
+        Dealership.process = process
+    best["interpreter"] = "%s %s" % (getattr(sys, "implementation", None)
+                                     and sys.implementation.name or "cpython",
+                                     sys.version.split()[0])
+    return best
+
+
+def measure_with(python, repeats=3):
+    # Runs measure() under another interpreter, None if it isn't there
+    try:
+        output = subprocess.check_output([python, __file__, "--json",
+                                          "--repeats", str(repeats)])
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Agent ticks per second of the simulation core per interpreter")
+    parser.add_argument("interpreters", nargs="*",
+                        help="interpreters to compare (default just this one)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true",
+                        help="measure this interpreter and print the result as JSON")
+    args = parser.parse_args()
+
+    if args.json:
+        print(json.dumps(measure(args.repeats)))
+        return
+
+    baseline = None
+    for python in args.interpreters or [sys.executable]:
+        result = measure_with(python, args.repeats)
+        if result is None:
+            print("%-14s not available" % python)
+            continue
+        if baseline is None:
+            baseline = result["ticks_per_second"]
+        print("%-14s %-16s %10.0f ticks/s  %5.2fx  (%d ticks in %.1f s)" % (
+            python, result["interpreter"], result["ticks_per_second"],
+            result["ticks_per_second"] / baseline, result["ticks"], result["seconds"]))
+
+
+if __name__ == "__main__":
+    main()
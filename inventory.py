@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Fri Oct 30 09:12:40 2026
+
+@author: DavidCreech
+
+Vehicles on the lot and what customers are looking for.
+
+An Inventory is loaded from a CSV or JSON file with one vehicle per row:
+
+    vin,make,model,trim,price,color,age_on_lot
+
+and kept as NumPy columns, with the text columns stored as integer codes.
+
+For every combination of make, model, trim and color a customer might care
+about there is an index: the rows sorted by that combination's codes and then
+by price, plus where each distinct combination starts and stops.  Matching a
+customer's Preferences is one dictionary lookup for the block of vehicles
+with the wanted make/model/etc., two searchsorted calls on that block's
+prices for the budget, and a vectorized check of age on lot over what is
+left.  A query against a dealer group's 100,000 vehicles never looks at rows
+that can't match, and the matches come back cheapest first.
+
+    python inventory.py --generate 100000 --out inventory.csv
+    python inventory.py --bench inventory.csv
+"""
+import csv
+import json
+import itertools
+import time
+import random
+import argparse
+
+import numpy as np
+
+FIELDS = ("vin", "make", "model", "trim", "price", "color", "age_on_lot")
+CATEGORICAL = ("make", "model", "trim", "color")
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+# What generate() stocks the lot with.  (make, model, base price)
+MODELS = (("Ford", "F-150", 36000), ("Ford", "Escape", 27000),
+          ("Ford", "Mustang", 31000), ("Chevrolet", "Silverado", 37000),
+          ("Chevrolet", "Equinox", 26000), ("Chevrolet", "Malibu", 24000),
+          ("Toyota", "Camry", 26000), ("Toyota", "RAV4", 28000),
+          ("Toyota", "Tacoma", 29000), ("Honda", "Civic", 23000),
+          ("Honda", "Accord", 27000), ("Honda", "CR-V", 28000),
+          ("Nissan", "Altima", 25000), ("Nissan", "Rogue", 27000),
+          ("Jeep", "Wrangler", 32000), ("Jeep", "Grand Cherokee", 38000))
+TRIMS = (("Base", 1.0), ("Sport", 1.12), ("Limited", 1.25), ("Platinum", 1.4))
+COLORS = ("White", "Black", "Silver", "Gray", "Red", "Blue", "Green")
+
+
+class Preferences(object):
+    """
+    What a customer would buy.  Anything left as None doesn't matter to
+    them.  Prices are dollars and age_on_lot days.
+    """
+    def __init__(self, make=None, model=None, trim=None, color=None,
+                 min_price=None, max_price=None, max_age=None):
+        self.make = make
+        self.model = model
+        self.trim = trim
+        self.color = color
+        self.min_price = min_price
+        self.max_price = max_price
+        self.max_age = max_age
+
+    def __repr__(self):
+        wanted = ["%s=%r" % (name, value) for name, value in sorted(self.__dict__.items())
+                  if value is not None]
+        return "Preferences(%s)" % ", ".join(wanted)
+
+
+class Inventory(object):
+    def __init__(self, records):
+        records = list(records)
+        self.size = len(records)
+        self.vins = np.array([str(record["vin"]) for record in records], dtype=object)
+        self.price = np.array([float(record["price"]) for record in records])
+        self.age_on_lot = np.array([int(record["age_on_lot"]) for record in records])
+
+        # Text columns as codes
+        self.values = {} # column -> list of values, position is the code
+        self.codes = {}  # column -> {value: code}
+        self.columns = {}
+        for column in CATEGORICAL:
+            codes = self.codes[column] = {}
+            values = self.values[column] = []
+            coded = np.empty(self.size, dtype=np.int64)
+            for row, record in enumerate(records):
+                value = record[column]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(values)
+                    values.append(value)
+                coded[row] = code
+            self.columns[column] = coded
+
+        # Everything by price, for customers who only care about the budget
+        self.price_order = np.argsort(self.price, kind="mergesort")
+        self.sorted_price = self.price[self.price_order]
+
+        self.indexes = {} # tuple of columns -> _Index
+        for count in range(1, len(CATEGORICAL) + 1):
+            for columns in itertools.combinations(CATEGORICAL, count):
+                self.indexes[columns] = _Index(self, columns)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a .json list of vehicles or a .csv with a FIELDS header."""
+        with open(path) as data:
+            if path.lower().endswith(".json"):
+                records = json.load(data)
+            else:
+                records = list(csv.DictReader(data))
+        return cls(records)
+
+    @classmethod
+    def generate(cls, count, seed=None):
+        """A made up lot of count vehicles, for trying things out."""
+        rng = random.Random(seed)
+        records = []
+        for number in range(count):
+            make, model, base = rng.choice(MODELS)
+            trim, markup = rng.choice(TRIMS)
+            records.append({
+                "vin": "SIM%014d" % number,
+                "make": make, "model": model, "trim": trim,
+                "price": round(base * markup * rng.uniform(0.95, 1.08), -1),
+                "color": rng.choice(COLORS),
+                "age_on_lot": int(rng.expovariate(1 / 45.0)),
+            })
+        return cls(records)
+
+    def save(self, path):
+        with open(path, "w") as out:
+            writer = csv.writer(out)
+            writer.writerow(FIELDS)
+            for row in range(self.size):
+                record = self.record(row)
+                writer.writerow([record[field] for field in FIELDS])
+
+    def __len__(self):
+        return self.size
+
+    def record(self, row):
+        record = dict((column, self.values[column][self.columns[column][row]])
+                      for column in CATEGORICAL)
+        record["vin"] = self.vins[row]
+        record["price"] = float(self.price[row])
+        record["age_on_lot"] = int(self.age_on_lot[row])
+        return record
+
+    def match(self, preferences):
+        """Row numbers of every vehicle that fits the preferences, cheapest first."""
+        columns = []
+        codes = []
+        for column in CATEGORICAL:
+            value = getattr(preferences, column)
+            if value is not None:
+                code = self.codes[column].get(value)
+                if code is None:
+                    return _EMPTY # Nothing like that on the lot
+                columns.append(column)
+                codes.append(code)
+
+        if columns:
+            index = self.indexes[tuple(columns)]
+            block = index.blocks.get(index.key(codes))
+            if block is None:
+                return _EMPTY
+            start, stop = block
+            prices = index.prices[start:stop]
+            rows = index.rows[start:stop]
+        else:
+            prices = self.sorted_price
+            rows = self.price_order
+
+        if preferences.min_price is not None or preferences.max_price is not None:
+            low = 0
+            high = len(prices)
+            if preferences.min_price is not None:
+                low = np.searchsorted(prices, preferences.min_price, "left")
+            if preferences.max_price is not None:
+                high = np.searchsorted(prices, preferences.max_price, "right")
+            rows = rows[low:high]
+        if preferences.max_age is not None:
+            rows = rows[self.age_on_lot[rows] <= preferences.max_age]
+        return rows
+
+    def random_preferences(self, rng=random):
+        """
+        Someone who has a vehicle on the lot in mind: always its make, often
+        its model, sometimes its trim or color, and a budget around its price.
+        """
+        row = rng.randrange(self.size)
+        vehicle = self.record(row)
+        return Preferences(
+            make=vehicle["make"],
+            model=vehicle["model"] if rng.random() < 0.6 else None,
+            trim=vehicle["trim"] if rng.random() < 0.3 else None,
+            color=vehicle["color"] if rng.random() < 0.3 else None,
+            max_price=round(vehicle["price"] * rng.uniform(1.0, 1.2), -2))
+
+
+class _Index(object):
+    """
+    Rows sorted by the combined codes of some columns, then by price.  blocks
+    maps each combination present to the (start, stop) of its rows.
+    """
+    def __init__(self, inventory, columns):
+        self.columns = columns
+        self.scales = []
+        scale = 1
+        key = np.zeros(inventory.size, dtype=np.int64)
+        for column in columns:
+            self.scales.append(scale)
+            key += inventory.columns[column] * scale
+            scale *= max(1, len(inventory.values[column]))
+
+        self.rows = np.lexsort((inventory.price, key))
+        self.prices = inventory.price[self.rows]
+        sorted_key = key[self.rows]
+        starts = np.flatnonzero(np.diff(sorted_key)) + 1
+        starts = np.concatenate(([0], starts)) if inventory.size else starts
+        stops = np.concatenate((starts[1:], [inventory.size]))
+        self.blocks = dict((int(sorted_key[start]), (int(start), int(stop)))
+                           for start, stop in zip(starts, stops))
+
+    def key(self, codes):
+        return sum(code * scale for code, scale in zip(codes, self.scales))
+
+
+def benchmark(inventory, queries=20000, seed=0):
+    """Average microseconds per match over random customer preferences."""
+    rng = random.Random(seed)
+    profiles = [inventory.random_preferences(rng) for query in range(queries)]
+    start = time.time()
+    matched = 0
+    for preferences in profiles:
+        matched += len(inventory.match(preferences))
+    took = time.time() - start
+    return took / queries * 1e6, matched / float(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vehicle inventory tools")
+    parser.add_argument("--generate", type=int, default=None,
+                        help="make up an inventory of this many vehicles")
+    parser.add_argument("--out", default="inventory.csv")
+    parser.add_argument("--bench", default=None,
+                        help="time matches against this inventory file")
+    parser.add_argument("--queries", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.generate:
+        inventory = Inventory.generate(args.generate, seed=0)
+        inventory.save(args.out)
+        print("Wrote %d vehicles to %s" % (len(inventory), args.out))
+    if args.bench:
+        start = time.time()
+        inventory = Inventory.load(args.bench)
+        print("Loaded %d vehicles in %.2f s" % (len(inventory), time.time() - start))
+        per_query, matched = benchmark(inventory, args.queries)
+        print("%.1f us per match, %.0f vehicles matched on average" % (per_query, matched))
+
+
+if __name__ == "__main__":
+    main()
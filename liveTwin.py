@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Nov  5 10:14:03 2026
+
+@author: DavidCreech
+
+Runs a Dealership as a live twin of the real showroom.  Instead of rolling
+for walk-ins it follows the door and badge sensors, keeps its clock on the
+wall clock, and after every batch of sensor events forecasts how many
+customers will be waiting some minutes from now.
+
+Sensor events are JSON objects, one per line, sent as UDP datagrams to a
+local port (SocketFeed) or appended to a file (FileTail):
+
+    {"event": "enter", "time": 1793872394.2, "make": "Ford"}
+    {"event": "exit", "time": 1793872401.7}
+    {"event": "clock_in", "badge": 17}
+    {"event": "clock_out", "badge": 17}
+
+time is epoch seconds from the sensor and defaults to when the event was
+read.  Preference fields on an enter event are handled like a trace's (see
+traceArrivals).  An exit takes out the customer who has been waiting the
+longest, unless the twin already has no more customers than the door
+counts, as the model lets its own customers leave too.  A badge that has
+never been seen before is hired as a new salesperson.
+
+A forecast runs branches of the dealership (see branches) ahead with
+fast_forward, with walk-ins rolled at the rate the door has been seeing.
+There are as many branches as the last forecasts say fit in the time
+budget, so at peak traffic there are fewer of them rather than a late
+answer.  The showroom forgets its state within a few visits, so branches
+only simulate the last memory seconds of the horizon and skip the stretch
+before it (shift changes still happen on time).
+
+    python liveTwin.py --udp 9911 --salespeople 4
+    python liveTwin.py --tail sensors.jsonl
+    python liveTwin.py --bench --rate 1.0     # latency at peak traffic
+"""
+import os
+import json
+import time
+import heapq
+import errno
+import select
+import socket
+import random
+import argparse
+import threading
+from collections import deque
+
+from SalesPerson import newVehicleSalesPerson
+from headlessSim import build_dealership, advance, fast_forward, catch_up, muted, percentile
+from traceArrivals import preferences
+from branches import run_branches
+
+def parse_events(lines):
+    # Sensor events from lines of JSON, anything unreadable is skipped
+    events = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(event, dict) and "event" in event:
+            events.append(event)
+    return events
+
+
+class SocketFeed(object):
+    """Sensor events sent as UDP datagrams to a local port."""
+    def __init__(self, port, host="127.0.0.1"):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.setblocking(False)
+
+    def wait(self, timeout):
+        select.select([self.socket], [], [], timeout)
+
+    def read(self):
+        lines = []
+        while True:
+            try:
+                data = self.socket.recv(65536)
+            except socket.error as error:
+                if error.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            lines.extend(data.decode("utf-8", "replace").splitlines())
+        return parse_events(lines)
+
+    def close(self):
+        self.socket.close()
+
+
+class FileTail(object):
+    """
+    Sensor events appended to a file, like tail -f.  Starts at the end of
+    the file unless from_start, and starts over if the file is truncated.
+    """
+    def __init__(self, path, from_start=False, interval=0.005):
+        self.path = path
+        self.interval = interval # Seconds between looks at the file
+        self.file = open(path, "r")
+        if not from_start:
+            self.file.seek(0, 2)
+        self.partial = ""
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+
+    def read(self):
+        if os.fstat(self.file.fileno()).st_size < self.file.tell():
+            self.file.seek(0)
+            self.partial = ""
+        data = self.partial + self.file.read()
+        lines = data.split("\n")
+        self.partial = lines.pop() # Not finished writing yet
+        return parse_events(lines)
+
+    def close(self):
+        self.file.close()
+
+
+def waiting_count(dlr):
+    # Right now, not as of the last count_States like dlr.waiting
+    return sum(1 for customer in dlr.customers.values() if customer.waiting())
+
+
+class LiveTwin(object):
+    def __init__(self, dealership, source, clock=time.time, horizon=30 * 60,
+                 budget=0.06, memory=2 * 60, rate_window=15 * 60,
+                 max_branches=64, workers=None):
+        self.dealership = dealership
+        self.source = source
+        self.clock = clock
+        self.horizon = horizon         # Seconds ahead to forecast
+        self.budget = budget           # Seconds of CPU a forecast may take
+        self.memory = memory           # Seconds of the horizon the branches simulate
+        self.rate_window = rate_window # Seconds of door counts behind the arrival rate
+        self.max_branches = max_branches
+        self.workers = workers         # Branches run at once, one per CPU by default
+        self.branch_time = None        # Recent seconds per branch
+        # Wall clock time of the dealership's second zero
+        self.origin = clock() - dealership.elapsedTime
+        self.start = dealership.elapsedTime
+
+        dealership.arrival_source = self
+        self.entering = deque() # (simulated time, event) through the door, not let in yet
+        self.entered = deque()  # Simulated times of recent walk-ins
+        self.badges = {}        # badge -> salesperson
+        self.occupancy = len(dealership.customers) # In the building by the door counts
+        self.events = 0
+        self.latencies = deque(maxlen=10000)
+        self.last_forecast = None
+
+    def now(self):
+        return self.clock() - self.origin
+
+    def due(self, time_passed):
+        # The dealership's arrival source: whoever came through the door by now
+        arrivals = []
+        while self.entering and self.entering[0][0] <= time_passed:
+            arrivals.append(self.entering.popleft()[1])
+            self.entered.append(time_passed)
+        return arrivals
+
+    def apply(self, event):
+        """Feeds one sensor event to the dealership."""
+        dlr = self.dealership
+        kind = event["event"]
+        when = float(event.get("time", self.clock())) - self.origin
+        self.events += 1
+        if kind == "enter":
+            event["preferences"] = preferences(event)
+            self.entering.append((when, event))
+            self.occupancy += 1
+        elif kind == "exit":
+            self.occupancy = max(0, self.occupancy - 1)
+            if len(dlr.customers) + len(self.entering) > self.occupancy:
+                self.send_out()
+        elif kind in ("clock_in", "clock_out"):
+            salesPerson = self.badges.get(event.get("badge"))
+            if salesPerson is None:
+                if kind == "clock_out":
+                    return
+                salesPerson = newVehicleSalesPerson(dlr, "image")
+                salesPerson.brain.set_state("idle")
+                dlr.add_salesPerson(salesPerson)
+                self.badges[event.get("badge")] = salesPerson
+            elif kind == "clock_in":
+                salesPerson.clock_in()
+            else:
+                salesPerson.clock_out()
+
+    def send_out(self):
+        # Someone walked out that the twin still has inside.  It's taken to
+        #  be whoever has been waiting the longest
+        waiting = [customer for customer in self.dealership.customers.values()
+                   if customer.brain.active_state.name in ("shopping", "idle")]
+        if waiting:
+            customer = min(waiting, key=lambda customer: customer.entered_store)
+            customer.brain.set_state("left")
+
+    def sync(self):
+        """Reads the sensors and brings the dealership up to now."""
+        events = self.source.read()
+        for event in events:
+            self.apply(event)
+        dlr = self.dealership
+        advance(dlr, self.now())
+        # Anyone whose event came in after their second was simulated
+        late = self.due(dlr.elapsedTime)
+        for visit in late:
+            dlr.walk_in(visit.get("preferences"))
+        if late:
+            dlr.process(dlr.elapsedTime)
+        return events
+
+    def arrival_chance(self):
+        # Walk-ins per second over the recent window, as a chance per second
+        now = self.dealership.elapsedTime
+        while self.entered and self.entered[0] < now - self.rate_window:
+            self.entered.popleft()
+        seen = min(self.rate_window, now - self.start)
+        if seen < 60:
+            return self.dealership.arrival_chance
+        return min(0.95, len(self.entered) / float(seen))
+
+    def forecast(self, horizon=None, budget=None):
+        """
+        Customers waiting and in the store horizon seconds from now, over
+        as many branches as should fit in budget seconds (at least one).
+        """
+        horizon = self.horizon if horizon is None else horizon
+        budget = self.budget if budget is None else budget
+        dlr = self.dealership
+        until = dlr.elapsedTime + horizon
+        chance = self.arrival_chance()
+        skip_to = until - self.memory if horizon > self.memory else None
+
+        def branch(dealership, number):
+            dealership.arrival_chance = chance
+            if skip_to is not None:
+                catch_up(dealership, skip_to)
+            fast_forward(dealership, until)
+            return waiting_count(dealership), len(dealership.customers)
+
+        count = 1
+        if self.branch_time:
+            count = max(1, min(self.max_branches, int(budget / self.branch_time)))
+        started = time.time()
+        with muted():
+            results = run_branches(dlr, branch, count, self.workers)
+        took = (time.time() - started) / count
+        self.branch_time = took if not self.branch_time else 0.7 * self.branch_time + 0.3 * took
+
+        waiting = [result[0] for result in results]
+        in_store = [result[1] for result in results]
+        self.last_forecast = {
+            "horizon": horizon,
+            "branches": count,
+            "arrival_chance": chance,
+            "waiting": sum(waiting) / float(count),
+            "waiting_low": percentile(waiting, 10),
+            "waiting_high": percentile(waiting, 90),
+            "in_store": sum(in_store) / float(count),
+        }
+        return self.last_forecast
+
+    def run(self, report=None, refresh=5.0, stop=None):
+        """
+        Follows the sensors until stop() is true, forecasting after every
+        batch of events and at least every refresh seconds.  report is
+        called with each forecast and its latency, the seconds since the
+        oldest event in the batch happened.
+        """
+        last = 0.0
+        while stop is None or not stop():
+            self.source.wait(min(refresh, 0.05))
+            with muted():
+                events = self.sync()
+            if not events and self.clock() - last < refresh:
+                continue
+            forecast = self.forecast()
+            last = self.clock()
+            latency = None
+            if events:
+                latency = last - min(float(event.get("time", last)) for event in events)
+                self.latencies.append(latency)
+            if report is not None:
+                report(forecast, latency)
+
+
+def print_forecast(forecast, latency):
+    print("%.1f waiting in %d min (%d-%d), %d branches%s" % (
+        forecast["waiting"], forecast["horizon"] // 60, forecast["waiting_low"],
+        forecast["waiting_high"], forecast["branches"],
+        "" if latency is None else ", %.0f ms after the event" % (latency * 1000)))
+
+
+def send_events(port, rate, seconds, badges=4, host="127.0.0.1", seed=0):
+    """
+    Stands in for the sensors: badges clock in, then people come and go
+    through the door at rate a second for the given number of seconds.
+    """
+    rng = random.Random(seed)
+    out = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(event):
+        event["time"] = time.time()
+        out.sendto(json.dumps(event).encode("utf-8"), (host, port))
+
+    for badge in range(badges):
+        send({"event": "clock_in", "badge": badge})
+    leaving = [] # When the people inside walk out, about a minute after coming in
+    stop_at = time.time() + seconds
+    next_enter = time.time() + rng.expovariate(rate)
+    while next_enter < stop_at:
+        if leaving and leaving[0] < next_enter:
+            when = heapq.heappop(leaving)
+            event = {"event": "exit"}
+        else:
+            when = next_enter
+            event = {"event": "enter", "make": rng.choice(("Ford", "Toyota", ""))}
+            heapq.heappush(leaving, when + rng.expovariate(1 / 60.0))
+            next_enter += rng.expovariate(rate)
+        time.sleep(max(0.0, when - time.time()))
+        send(event)
+    out.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the dealership as a live twin")
+    parser.add_argument("--udp", type=int, default=None, help="port sensors send to")
+    parser.add_argument("--tail", default=None, help="file sensors append to")
+    parser.add_argument("--salespeople", type=int, default=0,
+                        help="salespeople on the floor before any badge is seen")
+    parser.add_argument("--horizon", type=float, default=30, help="minutes ahead")
+    parser.add_argument("--budget", type=float, default=0.06,
+                        help="seconds each forecast may take")
+    parser.add_argument("--bench", action="store_true",
+                        help="send made up sensor events to the twin and time it")
+    parser.add_argument("--rate", type=float, default=1.0,
+                        help="walk-ins a second for --bench")
+    parser.add_argument("--seconds", type=float, default=120)
+    args = parser.parse_args()
+
+    if args.tail:
+        source = FileTail(args.tail)
+    elif args.udp or args.bench:
+        source = SocketFeed(args.udp or 9911)
+    else:
+        parser.error("give --udp, --tail or --bench")
+
+    with muted():
+        dlr = build_dealership(args.salespeople, pooled=True)
+    twin = LiveTwin(dlr, source, horizon=args.horizon * 60, budget=args.budget)
+
+    if not args.bench:
+        try:
+            twin.run(print_forecast)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    sender = threading.Thread(target=send_events,
+                              args=(args.udp or 9911, args.rate, args.seconds))
+    sender.start()
+    twin.run(refresh=args.seconds, stop=lambda: not sender.is_alive())
+    latencies = list(twin.latencies)
+    print("%d events, %d forecasts, %d in the store, %s" % (
+        twin.events, len(latencies), len(dlr.customers), twin.last_forecast))
+    print("latency ms: median %.1f  p95 %.1f  max %.1f" % (
+        percentile(latencies, 50) * 1000, percentile(latencies, 95) * 1000,
+        max(latencies) * 1000 if latencies else 0.0))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 10:14:56 2026
+
+@author: DavidCreech
+
+Breaks the memory a dealership holds down by what it is used for, so growth
+over a long run can be pinned on something (e.g. left_customers keeps every
+customer who ever walked in unless a CustomerPool is used).
+
+Sizes come from walking the object graph with sys.getsizeof.  Each object is
+counted once, in the first category that reaches it, and the walk stops at
+other agents and the dealership itself so categories don't swallow each
+other.  Instance attributes are reached through gc.get_referents rather
+than __dict__, which on Python 3.11+ would build the dicts it is measuring.
+When tracemalloc is available (Python 3.4+) the report also lists the
+source lines whose allocations grew the most between the two timestamps,
+leaving out this file's own.
+
+    python memoryReport.py --t1 3600 --t2 86400
+"""
+import os
+import gc
+import sys
+import types
+import argparse
+from collections import deque
+
+from Dealership import Dealership
+from GameEntity import GameEntity
+from stateMachine import State, StateMachine
+from headlessSim import build_dealership, advance, muted
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+CATEGORIES = ("state objects", "live customers", "left customers",
+              "customer pool", "salespeople", "event queue", "log buffers",
+              "ui surfaces", "dealership other") # ui surfaces only with a UI
+
+_SKIP_TYPES = (types.ModuleType, type, types.FunctionType,
+               types.BuiltinFunctionType)
+
+
+def deep_size(roots, seen, allowed=()):
+    """
+    Bytes and object count reachable from roots that haven't been seen yet.
+    Agents are only entered when their id is in allowed, and the dealership,
+    states and brains are never entered.
+    """
+    size = 0
+    count = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIP_TYPES):
+            continue
+        if isinstance(obj, (Dealership, State, StateMachine)):
+            continue
+        if isinstance(obj, GameEntity) and id(obj) not in allowed:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        count += 1
+
+        stack.extend(_contents(obj))
+    return size, count
+
+
+def _contents(obj):
+    # What obj holds.  Dicts are walked by hand because the collector
+    #  doesn't report string keys, everything else by what it references
+    if isinstance(obj, dict):
+        return list(obj.keys()) + list(obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return list(obj)
+    if hasattr(obj, "__dict__"):
+        return gc.get_referents(obj)
+    return ()
+
+
+def _brain_size(agents, seen):
+    # Brains and states are sized apart from their agent so that the state
+    #  machinery shows up as its own line
+    size = 0
+    count = 0
+    for agent in agents:
+        objects = [agent.brain, agent.brain.states] + list(agent.brain.states.values())
+        for obj in objects:
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            size += sys.getsizeof(obj)
+            count += 1
+            part_size, part_count = deep_size(_contents(obj), seen)
+            size += part_size
+            count += part_count
+    return size, count
+
+
+def surface_bytes(ui):
+    """Pixel memory of every pygame surface hanging off a UI object."""
+    size = 0
+    count = 0
+    if ui is None:
+        return size, count
+    for value in vars(ui).values():
+        if hasattr(value, "get_bytesize") and hasattr(value, "get_size"):
+            width, height = value.get_size()
+            size += width * height * value.get_bytesize()
+            count += 1
+    return size, count
+
+
+def measure(dlr, ui=None):
+    """
+    Returns {category: (bytes, objects)} for the dealership right now, with
+    ui surfaces only if a UI is given.
+    """
+    seen = set()
+    pool = dlr.customer_pool
+    pooled = list(pool.free) + list(pool.pending) if pool is not None else []
+    live = list(dlr.customers.values())
+    left = list(dlr.left_customers.values())
+    staff = list(dlr.salesPeople.values())
+
+    report = {}
+    report["state objects"] = _brain_size(live + left + pooled + staff, seen)
+    report["live customers"] = deep_size([dlr.customers], seen,
+                                         set(map(id, live)))
+    report["left customers"] = deep_size([dlr.left_customers], seen,
+                                         set(map(id, left)))
+    report["customer pool"] = deep_size([pool] if pool is not None else [], seen,
+                                        set(map(id, pooled)))
+    report["salespeople"] = deep_size([dlr.salesPeople], seen,
+                                      set(map(id, staff)))
+    report["event queue"] = deep_size([dlr.events], seen)
+    report["log buffers"] = deep_size([dlr.wait_times], seen)
+    if ui is not None:
+        report["ui surfaces"] = surface_bytes(ui)
+    report["dealership other"] = deep_size([vars(dlr)], seen)
+    return report
+
+
+def rss_bytes():
+    # Resident set size of this process, or 0 where we can't tell
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (IOError, OSError, ValueError):
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        return 0
+
+
+def growth_report(t1, t2, top=10, **options):
+    """
+    Runs a headless dealership to simulated time t1 and then t2, measuring at
+    both.  options are handed to headlessSim.build_dealership.  There is no
+    UI here, so the report has no ui surfaces line.
+    """
+    if tracemalloc is not None:
+        tracemalloc.start()
+    with muted():
+        dlr = build_dealership(**options)
+        advance(dlr, t1)
+        first = measure(dlr)
+        first_rss = rss_bytes()
+        first_snapshot = tracemalloc.take_snapshot() if tracemalloc else None
+        advance(dlr, t2)
+        second = measure(dlr)
+        second_rss = rss_bytes()
+        second_snapshot = tracemalloc.take_snapshot() if tracemalloc else None
+
+    lines = []
+    if tracemalloc is not None:
+        tracemalloc.stop()
+        # The walk's own allocations would top the list otherwise
+        mine = [tracemalloc.Filter(False, __file__)]
+        first_snapshot = first_snapshot.filter_traces(mine)
+        second_snapshot = second_snapshot.filter_traces(mine)
+        for stat in second_snapshot.compare_to(first_snapshot, "lineno")[:top]:
+            lines.append(str(stat))
+    return {
+        "t1": t1, "t2": t2,
+        "first": first, "second": second,
+        "rss": (first_rss, second_rss),
+        "top_lines": lines,
+    }
+
+
+def _kib(size):
+    return "%10.1f" % (size / 1024.0)
+
+
+def print_report(result):
+    print("%-18s %10s %10s %10s %9s" % ("KiB at t=", int(result["t1"]),
+                                         int(result["t2"]), "growth", "objects"))
+    for category in CATEGORIES:
+        if category not in result["second"]:
+            continue
+        first_size, first_count = result["first"][category]
+        second_size, second_count = result["second"][category]
+        print("%-18s %s %s %s %+9d" % (category, _kib(first_size), _kib(second_size),
+                                       _kib(second_size - first_size),
+                                       second_count - first_count))
+    first_rss, second_rss = result["rss"]
+    print("%-18s %s %s %s" % ("process RSS", _kib(first_rss), _kib(second_rss),
+                              _kib(second_rss - first_rss)))
+    if result["top_lines"]:
+        print("\nLargest allocation growth by line:")
+        for line in result["top_lines"]:
+            print("  " + line)
+    elif tracemalloc is None:
+        print("\ntracemalloc is not available on this interpreter")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Memory use by category between two simulated times")
+    parser.add_argument("--t1", type=float, default=3600)
+    parser.add_argument("--t2", type=float, default=6 * 3600)
+    parser.add_argument("--salespeople", type=int, default=1)
+    parser.add_argument("--arrival-chance", type=float, default=0.2)
+    parser.add_argument("--pooled", action="store_true")
+    args = parser.parse_args()
+
+    print_report(growth_report(args.t1, args.t2,
+                               salesPeople_count=args.salespeople,
+                               arrival_chance=args.arrival_chance,
+                               pooled=args.pooled))
+
+
+if __name__ == "__main__":
+    main()
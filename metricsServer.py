@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Nov 17 09:41:08 2026
+
+@author: DavidCreech
+
+Serves a running simulation's vital signs over HTTP on localhost, in the
+Prometheus text format, so a long run can be scraped and alerted on when it
+stalls or slows down.
+
+    sim time, speed (simulated seconds per wall second), events handled per
+    second, agents in the building, customers waiting for a salesperson,
+    the event queue, customers by state, totals and the process's RSS
+
+The server runs on its own thread and only ever reads the dealership.  Each
+number is one attribute or one len() that the simulation keeps up to date
+anyway (Dealership.events_handled, the state counts count_States sets in
+one go at the end), and those reads are atomic under the GIL, so the sim
+loop never takes or waits for a lock.  Speed and events per second are
+worked out over the time since the last scrape.
+
+Only the standard library is used.
+
+    python metricsServer.py --days 3 --port 9108
+    curl localhost:9108/metrics
+"""
+import time
+import argparse
+import threading
+import contextlib
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+except ImportError:
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Exporter(object):
+    """Samples one dealership (which can be swapped) into metrics text."""
+    def __init__(self, dealership, clock=time.time):
+        self.dealership = dealership
+        self.clock = clock
+        self.started = clock()
+        # (wall time, sim time, events handled) at the last scrape
+        self.last = (self.started, dealership.elapsedTime, dealership.events_handled)
+        self.moved = self.started # Wall time the sim clock was last seen moving
+
+    def sample(self):
+        """(name, type, help, [(labels, value)]) for every metric."""
+        from memoryReport import rss_bytes
+
+        dlr = self.dealership
+        now = self.clock()
+        sim_time = dlr.elapsedTime
+        handled = dlr.events_handled
+        then, then_sim, then_handled = self.last
+        wall = now - then
+        speed = (sim_time - then_sim) / wall if wall > 0 else 0.0
+        rate = (handled - then_handled) / wall if wall > 0 else 0.0
+        if sim_time != then_sim:
+            self.moved = now
+        self.last = (now, sim_time, handled)
+
+        return [
+            ("dealership_sim_time_seconds", "gauge",
+             "Simulated seconds since the run started.", [((), sim_time)]),
+            ("dealership_speed_ratio", "gauge",
+             "Simulated seconds per wall clock second since the last scrape.",
+             [((), speed)]),
+            ("dealership_stalled_seconds", "gauge",
+             "Wall clock seconds since the simulated clock last moved.",
+             [((), now - self.moved)]),
+            ("dealership_events_total", "counter",
+             "Scheduled events run and agent decisions made.", [((), handled)]),
+            ("dealership_events_per_second", "gauge",
+             "Events handled per wall clock second since the last scrape.",
+             [((), rate)]),
+            ("dealership_agents", "gauge", "Agents in the dealership.",
+             [((("kind", "customer"),), len(dlr.customers)),
+              ((("kind", "salesperson"),), len(dlr.salesPeople))]),
+            ("dealership_queue_length", "gauge",
+             "Customers waiting for a salesperson, and scheduled events.",
+             [((("queue", "waiting"),), dlr.waiting),
+              ((("queue", "events"),), len(dlr.events))]),
+            ("dealership_customers", "gauge",
+             "Customers by state, as of the last time the agents acted.",
+             [((("state", "shopping"),), dlr.shopping),
+              ((("state", "idle"),), dlr.idle),
+              ((("state", "engaged"),), dlr.engaged)]),
+            ("dealership_customers_total", "counter", "Customers who walked in.",
+             [((), dlr.customer_id)]),
+            ("dealership_served_total", "counter", "Customers a salesperson engaged.",
+             [((), dlr.served)]),
+            ("dealership_abandoned_total", "counter",
+             "Customers who left without being helped.", [((), dlr.abandoned)]),
+            ("dealership_uptime_seconds", "gauge",
+             "Wall clock seconds since the exporter started.", [((), now - self.started)]),
+            ("process_resident_memory_bytes", "gauge", "Resident memory size in bytes.",
+             [((), rss_bytes())]),
+        ]
+
+    def render(self):
+        lines = []
+        for name, kind, text, values in self.sample():
+            lines.append("# HELP %s %s" % (name, text))
+            lines.append("# TYPE %s %s" % (name, kind))
+            for labels, value in values:
+                if labels:
+                    name_labels = "%s{%s}" % (name, ",".join('%s="%s"' % pair
+                                                             for pair in labels))
+                else:
+                    name_labels = name
+                lines.append("%s %s" % (name_labels, repr(float(value))))
+        return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.exporter.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # A line per scrape all night would bury everything else
+
+
+class MetricsServer(object):
+    """
+    Serves /metrics for a dealership on a daemon thread.  Scrapes are
+    answered one at a time, so only one thread ever touches the exporter.
+    port 0 picks a free port (see .port).
+    """
+    def __init__(self, dealership, port=9108, host="127.0.0.1"):
+        self.exporter = Exporter(dealership)
+        self.server = HTTPServer((host, port), _Handler)
+        self.server.exporter = self.exporter
+        self.port = self.server.server_address[1]
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever,
+                                       name="metrics")
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+@contextlib.contextmanager
+def serving(dealership, port=9108, host="127.0.0.1"):
+    # Metrics for the dealership for the duration of a with block
+    server = MetricsServer(dealership, port, host).start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def main():
+    from headlessSim import build_dealership, advance, muted, DAY
+
+    parser = argparse.ArgumentParser(
+        description="Run a long headless simulation with a Prometheus metrics endpoint")
+    parser.add_argument("--days", type=float, default=1)
+    parser.add_argument("--port", type=int, default=9108)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--salespeople", type=int, default=4)
+    parser.add_argument("--arrival-chance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    with muted():
+        dlr = build_dealership(args.salespeople, arrival_chance=args.arrival_chance,
+                               pooled=True)
+    with serving(dlr, args.port, args.host) as server:
+        print("Metrics on http://%s:%d/metrics" % (args.host, server.port))
+        start = time.time()
+        with muted():
+            advance(dlr, args.days * DAY)
+        print("%.1f simulated days in %.1f s" % (args.days, time.time() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Nov 10 09:52:18 2026
+
+@author: DavidCreech
+
+Simulates a dealer group: many stores at once, with customers who leave one
+store and drive to another to cross-shop.
+
+The stores are split into shards and every shard runs in its own process,
+so a group of 50 stores uses every core.  The shards move forward together
+in time windows as long as the shortest drive between any two stores (the
+lookahead).  A customer who leaves a store during a window can't reach
+another store before the window is over, so the shards never need to hear
+from each other in the middle of one: at the end of each window they hand
+the coordinator the customers who left for another store, and those are
+passed to the shards that own the stores they are heading to.  Arrivals are
+put on the destination Dealership's event queue for the time they get
+there.  This is conservative parallel discrete event simulation, no shard
+ever has to roll back.
+
+Every store has its own staff, traffic and StoreLink.  Customers who leave
+without being helped (and a few who were) may try another store, up to
+max_hops stores in all.  Anyone who gets there after closing goes home.
+
+Each shard draws from its own random numbers, so a run depends on the seed
+and on how the stores are split over the shards.
+
+    python network.py --stores 50 --hours 12     # all cores against one
+"""
+import math
+import time
+import random
+import argparse
+import multiprocessing
+
+from headlessSim import build_dealership, fast_forward, summarize, muted
+
+HOUR = 60 * 60
+
+
+class StoreLink(object):
+    """
+    Connects one Dealership to the rest of the group.  Dealership calls
+    departed() for everyone walking out and the shard calls arrive() for
+    customers coming in from other stores.
+    """
+    def __init__(self, dealership, store, travel, cross_shop=0.3,
+                 helped_cross_shop=0.05, max_hops=3):
+        self.dealership = dealership
+        self.store = store
+        self.travel = travel # Seconds to drive to each store
+        self.cross_shop = cross_shop # Chance an unhelped customer tries another store
+        self.helped_cross_shop = helped_cross_shop
+        self.max_hops = max_hops
+        self.hops = {}    # Customers in the store who came from another -> stores seen
+        self.outbox = []  # (arrival time, store, record) since the shard last asked
+        self.sent = 0
+        self.received = 0
+        self.turned_away = 0 # Got here after closing
+
+    def departed(self, customer):
+        hops = self.hops.pop(customer, 1)
+        chance = self.helped_cross_shop if customer.was_helped else self.cross_shop
+        if hops >= self.max_hops or random.random() >= chance:
+            return
+        # Somewhere nearby is likelier than somewhere across town
+        others = [store for store in range(len(self.travel)) if store != self.store]
+        weights = [1.0 / self.travel[store] for store in others]
+        roll = random.random() * sum(weights)
+        for store, weight in zip(others, weights):
+            roll -= weight
+            if roll < 0:
+                break
+        arrival = self.dealership.elapsedTime + self.travel[store]
+        self.outbox.append((arrival, store, {"preferences": customer.preferences,
+                                             "hops": hops + 1,
+                                             "from": self.store}))
+        self.sent += 1
+
+    def arrive(self, record):
+        dlr = self.dealership
+        self.received += 1
+        if not dlr.is_open(dlr.elapsedTime):
+            self.turned_away += 1
+            return
+        customer = dlr.walk_in(record["preferences"])
+        self.hops[customer] = record["hops"]
+
+    def kpis(self):
+        kpis = summarize(self.dealership)
+        kpis.update(store=self.store, sent=self.sent, received=self.received,
+                    turned_away=self.turned_away)
+        return kpis
+
+
+class Shard(object):
+    """The stores one process runs."""
+    def __init__(self, stores, layout, seed=None):
+        random.seed(seed)
+        self.links = {}
+        with muted():
+            for store in stores:
+                config = layout["stores"][store]
+                dlr = build_dealership(config["salespeople"], pooled=True,
+                                       open_hours=layout["open_hours"],
+                                       arrival_chance=config["arrival_chance"])
+                link = StoreLink(dlr, store, layout["travel"][store],
+                                 **layout["cross_shopping"])
+                dlr.network = link
+                self.links[store] = link
+
+    def advance(self, until, inbox):
+        """
+        Delivers customers on their way here and runs every store to until.
+        Returns the customers who left for other stores in the meantime.
+        """
+        for arrival, store, record in inbox:
+            link = self.links[store]
+            link.dealership.schedule_event(arrival, link.arrive, record)
+        outbox = []
+        with muted():
+            for link in self.links.values():
+                fast_forward(link.dealership, until)
+                outbox.extend(link.outbox)
+                link.outbox = []
+        return outbox
+
+    def kpis(self):
+        return [link.kpis() for link in self.links.values()]
+
+
+def _serve(connection, stores, layout, seed):
+    # A shard's process: does what the coordinator says until told to stop
+    shard = Shard(stores, layout, seed)
+    while True:
+        command = connection.recv()
+        if command[0] == "advance":
+            connection.send(shard.advance(command[1], command[2]))
+        elif command[0] == "kpis":
+            connection.send(shard.kpis())
+        else:
+            connection.close()
+            return
+
+
+class _LocalShard(object):
+    # Same calls as a shard process, run in this one
+    def __init__(self, stores, layout, seed):
+        self.shard = Shard(stores, layout, seed)
+        self.reply = None
+
+    def send(self, command):
+        if command[0] == "advance":
+            self.reply = self.shard.advance(command[1], command[2])
+        elif command[0] == "kpis":
+            self.reply = self.shard.kpis()
+
+    def recv(self):
+        return self.reply
+
+
+def make_layout(stores=50, seed=0, area=40000.0, speed=15.0, min_travel=15 * 60,
+                open_hours=(9 * HOUR, 21 * HOUR), cross_shopping=None):
+    """
+    A made up dealer group: stores spread over an area (meters) with their
+    own staff and traffic, and the drive time between every pair at speed
+    meters a second, never less than min_travel.
+    """
+    rng = random.Random(seed)
+    places = [(rng.uniform(0, area), rng.uniform(0, area)) for store in range(stores)]
+    travel = [[0.0 if a == b else max(min_travel, math.hypot(places[a][0] - places[b][0],
+                                                             places[a][1] - places[b][1]) / speed)
+               for b in range(stores)] for a in range(stores)]
+    return {
+        "stores": [{"salespeople": rng.randint(2, 6),
+                    "arrival_chance": rng.uniform(0.05, 0.25)} for store in range(stores)],
+        "travel": travel,
+        "lookahead": min(travel[a][b] for a in range(stores) for b in range(stores)
+                         if a != b) if stores > 1 else float(min_travel),
+        "open_hours": open_hours,
+        "cross_shopping": cross_shopping or {},
+    }
+
+
+def run_network(layout, duration, shards=None, seed=0):
+    """
+    Runs every store in the layout for duration seconds over shards
+    processes (one per core by default, 1 runs everything here) and
+    returns each store's KPIs, in store order.
+    """
+    stores = len(layout["stores"])
+    shards = min(stores, shards or multiprocessing.cpu_count())
+    owner = [store % shards for store in range(stores)]
+    members = [[store for store in range(stores) if owner[store] == shard]
+               for shard in range(shards)]
+
+    processes = []
+    if shards == 1:
+        connections = [_LocalShard(members[0], layout, seed)]
+    else:
+        connections = []
+        for shard in range(shards):
+            here, there = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve,
+                                               args=(there, members[shard], layout, seed + shard))
+            process.daemon = True
+            process.start()
+            connections.append(here)
+            processes.append(process)
+
+    try:
+        lookahead = layout["lookahead"]
+        inboxes = [[] for shard in range(shards)]
+        clock = 0.0
+        while clock < duration:
+            until = min(duration, clock + lookahead)
+            for shard, connection in enumerate(connections):
+                connection.send(("advance", until, inboxes[shard]))
+            inboxes = [[] for shard in range(shards)]
+            for connection in connections:
+                for message in connection.recv():
+                    if message[0] <= until:
+                        raise RuntimeError("Customer arrives at %.0f s, inside the "
+                                           "window ending at %.0f s" % (message[0], until))
+                    inboxes[owner[message[1]]].append(message)
+            clock = until
+        kpis = []
+        for connection in connections:
+            connection.send(("kpis",))
+            kpis.extend(connection.recv())
+    finally:
+        for connection, process in zip(connections, processes):
+            connection.send(("stop",))
+            process.join()
+    return sorted(kpis, key=lambda store: store["store"])
+
+
+def totals(kpis):
+    names = ("customers", "served", "abandoned", "sent", "received", "turned_away")
+    return dict((name, sum(store[name] for store in kpis)) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a dealer group of many stores")
+    parser.add_argument("--stores", type=int, default=50)
+    parser.add_argument("--hours", type=float, default=12)
+    parser.add_argument("--shards", type=int, default=None,
+                        help="processes to run the stores on (default one per core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", action="store_true",
+                        help="also run everything in one process and compare")
+    args = parser.parse_args()
+
+    layout = make_layout(args.stores, args.seed)
+    duration = args.hours * HOUR
+    runs = [args.shards] + ([1] if args.compare else [])
+    for shards in runs:
+        start = time.time()
+        kpis = run_network(layout, duration, shards, args.seed)
+        took = time.time() - start
+        print("%d stores on %s shards: %.1f s, lookahead %.0f s" % (
+            args.stores, shards or multiprocessing.cpu_count(), took, layout["lookahead"]))
+        summary = totals(kpis)
+        for name in sorted(summary):
+            print("  %-12s %d" % (name, summary[name]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 08:47:13 2026
+
+@author: DavidCreech
+
+Analytic fast path: approximate KPIs without running the simulation.
+
+The customer state machine in Customers.py is written out as a Markov chain
+over (state, ticks since walking in, past the time limit) and solved with
+NumPy.  Salespeople enter as a mean-field assignment probability: each tick
+the idle salespeople pick from the customers nobody is helping, and that
+probability is found by false position (the Illinois variant) so that the
+chain and the staffing agree.
+
+Agents only think on seconds when a customer walks in (Dealership.process is
+called from the arrival branch), so every tick of the chain is exactly one
+arrival and ticks are arrival_chance per second apart on average.
+
+    python queueModel.py                # one estimate
+    python queueModel.py --validate     # compare against the simulator
+"""
+import argparse
+import time
+
+import numpy as np
+
+from Customers import StateModel
+
+# Customer states at the start of a tick.  "stale" customers still point at a
+#  salesperson who has walked away, so nobody else will pick them up until
+#  they look around again while shopping
+SHOP, IDLE, SHOP_STALE, IDLE_STALE, SHOP_ASSIGNED, IDLE_ASSIGNED, ENGAGED = range(7)
+STATES = 7
+BUSY_STATES = (SHOP_ASSIGNED, IDLE_ASSIGNED, ENGAGED)
+
+
+def overdue_hazards(arrival_chance, time_limit, eps=1e-9):
+    """
+    Chance a customer is past the time limit on their j-th tick given they
+    were not on the tick before.  Ticks land on arrival seconds, so the j-th
+    tick is past time_limit seconds when fewer than j of those seconds had an
+    arrival.  Returns the hazards for j = 1..J, the last one being 1.
+    """
+    seconds = int(time_limit)
+    pmf = np.zeros(seconds + 1)
+    pmf[0] = 1.0
+    for second in range(seconds):
+        pmf[1:] = pmf[1:] * (1 - arrival_chance) + pmf[:-1] * arrival_chance
+        pmf[0] *= 1 - arrival_chance
+    cdf = np.cumsum(pmf)
+
+    hazards = []
+    overdue = 0.0
+    for ticks in range(1, seconds + 2):
+        next_overdue = cdf[ticks - 1]
+        if next_overdue >= 1 - eps:
+            hazards.append(1.0)
+            break
+        hazards.append((next_overdue - overdue) / (1 - overdue))
+        overdue = next_overdue
+    return hazards
+
+
+class QueueModel(object):
+    """
+    The customer chain for one StateModel and arrival chance.  The transition
+    matrix is linear in the assignment probability a, so it is built once as
+    P = base + a * assign and only re-solved while searching for a.
+    """
+    def __init__(self, state_model=None, arrival_chance=0.2):
+        self.state_model = state_model or StateModel()
+        self.arrival_chance = arrival_chance
+
+        self.hazards = overdue_hazards(arrival_chance, self.state_model.time_limit)
+        self.ages = len(self.hazards) # Ages 0..ages-1 on time, plus one overdue block
+        self.size = STATES * (self.ages + 1)
+
+        size = self.size
+        self.think = np.zeros((size, size))  # Customer phase of a tick
+        self.left = np.zeros(size)           # Chance of walking out this tick
+        self._build_think()
+
+        # Assignment happens after the customers think, then everybody ages
+        self.age = self._age_matrix()
+        grab = np.zeros((size, size))
+        for block in range(self.ages + 1):
+            for state, assigned in ((SHOP, SHOP_ASSIGNED), (IDLE, IDLE_ASSIGNED)):
+                index = self.index(state, block)
+                grab[index, index] -= 1.0
+                grab[index, self.index(assigned, block)] += 1.0
+        self.base = self.think.dot(self.age)
+        self.assign = self.think.dot(grab).dot(self.age)
+
+        self.start = np.zeros(size)
+        self.start[self.index(SHOP, 0)] = 1.0
+
+        eligible = np.zeros(size)
+        for block in range(self.ages + 1):
+            eligible[self.index(SHOP, block)] = 1.0
+            eligible[self.index(IDLE, block)] = 1.0
+        self.eligible_after_think = self.think.dot(eligible)
+
+        self.busy = np.zeros(size)
+        self.engaged = np.zeros(size)
+        for block in range(self.ages + 1):
+            for state in BUSY_STATES:
+                self.busy[self.index(state, block)] = 1.0
+            self.engaged[self.index(ENGAGED, block)] = 1.0
+
+    def index(self, state, block):
+        # block is the age in ticks, or self.ages for the overdue customers
+        return block * STATES + state
+
+    def _build_think(self):
+        model = self.state_model
+        p_is = model.idle_to_shopping
+        p_si = model.shopping_to_idle
+        p_se = model.shopping_engage
+        p_ee = model.engaged_exit
+
+        for block in range(self.ages + 1):
+            overdue = block == self.ages
+            i = lambda state: self.index(state, block)
+
+            def move(state, to_state, chance):
+                self.think[i(state), i(to_state)] += chance
+
+            # Shopping on their own (and stale ones looking around again)
+            for state in (SHOP, SHOP_STALE):
+                move(state, IDLE, p_si)
+                move(state, SHOP, 1 - p_si)
+            # The salesperson walked up last tick
+            move(SHOP_ASSIGNED, IDLE_STALE, p_si)
+            move(SHOP_ASSIGNED, ENGAGED, p_se)
+            move(SHOP_ASSIGNED, SHOP_STALE, 1 - p_si - p_se)
+            # Idle customers go back to shopping, or leave once past the limit
+            for state, idle_state, shop_state in ((IDLE, IDLE, SHOP),
+                                                  (IDLE_ASSIGNED, IDLE, SHOP),
+                                                  (IDLE_STALE, IDLE_STALE, SHOP_STALE)):
+                move(state, shop_state, p_is)
+                if overdue:
+                    self.left[i(state)] += 1 - p_is
+                else:
+                    move(state, idle_state, 1 - p_is)
+            move(ENGAGED, SHOP, p_ee)
+            move(ENGAGED, ENGAGED, 1 - p_ee)
+
+    def _age_matrix(self):
+        age = np.zeros((self.size, self.size))
+        overdue = self.ages
+        for block in range(self.ages + 1):
+            if block == overdue:
+                next_block, hazard = overdue, 0.0
+            else:
+                next_block, hazard = min(block + 1, overdue - 1), self.hazards[block]
+            for state in range(STATES):
+                index = self.index(state, block)
+                age[index, self.index(state, overdue)] += hazard
+                age[index, self.index(state, next_block)] += 1 - hazard
+        return age
+
+    def occupancy(self, a):
+        # Expected number of customers in each chain state at the start of a
+        #  tick.  One customer walks in per tick, so this is also the expected
+        #  number of ticks a customer spends in each state
+        transition = self.base + a * self.assign
+        return np.linalg.solve(np.eye(self.size) - transition.T, self.start)
+
+    def assignment_chance(self, salespeople, tolerance=1e-6, iterations=50):
+        """
+        Finds the chance that a customer nobody is helping gets picked up this
+        tick, consistent with how many salespeople are free.  The mismatch is
+        decreasing in a, so false position (Illinois variant) on [0, 1]
+        brackets the answer and usually lands in a handful of solves.
+        """
+        if salespeople <= 0:
+            return 0.0, self.occupancy(0.0)
+
+        def mismatch(a):
+            counts = self.occupancy(a)
+            free = max(0.0, salespeople - counts.dot(self.busy))
+            eligible = counts.dot(self.eligible_after_think)
+            wanted = min(1.0, free / eligible) if eligible > 0 else 1.0
+            return wanted - a, counts
+
+        low, high = 0.0, 1.0
+        low_gap, counts = mismatch(low)
+        high_gap, high_counts = mismatch(high)
+        if high_gap >= 0:
+            return high, high_counts
+        side = 0
+        for iteration in range(iterations):
+            a = (low * high_gap - high * low_gap) / (high_gap - low_gap)
+            gap, counts = mismatch(a)
+            if abs(gap) < tolerance or high - low < tolerance:
+                break
+            if gap > 0:
+                low, low_gap = a, gap
+                if side == 1:
+                    high_gap /= 2
+                side = 1
+            else:
+                high, high_gap = a, gap
+                if side == -1:
+                    low_gap /= 2
+                side = -1
+        return a, counts
+
+    def wait_distribution(self, a, max_ticks=2000, tail=1e-5):
+        """
+        Chance the first engagement or the walk out happens on each tick.
+        Returns (ticks until first engaged, ticks until left) arrays.
+        """
+        transition = self.base + a * self.assign
+        into_engaged = transition.dot(self.engaged)
+        # Engaged is absorbing for the wait: drop the columns that lead there
+        waiting = transition * (1 - self.engaged)
+        leaving = self.left
+
+        engaged_at, left_at = [], []
+        mass = self.start.copy()
+        for tick in range(max_ticks):
+            engaged_at.append(mass.dot(into_engaged))
+            left_at.append(mass.dot(leaving))
+            mass = mass.dot(waiting)
+            if mass.sum() < tail:
+                break
+        return np.array(engaged_at), np.array(left_at)
+
+    def estimate(self, salespeople):
+        a, counts = self.assignment_chance(salespeople)
+        engaged_at, left_at = self.wait_distribution(a)
+
+        # Waits are measured in ticks, arrival_chance per second apart
+        seconds = np.arange(len(engaged_at)) / self.arrival_chance
+        finished = engaged_at + left_at
+        cumulative = np.cumsum(finished) / finished.sum()
+        p95_tick = int(np.searchsorted(cumulative, 0.95))
+
+        return {
+            "assignment_chance": a,
+            "utilization": counts.dot(self.busy) / salespeople if salespeople else 0.0,
+            "wait_mean": finished.dot(seconds) / finished.sum(),
+            "wait_p95": seconds[min(p95_tick, len(seconds) - 1)],
+            "abandon_rate": left_at.sum() / finished.sum(),
+            "in_store": counts.sum(),
+        }
+
+
+_models = {}
+_estimates = {}
+
+
+def estimate(salespeople=1, arrival_chance=0.2, state_model=None):
+    """
+    Approximate utilization, wait and abandonment for a dealership.  The chain
+    for each (state model, arrival chance) is built once and every answer is
+    kept, so a slider going back over old values is a dictionary lookup.
+    """
+    state_model = state_model or StateModel()
+    key = (state_model.key(), arrival_chance)
+    result = _estimates.get(key + (salespeople,))
+    if result is None:
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = QueueModel(state_model, arrival_chance)
+        result = _estimates[key + (salespeople,)] = model.estimate(salespeople)
+    return result
+
+
+def validate(arrival_chances=(0.1, 0.2, 0.3), staff=(1, 2, 4), duration=None,
+             seeds=(0, 1), processes=None):
+    """
+    Runs the full simulator over the parameter grid and returns one row per
+    grid point with the simulated KPIs, the estimate and the error.
+    """
+    from headlessSim import run_many, DAY
+
+    duration = duration or DAY
+    grid = [(chance, salespeople) for chance in arrival_chances
+            for salespeople in staff]
+    configs = [dict(duration=duration, seed=seed, arrival_chance=chance,
+                    salesPeople_count=salespeople)
+               for chance, salespeople in grid
+               for seed in seeds]
+    results = run_many(configs, processes)
+
+    rows = []
+    for index, (chance, salespeople) in enumerate(grid):
+        runs = results[index * len(seeds):(index + 1) * len(seeds)]
+        simulated = {}
+        for metric in METRICS:
+            simulated[metric] = sum(run[metric] for run in runs) / float(len(runs))
+        estimated = estimate(salespeople, chance)
+        error = dict((metric, estimated[metric] - simulated[metric])
+                     for metric in METRICS)
+        rows.append((chance, salespeople, simulated, estimated, error))
+    return rows
+
+
+METRICS = ("utilization", "wait_mean", "wait_p95", "abandon_rate")
+
+
+def print_validation(rows):
+    print("%-8s %-5s" % ("arrival", "staff") +
+          "".join(" %22s" % metric for metric in METRICS))
+    for chance, salespeople, simulated, estimated, error in rows:
+        print("%-8.2f %-5d" % (chance, salespeople) +
+              "".join(" %7.2f/%7.2f %+6.2f" % (simulated[metric], estimated[metric],
+                                              error[metric])
+                      for metric in METRICS))
+    print("Mean absolute error: " +
+          "  ".join("%s %.3f" % (metric, sum(abs(row[4][metric]) for row in rows) / len(rows))
+                    for metric in METRICS))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Approximate dealership KPIs from the analytic model")
+    parser.add_argument("--salespeople", type=int, default=1)
+    parser.add_argument("--arrival-chance", type=float, default=0.2)
+    parser.add_argument("--validate", action="store_true",
+                        help="compare against the simulator over a grid (sim/estimate error)")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.validate:
+        print_validation(validate(processes=args.processes))
+        return
+
+    start = time.time()
+    model = QueueModel(arrival_chance=args.arrival_chance)
+    built = time.time()
+    result = model.estimate(args.salespeople)
+    solved = time.time()
+    estimate(args.salespeople, args.arrival_chance)
+    start_cached = time.time()
+    estimate(args.salespeople, args.arrival_chance)
+    cached = time.time()
+    for metric in sorted(result):
+        print("%-18s %.3f" % (metric, result[metric]))
+    print("Chain built in %.0f us, solved in %.0f us, cached answer in %.1f us" %
+          ((built - start) * 1e6, (solved - built) * 1e6, (cached - start_cached) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
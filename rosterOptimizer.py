@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 10:25:51 2026
+
+@author: DavidCreech
+
+Searches for the cheapest salesperson roster that keeps the 95th percentile
+customer wait under a target.
+
+Rosters are built by choosing how many salespeople work each shift template.
+Candidates are tried cheapest first, a batch at a time over a process pool of
+headless simulations, so the search stops as soon as the cheapest batch with
+a roster that meets the target has been run.
+
+    python rosterOptimizer.py --target 150 --days 7
+"""
+import argparse
+import itertools
+
+from headlessSim import run_many, DAY, WEEK
+from shiftSchedule import Shift, HOUR, roster_cost, covers_hours
+
+OPEN_HOURS = (9 * HOUR, 21 * HOUR)
+
+# Shift templates for a store open 9am to 9pm
+TEMPLATES = [
+    Shift("open", 8 * HOUR + 30 * 60, 17 * HOUR,
+          breaks=[(10 * HOUR + 30 * 60, 10 * HOUR + 45 * 60),
+                  (15 * HOUR, 15 * HOUR + 15 * 60)],
+          lunch=(12 * HOUR, 12 * HOUR + 30 * 60)),
+    Shift("mid", 11 * HOUR, 19 * HOUR,
+          breaks=[(13 * HOUR, 13 * HOUR + 15 * 60)],
+          lunch=(15 * HOUR + 30 * 60, 16 * HOUR)),
+    Shift("close", 12 * HOUR + 30 * 60, 21 * HOUR,
+          breaks=[(14 * HOUR + 30 * 60, 14 * HOUR + 45 * 60),
+                  (19 * HOUR, 19 * HOUR + 15 * 60)],
+          lunch=(16 * HOUR + 30 * 60, 17 * HOUR)),
+]
+
+
+def candidate_rosters(templates, max_per_shift, open_hours):
+    """Every headcount combination that covers the open hours, cheapest first."""
+    candidates = []
+    for counts in itertools.product(range(max_per_shift + 1), repeat=len(templates)):
+        roster = []
+        for template, count in zip(templates, counts):
+            roster.extend([template] * count)
+        if roster and covers_hours(roster, open_hours):
+            candidates.append((roster_cost(roster), counts, roster))
+    candidates.sort(key=lambda candidate: (candidate[0], candidate[1]))
+    return candidates
+
+
+def optimize_roster(target_p95, templates=TEMPLATES, duration=WEEK, seeds=(0, 1, 2),
+                    max_per_shift=3, open_hours=OPEN_HOURS, processes=None,
+                    batch_size=8):
+    """
+    Returns (roster, daily cost, worst p95 wait over the seeds) for the
+    cheapest roster whose p95 wait stays under target_p95 seconds in every
+    seed, or None if no candidate does.
+    """
+    candidates = candidate_rosters(templates, max_per_shift, open_hours)
+
+    for batch_start in range(0, len(candidates), batch_size):
+        batch = candidates[batch_start:batch_start + batch_size]
+        configs = [dict(duration=duration, seed=seed, roster=roster,
+                        open_hours=open_hours)
+                   for cost, counts, roster in batch
+                   for seed in seeds]
+        results = run_many(configs, processes)
+
+        best = None
+        for index, (cost, counts, roster) in enumerate(batch):
+            runs = results[index * len(seeds):(index + 1) * len(seeds)]
+            worst_p95 = max(run["wait_p95"] for run in runs)
+            if worst_p95 <= target_p95 and best is None:
+                best = (roster, cost, worst_p95)
+        if best is not None:
+            return best
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find the cheapest roster that meets a p95 wait target")
+    parser.add_argument("--target", type=float, default=150.0,
+                        help="p95 wait target in simulated seconds")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--max-per-shift", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    best = optimize_roster(args.target, duration=args.days * DAY,
+                           seeds=range(args.seeds),
+                           max_per_shift=args.max_per_shift,
+                           processes=args.processes)
+    if best is None:
+        print("No roster meets a p95 wait of %s seconds" % args.target)
+        return
+    roster, cost, worst_p95 = best
+    print("Cheapest roster: %s" % roster)
+    print("Cost per day: %.2f  Worst p95 wait: %.1f seconds" % (cost, worst_p95))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov  9 09:26:41 2026
+
+@author: DavidCreech
+
+Routes waiting customers to salespeople by skill instead of sending a free
+salesperson to whoever is first in line.
+
+Salespeople have skills and customers have needs, both sets of strings like
+"brand:Ford", "language:es" or "finance".  A salesperson can take a customer
+whose needs are all among their skills.  A customer's needs come from the
+Router's needs function (customer_needs by default), worked out once as
+they walk in.
+
+Waiting customers sit in one priority queue (a heap) per set of needs, plus
+one per salesperson for the customers who asked for them.  A customer's
+priority is how long they have been in the store, so everyone ages toward
+the front, and in their preferred salesperson's queue they get a head start
+of preferred_head_start seconds.  Since every customer ages at the same
+rate the order never changes and the heap key can simply be the time they
+walked in less the head start.  Customers who were helped and went back to
+shopping start waiting again from then, otherwise they would sit at the
+front of the line ahead of everyone nobody has talked to yet.
+
+A free salesperson looks at the front of each queue they have the skills
+for and of their own queue, and takes the customer who has waited the
+longest.  There are only as many queues as distinct sets of needs, so a
+match costs a few heap pops however many customers are waiting.  Customers
+who stop waiting (or leave) stay in the heaps flagged as gone and are
+dropped when they reach the front.
+
+Needs are a preference, not a wall.  Once a customer has been in the store
+fallback_after seconds (by default half the state model's time_limit, when
+they start to think about leaving) any free salesperson will take them if
+they are the longest waiting, so customers nobody on duty fully covers are
+still helped.  A salesperson's own queue is dropped when they clock out,
+the customers in it are still in the queues for their needs.
+
+    python routing.py --salespeople 300 --waiting 5000     # against a scan
+    python routing.py --check           # picks against a brute force scan
+"""
+import time
+import heapq
+import random
+import argparse
+import itertools
+
+LANGUAGES = (("en", 0.8), ("es", 0.15), ("vi", 0.05))
+BRANDS = ("Ford", "Chevrolet", "Toyota", "Honda", "Nissan", "Jeep")
+
+_GONE = 3 # Index of the flag in a queue entry
+
+
+def customer_needs(customer, rng=random, finance_chance=0.2):
+    """
+    The brand they are shopping for (from their preferences), the language
+    they speak if it isn't English, and sometimes someone who can do the
+    financing.
+    """
+    needs = set()
+    preferences = customer.preferences
+    if preferences is not None and preferences.make is not None:
+        needs.add("brand:" + preferences.make)
+    roll = rng.random()
+    for language, share in LANGUAGES:
+        roll -= share
+        if roll < 0:
+            break
+    if language != "en":
+        needs.add("language:" + language)
+    if rng.random() < finance_chance:
+        needs.add("finance")
+    return frozenset(needs)
+
+
+def random_skills(rng=random, brands=2, finance_chance=0.5):
+    """A couple of brands, maybe a second language, maybe financing."""
+    skills = set("brand:" + brand for brand in rng.sample(BRANDS, brands))
+    if rng.random() < 0.3:
+        skills.add("language:" + rng.choice(("es", "vi")))
+    if rng.random() < finance_chance:
+        skills.add("finance")
+    return frozenset(skills)
+
+
+class Router(object):
+    def __init__(self, dealership, needs=customer_needs, preferred_head_start=120.0,
+                 fallback_after=None):
+        self.dealership = dealership
+        self.needs = needs
+        self.preferred_head_start = preferred_head_start
+        self.fallback_after = fallback_after # None for half the time_limit
+        self.queues = {}    # frozenset of needs -> heap of entries
+        self.preferred = {} # salesperson id -> heap of entries
+        self.entries = {}   # waiting customer -> their entry
+        self.eligible = {}  # frozenset of skills -> heaps of the needs they cover
+        self.count = itertools.count()
+        self.matched = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, customer, waiting):
+        """Called whenever a customer may have started or stopped waiting."""
+        entry = self.entries.get(customer)
+        if waiting and entry is None:
+            if customer.needs is None:
+                customer.needs = self.needs(customer)
+            # [heap key, tie breaker, customer, gone].  Someone already
+            #  helped who is back to shopping starts waiting again now
+            since = customer.entered_store
+            if customer.was_helped:
+                since = self.dealership.elapsedTime
+            entry = [since, next(self.count), customer, False]
+            self.entries[customer] = entry
+            queue = self.queues.get(customer.needs)
+            if queue is None:
+                queue = self.queues[customer.needs] = []
+                self.eligible = {} # A new set of needs, worked out again as needed
+            heapq.heappush(queue, entry)
+            preferred_sp = customer.preferred_sp
+            if preferred_sp is not None and preferred_sp.on_duty:
+                # The same customer with a head start, sharing the gone flag
+                heapq.heappush(self.preferred.setdefault(preferred_sp.id, []),
+                               [entry[0] - self.preferred_head_start, entry[1],
+                                customer, entry])
+        elif not waiting and entry is not None:
+            entry[_GONE] = True
+            del self.entries[customer]
+
+    def clock_out(self, salesPerson):
+        # Their own queue goes, nobody else looks at it
+        self.preferred.pop(salesPerson.id, None)
+
+    def _front(self, queue):
+        # Oldest entry still waiting, None if the queue is empty
+        while queue and queue[0][_GONE]:
+            heapq.heappop(queue)
+        return queue[0] if queue else None
+
+    def queues_for(self, skills):
+        # Every queue whose needs the skills cover
+        queues = self.eligible.get(skills)
+        if queues is None:
+            queues = self.eligible[skills] = [queue for needs, queue in self.queues.items()
+                                              if needs <= skills]
+        return queues
+
+    def next_for(self, salesPerson):
+        """Takes the customer the salesperson should help next, None if there isn't one."""
+        best = None
+        best_queue = None
+        for queue in self.queues_for(salesPerson.skills):
+            front = self._front(queue)
+            if front is not None and (best is None or front < best):
+                best = front
+                best_queue = queue
+        own = self.preferred.get(salesPerson.id)
+        if own:
+            # Entries here point at the customer's main entry for the flag
+            while own and own[0][_GONE][_GONE]:
+                heapq.heappop(own)
+            if own and (best is None or own[0][:2] < best[:2]):
+                best = own[0]
+                best_queue = own
+        # Whoever has waited past fallback_after, skills or not
+        fallback_after = self.fallback_after
+        if fallback_after is None:
+            fallback_after = self.dealership.state_model.time_limit / 2.0
+        cutoff = self.dealership.elapsedTime - fallback_after
+        for queue in self.queues.values():
+            front = self._front(queue)
+            if (front is not None and front[0] <= cutoff
+                    and (best is None or front[:2] < best[:2])):
+                best = front
+                best_queue = queue
+        if best is None:
+            return None
+        heapq.heappop(best_queue)
+        customer = best[2]
+        self.update(customer, False)
+        self.matched += 1
+        return customer
+
+
+def assign_skills(salesPeople, rng=random):
+    for salesPerson in salesPeople:
+        salesPerson.skills = random_skills(rng)
+
+
+def benchmark(salespeople=300, waiting=5000, matches=20000, seed=0):
+    """
+    Microseconds per match with the Router and with a first-come scan of
+    every waiting customer, for a dealer group with this many salespeople
+    and customers waiting.  Every matched customer is replaced by a new one
+    so the line stays the same length.
+    """
+    from headlessSim import build_dealership, muted
+
+    rng = random.Random(seed)
+    with muted():
+        dlr = build_dealership(salespeople, pooled=True)
+    staff = list(dlr.salesPeople.values())
+    assign_skills(staff, rng)
+    timings = {}
+    for name in ("router", "scan"):
+        random.seed(seed)
+        rng.seed(seed)
+        router = Router(dlr, lambda customer: customer_needs(customer, rng))
+        line = []
+        with muted():
+            for number in range(waiting):
+                customer = dlr.new_customer()
+                customer.entered_store = number
+                customer.brain.set_state("shopping")
+                customer.needs = router.needs(customer)
+                line.append(customer)
+                router.update(customer, True)
+        clock = waiting
+        found = 0
+        start = time.time()
+        for match in range(matches):
+            salesPerson = staff[match % len(staff)]
+            if name == "router":
+                customer = router.next_for(salesPerson)
+            else:
+                customer = None
+                for index, candidate in enumerate(line):
+                    if candidate.needs <= salesPerson.skills:
+                        customer = line.pop(index)
+                        break
+            if customer is None:
+                continue
+            found += 1
+            # They are helped and someone new joins the line
+            customer.entered_store = clock
+            clock += 1
+            if name == "router":
+                router.update(customer, True)
+            else:
+                line.append(customer)
+        timings[name] = ((time.time() - start) / matches * 1e6, found)
+    return timings
+
+
+class _Stub(object):
+    # Stands in for customers, salespeople and the dealership in check
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+def check(runs=200, steps=400, seed=0):
+    """
+    Drives Routers with random walk-ins, customers who stop and start
+    waiting (helped ones too), salespeople clocking out and back in and
+    new sets of needs turning up, and checks every next_for against a scan
+    of everyone waiting: the best key among the customers the skills
+    cover and those who asked for this salesperson (less the head start),
+    unless someone past the fallback cutoff has waited longer.  Raises
+    AssertionError on the first difference, returns the matches checked.
+    """
+    rng = random.Random(seed)
+    pool = ("brand:Ford", "brand:Toyota", "language:es", "finance", "brand:Jeep")
+    matches = 0
+    for run in range(runs):
+        dlr = _Stub(elapsedTime=0.0, state_model=_Stub(time_limit=rng.choice((4, 10, 40))))
+        router = Router(dlr, lambda customer: customer.wants,
+                        preferred_head_start=rng.choice((0.0, 5.0, 120.0)),
+                        fallback_after=rng.choice((None, 0.0, 3.0)))
+        staff = [_Stub(id=number, on_duty=True,
+                       skills=frozenset(rng.sample(pool, rng.randint(0, 3))))
+                 for number in range(rng.randint(1, 4))]
+        everyone = []
+        waiting = {} # Customer -> [key, tie breaker, preferred salesperson or None]
+        serial = itertools.count()
+
+        def start(customer):
+            since = dlr.elapsedTime if customer.was_helped else customer.entered_store
+            preferred_sp = customer.preferred_sp
+            own = preferred_sp if preferred_sp is not None and preferred_sp.on_duty else None
+            waiting[customer] = [since, next(serial), own]
+            router.update(customer, True)
+
+        def stop(customer):
+            waiting.pop(customer, None)
+            router.update(customer, False)
+
+        for step in range(steps):
+            dlr.elapsedTime += rng.choice((0.0, 0.5, 1.0, 3.0))
+            roll = rng.random()
+            if roll < 0.35:
+                customer = _Stub(needs=None, entered_store=dlr.elapsedTime,
+                                 was_helped=False,
+                                 wants=frozenset(rng.sample(pool, rng.randint(0, 2))),
+                                 preferred_sp=rng.choice(staff + [None] * 3))
+                everyone.append(customer)
+                start(customer)
+            elif roll < 0.5 and waiting:
+                stop(rng.choice(list(waiting)))
+            elif roll < 0.6 and everyone:
+                customer = rng.choice(everyone)
+                if customer not in waiting:
+                    customer.was_helped = customer.was_helped or rng.random() < 0.5
+                    start(customer)
+            elif roll < 0.7:
+                salesPerson = rng.choice(staff)
+                if salesPerson.on_duty:
+                    salesPerson.on_duty = False
+                    router.clock_out(salesPerson)
+                    for entry in waiting.values():
+                        if entry[2] is salesPerson:
+                            entry[2] = None
+                else:
+                    salesPerson.on_duty = True
+            else:
+                salesPerson = rng.choice(staff)
+                fallback_after = router.fallback_after
+                if fallback_after is None:
+                    fallback_after = dlr.state_model.time_limit / 2.0
+                cutoff = dlr.elapsedTime - fallback_after
+                best, best_key = None, None
+                for customer, (since, tie, own) in waiting.items():
+                    keys = []
+                    if customer.wants <= salesPerson.skills:
+                        keys.append((since, tie))
+                    if own is salesPerson:
+                        keys.append((since - router.preferred_head_start, tie))
+                    for key in keys:
+                        if best is None or key < best_key:
+                            best, best_key = customer, key
+                for customer, (since, tie, own) in waiting.items():
+                    if since <= cutoff and (best is None or (since, tie) < best_key):
+                        best, best_key = customer, (since, tie)
+                picked = router.next_for(salesPerson)
+                assert picked is best, "run %d step %d: router %r, scan %r" % (
+                    run, step, picked and picked.wants, best and best.wants)
+                if best is not None:
+                    del waiting[best]
+                    matches += 1
+            assert len(router) == len(waiting), "run %d step %d" % (run, step)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time skill routing against a scan")
+    parser.add_argument("--salespeople", type=int, default=300)
+    parser.add_argument("--waiting", type=int, default=5000)
+    parser.add_argument("--matches", type=int, default=20000)
+    parser.add_argument("--check", action="store_true",
+                        help="compare the router's picks with a scan instead")
+    args = parser.parse_args()
+    if args.check:
+        print("%d matches agree with the scan" % check())
+        return
+    timings = benchmark(args.salespeople, args.waiting, args.matches)
+    for name in ("router", "scan"):
+        print("%-6s %8.1f us a match, %d matched" % ((name,) + timings[name]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Nov 12 09:37:05 2026
+
+@author: DavidCreech
+
+A catalogue of finished runs in a local sqlite file, so comparing scenarios
+is a query instead of re-reading result files or simulating again.
+
+Every run is one row: the scenario (the run_headless arguments, with the
+defaults filled in) as indexed columns plus the full configuration as JSON,
+and the KPIs from headlessSim.summarize.  A run's key is a hash of its full
+configuration, so asking for a scenario that has already been run is an
+index lookup (RunStore.lookup) and RunStore.run_many only simulates what
+isn't in the store yet.  Runs without a seed are random replications:
+they are always simulated and each one is stored as a row of its own.
+
+Filters are (column, operator, value) and only known columns and operators
+are let through to the SQL.
+
+    python runStore.py runs.sqlite --demo 500
+    python runStore.py runs.sqlite --where salespeople=4 --where "arrival_chance>0.3"
+        --where "wait_p95<300" --order wait_p95
+"""
+import re
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import inspect
+import argparse
+
+from headlessSim import run_headless, run_many
+
+# Scenario columns: name -> sqlite type
+SCENARIO = (("seed", "INTEGER"), ("duration", "REAL"), ("salespeople", "INTEGER"),
+            ("arrival_chance", "REAL"), ("opening", "REAL"), ("closing", "REAL"),
+            ("pooled", "INTEGER"), ("floor", "INTEGER"), ("crm", "INTEGER"),
+            ("routing", "INTEGER"), ("inventory", "TEXT"), ("trace", "TEXT"))
+KPIS = (("customers", "INTEGER"), ("served", "INTEGER"), ("abandoned", "INTEGER"),
+        ("abandon_rate", "REAL"), ("wait_mean", "REAL"), ("wait_p95", "REAL"),
+        ("in_store", "INTEGER"), ("utilization", "REAL"), ("returns", "INTEGER"),
+        ("sim_time", "REAL"))
+COLUMNS = tuple(name for name, kind in SCENARIO + KPIS) + ("id", "created")
+INDEXED = (("salespeople", "arrival_chance"), ("arrival_chance",), ("wait_p95",),
+           ("wait_mean",), ("abandon_rate",), ("utilization",), ("created",))
+OPERATORS = ("<=", ">=", "!=", "=", "<", ">")
+
+# Arguments that don't change what a run does
+_IGNORED = ("quiet", "result", "gc_threshold")
+
+try:
+    _argspec = inspect.getfullargspec(run_headless)
+except AttributeError:
+    _argspec = inspect.getargspec(run_headless)
+DEFAULTS = dict((name, value) for name, value in
+                zip(_argspec.args[-len(_argspec.defaults):], _argspec.defaults)
+                if name not in _IGNORED)
+
+
+def _encode(value):
+    # What json can't write: StateModels by their key, anything else as repr
+    if hasattr(value, "key"):
+        return list(value.key())
+    return repr(value)
+
+
+def full_config(config):
+    full = dict(DEFAULTS)
+    full.update((name, value) for name, value in config.items() if name not in _IGNORED)
+    return full
+
+
+def _key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def config_key(config):
+    """
+    The same for every config that runs the same scenario, None without a
+    seed since no two of those runs are the same.
+    """
+    full = full_config(config)
+    if full["seed"] is None:
+        return None
+    return _key(json.dumps(full, sort_keys=True, default=_encode))
+
+
+def scenario(full):
+    # The indexed columns for a full config
+    roster = full.get("roster")
+    opening, closing = full["open_hours"] or (None, None)
+    return {
+        "seed": full["seed"], "duration": full["duration"],
+        "salespeople": len(roster) if roster is not None else full["salesPeople_count"],
+        "arrival_chance": full["arrival_chance"], "opening": opening, "closing": closing,
+        "pooled": int(bool(full["pooled"])), "floor": int(bool(full["floor"])),
+        "crm": int(bool(full["crm"])), "routing": int(bool(full["routing"])),
+        "inventory": full["inventory"] if isinstance(full["inventory"], str) else None,
+        "trace": full["trace"],
+    }
+
+
+def parse_filter(text):
+    """"wait_p95<300" -> ("wait_p95", "<", 300.0)"""
+    match = re.match(r"\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$", text)
+    if match is None:
+        raise ValueError("Can't read filter %r" % text)
+    column, operator, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        pass
+    return column, operator, value
+
+
+class RunStore(object):
+    def __init__(self, path="runs.sqlite"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL") # Readers don't block writers
+        columns = ", ".join("%s %s" % pair for pair in SCENARIO + KPIS)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, "
+                "key TEXT UNIQUE, created REAL, config TEXT, %s)" % columns)
+            for index in INDEXED:
+                self.connection.execute("CREATE INDEX IF NOT EXISTS runs_%s ON runs (%s)"
+                                        % ("_".join(index), ", ".join(index)))
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def _row(self, config, kpis, created):
+        full = full_config(config)
+        row = scenario(full)
+        row.update((name, kpis.get(name)) for name, kind in KPIS)
+        row["config"] = json.dumps(full, sort_keys=True, default=_encode)
+        if full["seed"] is None:
+            # A replication, never replaced by or read back for another one
+            row["key"] = _key(row["config"] + uuid.uuid4().hex)
+        else:
+            row["key"] = _key(row["config"])
+        row["created"] = created
+        return row
+
+    def add_many(self, runs):
+        """
+        Stores (config, kpis) pairs in one transaction, replacing runs of the
+        same scenario.  This is how a batch from the workers goes in.
+        """
+        created = time.time()
+        rows = [self._row(config, kpis, created) for config, kpis in runs]
+        if not rows:
+            return 0
+        names = sorted(rows[0])
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO runs (%s) VALUES (%s)"
+                % (", ".join(names), ", ".join("?" * len(names))),
+                [[row[name] for name in names] for row in rows])
+        return len(rows)
+
+    def add(self, config, kpis):
+        self.add_many([(config, kpis)])
+
+    def lookup(self, config):
+        """The stored KPIs for this scenario, None if it hasn't been run or has no seed."""
+        key = config_key(config)
+        if key is None:
+            return None
+        row = self.connection.execute("SELECT * FROM runs WHERE key = ?",
+                                      (key,)).fetchone()
+        return None if row is None else dict((name, row[name]) for name, kind in KPIS)
+
+    def query(self, filters=(), order=None, limit=None, columns=None):
+        """
+        Runs matching every (column, operator, value) filter, as dicts.
+        order is a column, with a leading "-" for largest first.
+        """
+        clauses = []
+        values = []
+        for column, operator, value in filters:
+            if column not in COLUMNS or operator not in OPERATORS:
+                raise ValueError("Can't filter on %s %s" % (column, operator))
+            if value is None:
+                clauses.append("%s IS %sNULL" % (column, "NOT " if operator == "!=" else ""))
+            else:
+                clauses.append("%s %s ?" % (column, operator))
+                values.append(value)
+        columns = columns or COLUMNS
+        for column in columns:
+            if column not in COLUMNS:
+                raise ValueError("No column %s" % column)
+        sql = "SELECT %s FROM runs" % ", ".join(columns)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if order:
+            descending = order.startswith("-")
+            order = order.lstrip("-")
+            if order not in COLUMNS:
+                raise ValueError("Can't order by %s" % order)
+            sql += " ORDER BY %s%s" % (order, " DESC" if descending else "")
+        if limit:
+            sql += " LIMIT %d" % int(limit)
+        return [dict(zip(columns, row)) for row in self.connection.execute(sql, values)]
+
+    def run_many(self, configs, processes=None):
+        """
+        Like headlessSim.run_many, but scenarios already in the store are
+        read back instead of run again and new ones are stored.  Unseeded
+        configs are always run.  KPIs that aren't columns (like visits) only
+        come back for the new runs.
+        """
+        results = [self.lookup(config) for config in configs]
+        missing = [number for number, kpis in enumerate(results) if kpis is None]
+        fresh = run_many([configs[number] for number in missing], processes)
+        self.add_many([(configs[number], kpis) for number, kpis in zip(missing, fresh)])
+        for number, kpis in zip(missing, fresh):
+            results[number] = kpis
+        return results
+
+    def close(self):
+        self.connection.close()
+
+
+def demo_configs(runs, seed=0):
+    # A sweep over staff and traffic, a few seeds of each
+    configs = []
+    salespeople = range(1, 7)
+    chances = [0.05 * step for step in range(1, 11)]
+    number = 0
+    while len(configs) < runs:
+        for count in salespeople:
+            for chance in chances:
+                if len(configs) < runs:
+                    configs.append(dict(duration=3600.0, seed=seed + number,
+                                        salesPeople_count=count,
+                                        arrival_chance=round(chance, 2), pooled=True))
+        number += 1
+    return configs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the catalogue of past runs")
+    parser.add_argument("store", nargs="?", default="runs.sqlite")
+    parser.add_argument("--where", action="append", default=[],
+                        help='a filter like "wait_p95<300", may be repeated')
+    parser.add_argument("--order", default=None, help="column, -column for largest first")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--demo", type=int, default=None,
+                        help="run (or read back) this many sweep scenarios first")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    store = RunStore(args.store)
+    if args.demo:
+        start = time.time()
+        store.run_many(demo_configs(args.demo), args.processes)
+        print("%d scenarios ready in %.1f s, %d runs stored"
+              % (args.demo, time.time() - start, len(store)))
+
+    shown = ("id", "seed", "salespeople", "arrival_chance", "customers",
+             "abandon_rate", "wait_mean", "wait_p95", "utilization")
+    start = time.time()
+    rows = store.query([parse_filter(text) for text in args.where], args.order,
+                       args.limit, shown)
+    took = time.time() - start
+    print(" ".join("%14s" % column for column in shown))
+    for row in rows:
+        print(" ".join("%14.4g" % row[column] if isinstance(row[column], float)
+                       else "%14s" % row[column] for column in shown))
+    print("%d rows in %.1f ms" % (len(rows), took * 1000))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
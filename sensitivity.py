@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov 16 09:26:51 2026
+
+@author: DavidCreech
+
+Global sensitivity analysis: which knob moves a KPI (abandonment by
+default) the most, over the whole range of every knob at once.
+
+Two methods, both on designs from a Sobol sequence so the space is covered
+evenly with few runs:
+
+    sobol   Variance based indices with Saltelli's design.  The first order
+            index is the share of the KPI's variance a factor explains on
+            its own, the total index adds everything it does together with
+            the others.  Costs samples * (factors + 2) runs.
+    morris  Elementary effects along trajectories through a grid.  mu_star
+            ranks the factors by how much they move the KPI, sigma shows
+            how much that depends on the others.  Costs trajectories *
+            (factors + 1) runs, so it is the cheap first look.
+
+Confidence intervals come from bootstrapping the base samples (or
+trajectories).  Every point of a base sample runs with the same seeds, so
+the differences between them are down to the factors and not the dice.
+
+Runs go through a runStore.RunStore in batches over a process pool, so a
+design that has been run before is read back rather than simulated again
+and an interrupted analysis picks up where it stopped.  budget caps the
+number of runs in the design and deadline the seconds spent, after which
+the indices are worked out from the batches that are done.
+
+    python sensitivity.py --method morris --trajectories 20
+    python sensitivity.py --method sobol --samples 128 --budget 2000 --deadline 900
+"""
+import time
+import argparse
+
+import numpy as np
+
+from Customers import StateModel
+from runStore import RunStore
+
+# Knobs: name, lowest, highest, whole numbers only
+FACTORS = (("arrival_chance", 0.05, 0.5, False),
+           ("time_limit", 5, 60, True),
+           ("engaged_exit", 0.1, 0.9, False),
+           ("salespeople", 1, 6, True))
+
+# Direction numbers (Joe and Kuo) for Sobol dimensions 2 on: degree s,
+#  coefficients a and initial m.  The first dimension is van der Corput's
+_JOE_KUO = ((1, 0, (1,)), (2, 1, (1, 3)), (3, 1, (1, 3, 1)), (3, 2, (1, 1, 1)),
+            (4, 1, (1, 1, 3, 3)), (4, 4, (1, 3, 5, 13)), (5, 2, (1, 1, 5, 5, 17)),
+            (5, 4, (1, 1, 5, 5, 5)), (5, 7, (1, 1, 7, 11, 19)),
+            (5, 11, (1, 1, 5, 1, 1)), (5, 13, (1, 1, 1, 3, 11)),
+            (5, 14, (1, 3, 5, 5, 31)))
+BITS = 30
+MAX_DIMENSIONS = len(_JOE_KUO) + 1
+
+
+def _directions(dimensions):
+    directions = np.zeros((dimensions, BITS), dtype=np.int64)
+    directions[0] = 1 << (BITS - 1 - np.arange(BITS))
+    for dimension in range(1, dimensions):
+        degree, coefficients, initial = _JOE_KUO[dimension - 1]
+        row = directions[dimension]
+        for bit in range(BITS):
+            if bit < degree:
+                row[bit] = initial[bit] << (BITS - 1 - bit)
+                continue
+            value = row[bit - degree] ^ (row[bit - degree] >> degree)
+            for back in range(1, degree):
+                if (coefficients >> (degree - 1 - back)) & 1:
+                    value ^= row[bit - back]
+            row[bit] = value
+    return directions
+
+
+def sobol_points(count, dimensions, skip=1):
+    """
+    Points skip to skip + count of the Sobol sequence in the unit cube,
+    one row each.  The first point (all zeros) is skipped by default.
+    """
+    if dimensions > MAX_DIMENSIONS:
+        raise ValueError("Only %d Sobol dimensions here" % MAX_DIMENSIONS)
+    directions = _directions(dimensions)
+    index = np.arange(skip, skip + count, dtype=np.int64)
+    gray = index ^ (index >> 1)
+    points = np.zeros((count, dimensions), dtype=np.int64)
+    for bit in range(BITS):
+        points ^= ((gray >> bit) & 1)[:, None] * directions[:, bit]
+    return points / float(1 << BITS)
+
+
+def scale(unit, factors=FACTORS):
+    """Rows of the unit cube as dicts of factor values."""
+    rows = []
+    for point in unit:
+        values = {}
+        for (name, low, high, whole), u in zip(factors, point):
+            if whole:
+                values[name] = min(high, int(low + u * (high - low + 1)))
+            else:
+                values[name] = low + u * (high - low)
+        rows.append(values)
+    return rows
+
+
+def make_config(values, duration, seed):
+    # run_headless arguments for one point, with the defaults for anything
+    #  not being varied
+    default = StateModel()
+    model = StateModel(**dict((name, values.get(name, getattr(default, name)))
+                              for name in ("idle_to_shopping", "shopping_to_idle",
+                                           "shopping_engage", "engaged_exit",
+                                           "time_limit", "preferred_bonus")))
+    return dict(duration=duration, seed=seed, pooled=True, state_model=model,
+                salesPeople_count=values.get("salespeople", 1),
+                arrival_chance=values.get("arrival_chance", 0.2))
+
+
+class Evaluator(object):
+    """
+    Runs groups of points through the store a batch at a time and keeps
+    to the budget (runs) and deadline (seconds).
+    """
+    def __init__(self, store, output="abandon_rate", duration=4 * 60 * 60,
+                 replications=1, seed=0, processes=None, deadline=None,
+                 batch=64):
+        self.store = store
+        self.output = output
+        self.duration = duration
+        self.replications = replications
+        self.seed = seed
+        self.processes = processes
+        self.deadline = None if deadline is None else time.time() + deadline
+        self.batch = batch # Runs handed to the pool at once
+        self.runs = 0
+
+    def evaluate(self, groups):
+        """
+        groups is a list of lists of points (dicts of factor values).  All
+        the points of group g share seeds.  Returns an array (groups,
+        points) of the output averaged over the replications, for as many
+        groups as were done before the deadline.
+        """
+        per_group = len(groups[0]) * self.replications if groups else 1
+        step = max(1, self.batch // per_group)
+        done = []
+        for first in range(0, len(groups), step):
+            if self.deadline is not None and time.time() > self.deadline:
+                break
+            configs = []
+            for number, group in enumerate(groups[first:first + step], first):
+                seeds = [self.seed + (number * self.replications + replication)
+                         for replication in range(self.replications)]
+                configs.extend(make_config(values, self.duration, seed)
+                               for values in group for seed in seeds)
+            results = self.store.run_many(configs, self.processes)
+            self.runs += len(configs)
+            outputs = np.array([kpis[self.output] for kpis in results], dtype=float)
+            done.append(outputs.reshape(-1, len(groups[0]), self.replications).mean(axis=2))
+        if not done:
+            return np.zeros((0, len(groups[0]) if groups else 0))
+        return np.concatenate(done)
+
+
+def _affordable(wanted, runs_each, replications, budget):
+    # How many groups fit in the budget
+    if budget is None:
+        return wanted
+    return min(wanted, budget // (runs_each * replications))
+
+
+def sobol_indices(outputs):
+    """
+    First order (Saltelli 2010) and total (Jansen) indices from outputs
+    laid out as [f(A), f(B), f(AB_1) ... f(AB_k)] for every base sample.
+    """
+    f_a = outputs[:, 0]
+    f_b = outputs[:, 1]
+    f_ab = outputs[:, 2:]
+    variance = np.var(np.concatenate([f_a, f_b]))
+    if not variance:
+        zeros = np.zeros(f_ab.shape[1])
+        return zeros, zeros
+    first = np.mean(f_b[:, None] * (f_ab - f_a[:, None]), axis=0) / variance
+    total = 0.5 * np.mean((f_a[:, None] - f_ab) ** 2, axis=0) / variance
+    return first, total
+
+
+def bootstrap(statistic, outputs, resamples=500, confidence=0.95, seed=0):
+    # Percentile intervals for statistic(rows), resampling whole rows
+    rng = np.random.RandomState(seed)
+    rows = len(outputs)
+    draws = np.array([np.concatenate(statistic(outputs[rng.randint(rows, size=rows)]))
+                      for resample in range(resamples)])
+    tail = (1 - confidence) / 2 * 100
+    return np.percentile(draws, tail, axis=0), np.percentile(draws, 100 - tail, axis=0)
+
+
+def sobol_analysis(evaluator, factors=FACTORS, samples=64, budget=None,
+                   resamples=500):
+    """
+    Sobol indices of the evaluator's output for every factor.  samples is
+    rounded down to a power of two (where Sobol designs are most even)
+    after fitting the budget.  Returns one dict per factor and the number
+    of base samples used.
+    """
+    dimensions = len(factors)
+    wanted = _affordable(samples, dimensions + 2, evaluator.replications, budget)
+    if wanted < 2:
+        raise ValueError("The budget doesn't cover two base samples")
+    samples = 1 << (int(wanted).bit_length() - 1)
+    unit = sobol_points(samples, 2 * dimensions)
+    a, b = unit[:, :dimensions], unit[:, dimensions:]
+    groups = []
+    for row in range(samples):
+        points = [a[row], b[row]]
+        for factor in range(dimensions):
+            mixed = a[row].copy()
+            mixed[factor] = b[row, factor]
+            points.append(mixed)
+        groups.append(scale(points, factors))
+    outputs = evaluator.evaluate(groups)
+    if len(outputs) < 2:
+        raise RuntimeError("Ran out of time before two base samples were done")
+
+    first, total = sobol_indices(outputs)
+    low, high = bootstrap(sobol_indices, outputs, resamples)
+    results = []
+    for number, factor in enumerate(factors):
+        results.append({"factor": factor[0], "first": first[number],
+                        "first_ci": (low[number], high[number]),
+                        "total": total[number],
+                        "total_ci": (low[dimensions + number], high[dimensions + number])})
+    return results, len(outputs)
+
+
+def morris_design(trajectories, dimensions, levels=4, skip=1):
+    """
+    trajectories paths of dimensions + 1 points through a grid of levels
+    per factor, each step moving one factor up by delta.  The starting
+    points come from the Sobol sequence and the order of the steps from
+    the one after.  Returns the points (trajectories, dimensions + 1,
+    dimensions), the factor each step moved and delta.
+    """
+    delta = levels / (2.0 * (levels - 1))
+    unit = sobol_points(trajectories, 2 * dimensions, skip)
+    starts = np.floor(unit[:, :dimensions] * (levels // 2)) / (levels - 1)
+    orders = np.argsort(unit[:, dimensions:], axis=1)
+    paths = np.repeat(starts[:, None, :], dimensions + 1, axis=1)
+    for step in range(dimensions):
+        moved = orders[:, step]
+        paths[np.arange(trajectories), step + 1:, moved] += delta
+    return paths, orders, delta
+
+
+def _morris_effects(outputs, orders, delta):
+    # Elementary effects (trajectories, factors), by factor
+    steps = np.diff(outputs, axis=1) / delta
+    effects = np.zeros_like(steps)
+    effects[np.arange(len(orders))[:, None], orders] = steps
+    return effects
+
+
+def _morris_statistics(effects):
+    return (np.abs(effects).mean(axis=0),)
+
+
+def morris_analysis(evaluator, factors=FACTORS, trajectories=20, levels=4,
+                    budget=None, resamples=500):
+    """
+    Morris screening of the evaluator's output: mu_star (with a bootstrap
+    interval) and sigma of every factor's elementary effects, per unit of
+    the factor's range.  Returns one dict per factor and the number of
+    trajectories used.
+    """
+    dimensions = len(factors)
+    trajectories = _affordable(trajectories, dimensions + 1, evaluator.replications, budget)
+    if trajectories < 2:
+        raise ValueError("The budget doesn't cover two trajectories")
+    paths, orders, delta = morris_design(trajectories, dimensions, levels)
+    outputs = evaluator.evaluate([scale(path, factors) for path in paths])
+    if len(outputs) < 2:
+        raise RuntimeError("Ran out of time before two trajectories were done")
+
+    effects = _morris_effects(outputs, orders[:len(outputs)], delta)
+    mu_star = np.abs(effects).mean(axis=0)
+    sigma = effects.std(axis=0, ddof=1)
+    low, high = bootstrap(_morris_statistics, effects, resamples)
+    results = []
+    for number, factor in enumerate(factors):
+        results.append({"factor": factor[0], "mu_star": mu_star[number],
+                        "mu_star_ci": (low[number], high[number]),
+                        "sigma": sigma[number]})
+    return results, len(outputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Which knob moves a KPI most, by Sobol indices or Morris screening")
+    parser.add_argument("--method", choices=("sobol", "morris"), default="morris")
+    parser.add_argument("--output", default="abandon_rate",
+                        help="KPI to explain (a headlessSim.summarize key)")
+    parser.add_argument("--samples", type=int, default=64,
+                        help="Sobol base samples, a power of two")
+    parser.add_argument("--trajectories", type=int, default=20)
+    parser.add_argument("--levels", type=int, default=4)
+    parser.add_argument("--hours", type=float, default=4)
+    parser.add_argument("--replications", type=int, default=1)
+    parser.add_argument("--budget", type=int, default=None, help="most runs to use")
+    parser.add_argument("--deadline", type=float, default=None, help="most seconds to use")
+    parser.add_argument("--store", default="runs.sqlite", help="run cache")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    store = RunStore(args.store)
+    evaluator = Evaluator(store, args.output, args.hours * 3600, args.replications,
+                          args.seed, args.processes, args.deadline)
+    start = time.time()
+    if args.method == "sobol":
+        results, used = sobol_analysis(evaluator, samples=args.samples, budget=args.budget)
+        print("%-16s %8s %18s %8s %18s" % ("factor", "first", "95% CI", "total", "95% CI"))
+        for row in results:
+            print("%-16s %8.3f [%7.3f, %7.3f] %8.3f [%7.3f, %7.3f]" % (
+                row["factor"], row["first"], row["first_ci"][0], row["first_ci"][1],
+                row["total"], row["total_ci"][0], row["total_ci"][1]))
+        print("%d base samples" % used)
+    else:
+        results, used = morris_analysis(evaluator, trajectories=args.trajectories,
+                                        levels=args.levels, budget=args.budget)
+        print("%-16s %8s %18s %8s" % ("factor", "mu_star", "95% CI", "sigma"))
+        for row in sorted(results, key=lambda row: -row["mu_star"]):
+            print("%-16s %8.3f [%7.3f, %7.3f] %8.3f" % (
+                row["factor"], row["mu_star"], row["mu_star_ci"][0],
+                row["mu_star_ci"][1], row["sigma"]))
+        print("%d trajectories" % used)
+    print("%d runs asked of the store in %.1f s" % (evaluator.runs, time.time() - start))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
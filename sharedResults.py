@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Nov 11 10:03:47 2026
+
+@author: DavidCreech
+
+Collects the results of many replications in shared memory instead of
+sending them back to the parent through the pool's pipes.
+
+A SharedResults block has a fixed layout: one row of KPI_FIELDS per run
+(float64) and one row of wait time histogram bins per run (int64).  Every
+worker writes its run's row in place and only the run number goes back over
+the pipe, so the parent doesn't unpickle anything however much a run
+produces.  The parent's kpis and waits are NumPy arrays over the same
+memory, and summary() reduces them without copying.
+
+The block is a multiprocessing.shared_memory.SharedMemory where there is one
+(Python 3.8+), which workers started by spawning attach to by name.
+Otherwise it is an anonymous shared mmap, which workers get by being forked
+from the parent.
+
+    python sharedResults.py --runs 200      # against pickled results
+"""
+import mmap
+import time
+import argparse
+import multiprocessing
+
+import numpy as np
+
+from headlessSim import run_headless, run_many, summarize
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+KPI_FIELDS = ("sim_time", "customers", "served", "abandoned", "abandon_rate",
+              "wait_mean", "wait_p95", "in_store", "utilization", "returns")
+WAIT_BIN = 5.0 # Seconds per bin
+WAIT_BINS = 121 # The last one holds everything from 600 s up
+
+_results = None # The block a pool worker writes to
+
+
+class SharedResults(object):
+    def __init__(self, runs, bins=WAIT_BINS, name=None):
+        self.runs = runs
+        self.bins = bins
+        self.kpi_bytes = runs * len(KPI_FIELDS) * 8
+        size = max(1, self.kpi_bytes + runs * bins * 8)
+        if shared_memory is not None:
+            if name is None:
+                self.block = shared_memory.SharedMemory(create=True, size=size)
+                self.owner = True
+            else:
+                self.block = shared_memory.SharedMemory(name=name)
+                self.owner = False
+            buffer = self.block.buf
+        else:
+            self.block = mmap.mmap(-1, size)
+            self.owner = True
+            buffer = self.block
+        self.kpis = np.ndarray((runs, len(KPI_FIELDS)), np.float64, buffer)
+        self.waits = np.ndarray((runs, bins), np.int64, buffer, self.kpi_bytes)
+        self.written = np.zeros(runs, dtype=bool) # The parent's own record
+
+    def __getstate__(self):
+        # Only ever pickled to hand to spawned workers, who attach by name
+        if shared_memory is None:
+            raise TypeError("Without shared_memory the workers must be forked")
+        return {"runs": self.runs, "bins": self.bins, "name": self.block.name}
+
+    def __setstate__(self, state):
+        self.__init__(state["runs"], state["bins"], state["name"])
+
+    def write(self, run, kpis, wait_times):
+        self.kpis[run] = [kpis[field] for field in KPI_FIELDS]
+        bins = np.minimum(np.asarray(wait_times, dtype=float) // WAIT_BIN,
+                          self.bins - 1).astype(np.int64)
+        self.waits[run] = np.bincount(bins, minlength=self.bins)
+
+    def column(self, field):
+        return self.kpis[:, KPI_FIELDS.index(field)]
+
+    def wait_percentile(self, q):
+        # Over every run's customers together, to the bin
+        pooled = self.waits.sum(axis=0)
+        total = pooled.sum()
+        if not total:
+            return 0.0
+        rank = np.searchsorted(np.cumsum(pooled), q / 100.0 * total)
+        return min(rank, self.bins - 1) * WAIT_BIN
+
+    def summary(self):
+        """Mean and standard deviation of each KPI across the runs."""
+        means = self.kpis.mean(axis=0)
+        spreads = self.kpis.std(axis=0)
+        summary = dict((field, (means[i], spreads[i]))
+                       for i, field in enumerate(KPI_FIELDS))
+        summary["pooled_wait_p95"] = (self.wait_percentile(95), 0.0)
+        return summary
+
+    def close(self):
+        # Views have to go before the memory under them does
+        self.kpis = self.waits = None
+        self.block.close()
+        if self.owner and shared_memory is not None:
+            self.block.unlink()
+
+
+def _attach(results):
+    global _results
+    _results = results
+
+
+def _run_shared(job):
+    run, config = job
+
+    def record(dlr):
+        _results.write(run, summarize(dlr), dlr.wait_times)
+
+    run_headless(result=record, **config)
+    return run
+
+
+def run_many_shared(configs, processes=None):
+    """
+    Runs every configuration (a dict of run_headless arguments) like
+    headlessSim.run_many, with the results in a SharedResults in the same
+    order.  The caller closes it when done.
+    """
+    results = SharedResults(len(configs))
+    jobs = list(enumerate(configs))
+    if processes == 1 or len(configs) <= 1:
+        _attach(results)
+        done = [_run_shared(job) for job in jobs]
+    else:
+        pool = multiprocessing.Pool(processes, _attach, (results,))
+        try:
+            done = pool.map(_run_shared, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    results.written[done] = True
+    return results
+
+
+def _with_waits(dlr):
+    kpis = summarize(dlr)
+    kpis["wait_times"] = dlr.wait_times
+    return kpis
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time replications returned through shared memory against pickling")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--hours", type=float, default=2)
+    parser.add_argument("--salespeople", type=int, default=3)
+    parser.add_argument("--arrival-chance", type=float, default=0.5)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    configs = [dict(duration=args.hours * 3600, seed=seed, pooled=True,
+                    salesPeople_count=args.salespeople,
+                    arrival_chance=args.arrival_chance)
+               for seed in range(args.runs)]
+
+    start = time.time()
+    pickled = run_many([dict(config, result=_with_waits) for config in configs],
+                       args.processes)
+    took = time.time() - start
+    waits = sum(len(kpis["wait_times"]) for kpis in pickled)
+    print("pickled %.1f s (%d wait times sent back)" % (took, waits))
+
+    start = time.time()
+    results = run_many_shared(configs, args.processes)
+    took = time.time() - start
+    print("shared  %.1f s (%d runs written)" % (took, results.written.sum()))
+    summary = results.summary()
+    for field in sorted(summary):
+        print("  %-16s %10.3f +- %.3f" % ((field,) + summary[field]))
+    results.close()
+
+
+if __name__ == "__main__":
+    main()
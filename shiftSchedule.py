@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+
+@author: DavidCreech
+
+Shift scheduling for salespeople.
+
+A roster is a list of Shifts, one per salesperson.  The ShiftScheduler hires
+a salesperson for every shift and puts their clock in / clock out times on
+the dealership's event queue, so nobody has to poll the clock to find out
+whether they should be working.
+"""
+from Dealership import DAY
+from SalesPerson import newVehicleSalesPerson
+
+HOUR = 60 * 60
+
+
+class Shift(object):
+    """
+    A daily shift.  All times are seconds after midnight and the shift repeats
+    every day of the run.
+    """
+    def __init__(self, name, start, end, breaks=(), lunch=None, wage=20.0):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.breaks = list(breaks) # (start, end) pairs, paid
+        self.lunch = lunch         # (start, end) pair, unpaid
+        self.wage = wage           # Per paid hour
+
+    def working_periods(self):
+        # Splits the shift into the (clock in, clock out) periods between
+        #  breaks and lunch
+        time_off = sorted(self.breaks + ([self.lunch] if self.lunch else []))
+        periods = []
+        clock_in = self.start
+        for off_start, off_end in time_off:
+            if off_start > clock_in:
+                periods.append((clock_in, off_start))
+            clock_in = max(clock_in, off_end)
+        if self.end > clock_in:
+            periods.append((clock_in, self.end))
+        return periods
+
+    def paid_hours(self):
+        hours = (self.end - self.start) / float(HOUR)
+        if self.lunch:
+            hours -= (self.lunch[1] - self.lunch[0]) / float(HOUR)
+        return hours
+
+    def cost(self):
+        # Cost of working this shift for one day
+        return self.paid_hours() * self.wage
+
+    def covers(self, time_of_day):
+        return self.start <= time_of_day < self.end
+
+    def __repr__(self):
+        return "Shift(%r, %02d:%02d-%02d:%02d)" % (self.name,
+            self.start // HOUR, self.start % HOUR // 60,
+            self.end // HOUR, self.end % HOUR // 60)
+
+
+class ShiftScheduler(object):
+    """
+    Hires one salesperson per shift in the roster and schedules their shift
+    changes on the dealership's event queue for the given number of days.
+    """
+    def __init__(self, dealership, roster, days=1):
+        self.dealership = dealership
+        self.roster = roster
+        self.days = days
+        self.staff = [] # (shift, salesperson) pairs
+
+    def start(self):
+        for shift in self.roster:
+            salesPerson = newVehicleSalesPerson(self.dealership, "image")
+            salesPerson.on_duty = False
+            salesPerson.brain.set_state("off_duty")
+            self.dealership.add_salesPerson(salesPerson)
+            self.staff.append((shift, salesPerson))
+
+            for day in range(self.days):
+                for clock_in, clock_out in shift.working_periods():
+                    self.dealership.schedule_event(day * DAY + clock_in,
+                                                   salesPerson.clock_in)
+                    self.dealership.schedule_event(day * DAY + clock_out,
+                                                   salesPerson.clock_out)
+
+    def cost(self):
+        return roster_cost(self.roster, self.days)
+
+
+def roster_cost(roster, days=1):
+    return sum(shift.cost() for shift in roster) * days
+
+
+def covers_hours(roster, open_hours, resolution=15 * 60):
+    # Checks that someone is scheduled at every point the store is open.
+    #  Breaks are ignored, this is only a quick filter for obviously
+    #  understaffed rosters
+    opening, closing = open_hours
+    for time_of_day in range(opening, closing, resolution):
+        if not any(shift.covers(time_of_day) for shift in roster):
+            return False
+    return True
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 29 08:55:02 2026
+
+@author: DavidCreech
+
+Uniform grid spatial hash over a FloorPlan.
+
+The floor is cut into square buckets of cells and every tracked agent sits in
+the bucket of its position.  Moving an agent only touches the hash when it
+crosses into another bucket, and "who is near here" looks at the buckets
+around a point instead of at everyone in the building.
+
+Distances are Manhattan distances on the grid.  Walls can make the walk
+longer, but on a showroom floor that is close enough for choosing who to
+send, and it keeps every query free of path finding.
+"""
+
+
+class SpatialHash(object):
+    def __init__(self, floor, bucket=4):
+        self.floor = floor
+        self.bucket = bucket
+        self.buckets = {} # (bucket column, bucket row) -> set of agents
+        self.where = {}   # agent -> bucket key, None until it has a position
+
+    def key(self, position):
+        if position is None:
+            return None
+        column, row = self.floor.coords(position)
+        return column // self.bucket, row // self.bucket
+
+    def insert(self, agent):
+        key = self.key(agent.position)
+        self.where[agent] = key
+        if key is not None:
+            self.buckets.setdefault(key, set()).add(agent)
+
+    def remove(self, agent):
+        key = self.where.pop(agent, None)
+        if key is not None:
+            members = self.buckets[key]
+            members.discard(agent)
+            if not members:
+                del self.buckets[key]
+
+    def move(self, agent):
+        # Call after an agent's position changes, ignored for untracked agents
+        if agent not in self.where:
+            return
+        key = self.key(agent.position)
+        if key != self.where[agent]:
+            self.remove(agent)
+            self.insert(agent)
+
+    def update(self, agent):
+        # Adds an agent that isn't tracked yet, otherwise same as move
+        if agent in self.where:
+            self.move(agent)
+        else:
+            self.insert(agent)
+
+    def __len__(self):
+        return len(self.where)
+
+    def distance(self, position, agent):
+        column, row = self.floor.coords(position)
+        other_column, other_row = self.floor.coords(agent.position)
+        return abs(column - other_column) + abs(row - other_row)
+
+    def _ring(self, center, radius):
+        # Bucket keys exactly radius buckets away (Chebyshev) from center
+        column, row = center
+        if radius == 0:
+            yield center
+            return
+        for dc in range(-radius, radius + 1):
+            yield column + dc, row - radius
+            yield column + dc, row + radius
+        for dr in range(-radius + 1, radius):
+            yield column - radius, row + dr
+            yield column + radius, row + dr
+
+    def nearest(self, position, accept=None, max_distance=None):
+        """
+        The closest tracked agent that accept(agent) likes, or None.  Rings
+        of buckets are searched outward and the search stops as soon as no
+        unseen bucket can hold anyone as close.  Agents the same distance
+        away go by lowest id, buckets are sets so their order would change
+        from run to run.
+        """
+        if not self.buckets:
+            return None
+        center = self.key(position)
+        rings = max(self.floor.width, self.floor.height) // self.bucket + 1
+        best, best_distance = None, None
+        for radius in range(rings + 1):
+            # Anyone in this ring or beyond is at least this far away
+            closest_possible = max(0, (radius - 1) * self.bucket + 1)
+            if best is not None and best_distance < closest_possible:
+                break
+            if max_distance is not None and closest_possible > max_distance:
+                break
+            for key in self._ring(center, radius):
+                for agent in self.buckets.get(key, ()):
+                    distance = self.distance(position, agent)
+                    if max_distance is not None and distance > max_distance:
+                        continue
+                    if best is not None and (distance > best_distance or
+                                             distance == best_distance and
+                                             agent.id >= best.id):
+                        continue
+                    if accept is None or accept(agent):
+                        best, best_distance = agent, distance
+        return best
+
+    def within(self, position, radius):
+        """Every tracked agent within radius cells of position, by id."""
+        column, row = self.floor.coords(position)
+        low_column, low_row = self.key(self.floor.cell(max(0, column - radius),
+                                                       max(0, row - radius)))
+        high_column = (column + radius) // self.bucket
+        high_row = (row + radius) // self.bucket
+        found = []
+        for bucket_column in range(low_column, high_column + 1):
+            for bucket_row in range(low_row, high_row + 1):
+                for agent in self.buckets.get((bucket_column, bucket_row), ()):
+                    if self.distance(position, agent) <= radius:
+                        found.append(agent)
+        found.sort(key=lambda agent: agent.id)
+        return found
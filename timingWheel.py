@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Nov  2 09:20:17 2026
+
+@author: DavidCreech
+
+Hierarchical timing wheel for timers that are far out and numerous, like a
+CRM full of customers who might come back some day.
+
+Time is cut into ticks.  Level 0 has a slot for each of the next SLOTS
+ticks, level 1 a slot for each of the next SLOTS blocks of SLOTS ticks, and
+so on.  A timer goes in the lowest level whose span reaches its tick, and
+when the clock rolls over a block the block's slot one level up is poured
+down into the finer level below.  Scheduling appends to one slot, cancelling
+flags the timer (it is dropped when its slot comes up) and expiring pops a
+slot, so none of them depend on how many timers are waiting, unlike the
+log n of a heap.
+
+Timers due in the same tick fire in the order they were scheduled.
+
+    python timingWheel.py --timers 1000000      # wheel against a heap
+    python timingWheel.py --check               # against a sorted list
+"""
+import time
+import heapq
+import random
+import argparse
+import itertools
+
+BITS = 6           # log2 of the slots per level
+SLOTS = 1 << BITS
+MASK = SLOTS - 1
+LEVELS = 5         # 64^5 ticks, about 34 years of one second ticks
+
+
+class Timer(object):
+    __slots__ = ("tick", "action", "args", "cancelled")
+
+    def __init__(self, tick, action, args):
+        self.tick = tick
+        self.action = action
+        self.args = args
+        self.cancelled = False
+
+
+class TimingWheel(object):
+    def __init__(self, resolution=1.0, start=0.0):
+        self.resolution = resolution # Seconds per tick
+        self.now = int(start // resolution) # Last tick that was processed
+        self.wheels = [[[] for slot in range(SLOTS)] for level in range(LEVELS)]
+        self.counts = [0] * LEVELS # Entries per level, cancelled ones included
+        self.overflow = [] # Past the last level, sorted out as time gets close
+        self.ready = []    # Due by now but not fired yet
+        self.live = 0
+
+    def __len__(self):
+        return self.live
+
+    def schedule(self, when, action, *args):
+        """Runs action(*args) once the wheel reaches when (seconds).  Returns the Timer."""
+        timer = Timer(int(-(-when // self.resolution)), action, args)
+        self._place(timer)
+        self.live += 1
+        return timer
+
+    def cancel(self, timer):
+        if not timer.cancelled:
+            timer.cancelled = True
+            self.live -= 1
+
+    def _place(self, timer):
+        tick = timer.tick
+        if tick <= self.now:
+            self.ready.append(timer)
+            return
+        # The lowest level whose current block also holds the timer's tick
+        for level in range(LEVELS):
+            shift = BITS * (level + 1)
+            if tick >> shift == self.now >> shift:
+                self.wheels[level][(tick >> (BITS * level)) & MASK].append(timer)
+                self.counts[level] += 1
+                return
+        self.overflow.append(timer)
+
+    def _cascade(self):
+        # Called as self.now enters a new tick.  Any level whose block just
+        #  started pours its slot for that block down a level, top first
+        for level in range(LEVELS - 1, 0, -1):
+            if self.now & ((1 << (BITS * level)) - 1):
+                continue
+            if level == LEVELS - 1 and self.overflow:
+                waiting, self.overflow = self.overflow, []
+                for timer in waiting:
+                    if not timer.cancelled:
+                        self._place(timer)
+            index = (self.now >> (BITS * level)) & MASK
+            slot = self.wheels[level][index]
+            if slot:
+                self.wheels[level][index] = []
+                self.counts[level] -= len(slot)
+                for timer in slot:
+                    if not timer.cancelled:
+                        self._place(timer)
+
+    def _fire_ready(self):
+        # Timers can schedule more timers for now, so keep going until empty
+        while self.ready:
+            ready, self.ready = self.ready, []
+            for timer in ready:
+                if not timer.cancelled:
+                    timer.cancelled = True
+                    self.live -= 1
+                    timer.action(*timer.args)
+
+    def advance(self, until):
+        """Fires every timer due by until (seconds), earliest first."""
+        target = int(until // self.resolution)
+        self._fire_ready()
+        while self.now < target:
+            # Skip ahead over stretches where nothing can be due: with the 
+            #  finest levels empty, the next thing that can happen is the 
+            #  start of the next block of the lowest level holding anything
+            level = 0
+            while level < LEVELS and not self.counts[level]:
+                level += 1
+            if level == LEVELS and not self.overflow:
+                self.now = target
+                break
+            if level:
+                shift = BITS * level
+                self.now = min(target, (((self.now >> shift) + 1) << shift) - 1)
+                if self.now == target:
+                    break
+            self.now += 1
+            self._cascade()
+            slot = self.wheels[0][self.now & MASK]
+            if slot:
+                self.wheels[0][self.now & MASK] = []
+                self.counts[0] -= len(slot)
+                self.ready.extend(slot)
+            self._fire_ready()
+
+
+def benchmark(timers=1000000, horizon=90 * 24 * 60 * 60, cancel=0.3, seed=0,
+              resolution=60.0):
+    """
+    Seconds to schedule timers spread over horizon, cancel a share of them
+    and run the clock to the end a minute at a time, with the wheel and with
+    a heap that cancels by flagging.  Both fire the same timers.
+    """
+    rng = random.Random(seed)
+    times = [rng.uniform(0, horizon) for timer in range(timers)]
+    cancelled = set(rng.sample(range(timers), int(timers * cancel)))
+    fired = [0]
+
+    def fire():
+        fired[0] += 1
+
+    start = time.time()
+    wheel = TimingWheel(resolution)
+    handles = [wheel.schedule(when, fire) for when in times]
+    for number in cancelled:
+        wheel.cancel(handles[number])
+    step = 60.0
+    clock = 0.0
+    while clock < horizon:
+        clock += step
+        wheel.advance(clock)
+    wheel_time = time.time() - start
+    wheel_fired = fired[0]
+
+    fired[0] = 0
+    start = time.time()
+    heap = []
+    entries = []
+    for number, when in enumerate(times):
+        entry = [when, number, fire, False]
+        heapq.heappush(heap, entry)
+        entries.append(entry)
+    for number in cancelled:
+        entries[number][3] = True
+    clock = 0.0
+    while clock < horizon:
+        clock += step
+        while heap and heap[0][0] <= clock:
+            entry = heapq.heappop(heap)
+            if not entry[3]:
+                entry[2]()
+    heap_time = time.time() - start
+    return wheel_time, wheel_fired, heap_time, fired[0]
+
+
+def check(runs=300, timers=60, seed=0):
+    """
+    Drives wheels with random timers (some past due, some far enough out
+    to overflow every level), random cancels and random clock steps, where
+    firing timers schedule and cancel others.  What fired, on which tick
+    and in what order is compared with a sorted list of due ticks: every
+    live timer fires exactly once, on max(its tick, the tick it was
+    scheduled on), by tick and then in the order scheduled.  Raises
+    AssertionError on the first difference, returns the timers checked.
+    """
+    rng = random.Random(seed)
+    checked = 0
+    for run in range(runs):
+        resolution = rng.choice((1.0, 0.25, 60.0))
+        wheel = TimingWheel(resolution, rng.uniform(0, 10000))
+        clock = [wheel.now] # The tick the reference is on
+        due = {}            # Timer number -> tick it should fire on
+        handles = {}
+        fired = []          # (wheel tick, timer number) as they fire
+        numbers = itertools.count()
+
+        def schedule():
+            span = rng.choice((0, 1, 2, SLOTS, SLOTS ** 2, SLOTS ** 3, SLOTS ** 5))
+            ticks = rng.uniform(-3, span) if span != SLOTS ** 5 else span * rng.uniform(1, 2)
+            when = (clock[0] + ticks) * resolution
+            number = next(numbers)
+            handles[number] = wheel.schedule(when, fire, number)
+            due[number] = max(int(-(-when // resolution)), clock[0])
+
+        def cancel():
+            number = rng.choice(list(handles))
+            wheel.cancel(handles[number])
+            if number in due and due[number] >= clock[0] and \
+                    (due[number], number) not in fired_set():
+                del due[number]
+
+        def fired_set():
+            return set((tick, number) for tick, number in fired)
+
+        def fire(number):
+            fired.append((wheel.now, number))
+            clock[0] = due[number]
+            if rng.random() < 0.2:
+                schedule()
+            if rng.random() < 0.1:
+                cancel()
+
+        for timer in range(timers):
+            schedule()
+        for timer in range(timers // 4):
+            cancel()
+        steps = 0
+        while True:
+            last = max(due.values()) if due else clock[0]
+            if clock[0] >= last:
+                break
+            step = rng.choice((1, 3, SLOTS, SLOTS ** 2 + 5, SLOTS ** 4))
+            target = min(last, clock[0] + rng.randint(1, step))
+            wheel.advance(target * resolution)
+            clock[0] = target
+            steps += 1
+            if steps < 40 and rng.random() < 0.3:
+                schedule()
+        expected = sorted((tick, number) for number, tick in due.items())
+        assert fired == expected, "run %d: fired %r, expected %r" % (
+            run, fired[:10], expected[:10])
+        assert len(wheel) == 0, "run %d: %d timers left" % (run, len(wheel))
+        checked += len(handles)
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the timing wheel against a heap")
+    parser.add_argument("--timers", type=int, default=1000000)
+    parser.add_argument("--days", type=float, default=90)
+    parser.add_argument("--resolution", type=float, default=60.0,
+                        help="seconds per wheel tick")
+    parser.add_argument("--check", action="store_true",
+                        help="compare the wheel with a sorted list instead")
+    args = parser.parse_args()
+    if args.check:
+        print("%d timers fired exactly once and on time" % check())
+        return
+    wheel_time, wheel_fired, heap_time, heap_fired = benchmark(
+        args.timers, args.days * 24 * 60 * 60, resolution=args.resolution)
+    print("wheel %.2f s (%d fired)" % (wheel_time, wheel_fired))
+    print("heap  %.2f s (%d fired)" % (heap_time, heap_fired))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Nov  3 09:31:44 2026
+
+@author: DavidCreech
+
+Replays real arrivals from a traffic counter or CRM export instead of rolling
+for them.
+
+A trace is a CSV (with a header) or JSON Lines file, optionally gzipped, with
+one walk-in per row.  The "time" column is either seconds into the
+simulation or a timestamp like 2026-05-01 09:13:22, in which case time zero
+is midnight of the first row's day.  make, model, trim, color and
+max_price, when present, become the customer's preferences.
+
+The file is never loaded whole.  It is read a chunk of lines at a time and
+pushed through a chain of generators (lines -> records -> timed visits ->
+time order -> preferences) that hold one record at a time plus a small reordering window,
+so a trace of any length replays in the same memory.
+
+    python traceArrivals.py --make-trace 1000000 trace.csv.gz
+    python traceArrivals.py trace.csv.gz --salespeople 4
+"""
+import csv
+import gzip
+import json
+import time
+import heapq
+import random
+import argparse
+import calendar
+import itertools
+from datetime import datetime
+
+PREFERENCE_FIELDS = ("make", "model", "trim", "color", "max_price")
+TIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S",
+                "%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S.%f")
+_DAY = 24 * 60 * 60
+
+
+def read_chunks(path, chunk_bytes=1 << 20):
+    """Lists of lines, about chunk_bytes at a time."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt") as trace:
+        while True:
+            lines = trace.readlines(chunk_bytes)
+            if not lines:
+                return
+            yield lines
+
+
+def parse_records(path, chunks):
+    """One dict per row of the trace."""
+    lines = itertools.chain.from_iterable(chunks)
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith(".jsonl") or name.endswith(".json"):
+        for line in lines:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        for record in csv.DictReader(lines):
+            yield record
+
+
+def parse_time(value):
+    # Seconds as a number, or epoch seconds (and True) for a timestamp
+    try:
+        return float(value), False
+    except ValueError:
+        pass
+    for time_format in TIME_FORMATS:
+        try:
+            stamp = datetime.strptime(value.strip(), time_format)
+        except ValueError:
+            continue
+        return calendar.timegm(stamp.timetuple()) + stamp.microsecond / 1e6, True
+    raise ValueError("Can't read arrival time %r" % (value,))
+
+
+def timed(records, time_field="time"):
+    """(simulated seconds, record) for each record."""
+    origin = None
+    for record in records:
+        when, is_stamp = parse_time(record[time_field])
+        if is_stamp:
+            if origin is None:
+                origin = when - when % _DAY
+            when -= origin
+        yield when, record
+
+
+def in_order(visits, slack=300.0):
+    """
+    Visits in time order, allowing rows to be up to slack seconds out of
+    order in the file.  Anything later than that is an error in the trace.
+    """
+    window = []
+    count = 0
+    released = None
+    for when, record in visits:
+        if released is not None and when < released:
+            raise ValueError("Arrival at %.0f s is more than %.0f s out of order"
+                             % (when, slack))
+        heapq.heappush(window, (when, count, record))
+        count += 1
+        while window[0][0] < when - slack:
+            released, number, early = heapq.heappop(window)
+            yield released, early
+    while window:
+        released, number, early = heapq.heappop(window)
+        yield released, early
+
+
+def with_preferences(visits):
+    """Adds the customer's Preferences (or None) to each record."""
+    for when, record in visits:
+        record["preferences"] = preferences(record)
+        yield when, record
+
+
+def visits(path, chunk_bytes=1 << 20, slack=300.0, time_field="time"):
+    """The whole pipeline: (simulated seconds, record) in time order."""
+    records = parse_records(path, read_chunks(path, chunk_bytes))
+    return with_preferences(in_order(timed(records, time_field), slack))
+
+
+def preferences(record):
+    # The customer's preferences if the trace says anything about them
+    wanted = dict((field, record[field]) for field in PREFERENCE_FIELDS
+                  if record.get(field) not in (None, ""))
+    if not wanted:
+        return None
+    from inventory import Preferences # Needs NumPy
+    if "max_price" in wanted:
+        wanted["max_price"] = float(wanted["max_price"])
+    return Preferences(**wanted)
+
+
+class TraceArrivals(object):
+    """
+    Where a Dealership's walk-ins come from when it has an arrival_source.
+    due() hands over the visits that have happened by a given time.
+    """
+    def __init__(self, path, start=0.0, **options):
+        self.path = path
+        self.upcoming = visits(path, **options)
+        self.next = None
+        self.arrived = 0
+        self.done = False
+        self._pull()
+        # Rows before the run starts are skipped
+        while self.next is not None and self.next[0] < start:
+            self._pull()
+
+    def _pull(self):
+        self.next = next(self.upcoming, None)
+        if self.next is None:
+            self.done = True
+
+    def due(self, time_passed):
+        arrivals = []
+        while self.next is not None and self.next[0] <= time_passed:
+            arrivals.append(self.next[1])
+            self._pull()
+        self.arrived += len(arrivals)
+        return arrivals
+
+
+def make_trace(path, count, arrival_chance=0.2, seed=0):
+    """Writes a made up trace of count walk-ins, a few of them out of order."""
+    rng = random.Random(seed)
+    opener = gzip.open if path.endswith(".gz") else open
+    start = calendar.timegm((2026, 5, 1, 0, 0, 0))
+    clock = 0.0
+    with opener(path, "wt") as trace:
+        writer = csv.writer(trace)
+        writer.writerow(("time", "make", "max_price"))
+        for number in range(count):
+            clock += rng.expovariate(arrival_chance)
+            jitter = rng.uniform(-60, 0) if rng.random() < 0.05 else 0
+            stamp = datetime.utcfromtimestamp(start + max(0.0, clock + jitter))
+            make = rng.choice(("Ford", "Toyota", "Honda", "")) # "" for no preference
+            writer.writerow((stamp.strftime("%Y-%m-%d %H:%M:%S"), make,
+                             rng.choice(("", "30000", "40000")) if make else ""))
+
+
+def main():
+    from headlessSim import build_dealership, advance, summarize, muted
+    from memoryReport import rss_bytes
+
+    parser = argparse.ArgumentParser(description="Replay arrivals from a trace file")
+    parser.add_argument("trace")
+    parser.add_argument("--make-trace", type=int, default=None,
+                        help="write a made up trace with this many arrivals first")
+    parser.add_argument("--salespeople", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.make_trace:
+        make_trace(args.trace, args.make_trace)
+        print("Wrote %d arrivals to %s" % (args.make_trace, args.trace))
+        return
+
+    random.seed(args.seed)
+    start = time.time()
+    with muted():
+        dlr = build_dealership(args.salespeople, pooled=True, trace=args.trace)
+        peak = rss_bytes()
+        while not dlr.arrival_source.done:
+            advance(dlr, dlr.elapsedTime + 3600)
+            peak = max(peak, rss_bytes())
+    took = time.time() - start
+    kpis = summarize(dlr)
+    for name in sorted(kpis):
+        print("%-14s %s" % (name, kpis[name]))
+    print("%d arrivals in %.1f s, peak RSS %.1f MB"
+          % (dlr.arrival_source.arrived, took, peak / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Nov 18 09:55:32 2026
+
+@author: DavidCreech
+
+Profiling for the pygame windows (dealershipSim.py and
+dealershipSim_NewUI.py, see their --profile option).
+
+The windows' main loops mark which part of a frame they are in with
+Phases.phase (the sim step, the UI update, rendering, waiting for the next
+frame), so a session's wall time can be split between them.  A
+SessionProfiler runs cProfile on the main thread for the usual pstats file,
+and a sampler thread that looks at the main thread's stack every few
+milliseconds and counts each stack under the phase it was in.  The counts
+are written as collapsed stacks ("phase;outer;...;inner count" lines),
+which flamegraph.pl or speedscope turn into a flame graph.  The sampler
+alone ("sample") costs far less than cProfile and still gives the phases
+and the flame graph, just no pstats.
+
+    python dealershipSim.py --profile 5
+    python dealershipSim_NewUI.py --profile 5 --profiler sample
+"""
+from __future__ import print_function
+
+import os
+import sys
+import pstats
+import cProfile
+import threading
+from timeit import default_timer
+
+try:
+    from thread import get_ident
+except ImportError:
+    from threading import get_ident
+
+OTHER = "other" # Phase of anything outside a marked part of the frame
+
+
+class _Phase(object):
+    # Marks one named part of a frame, for use in a with statement.  Time in
+    #  a phase inside another counts for the inner one only
+    def __init__(self, phases, name):
+        self.phases = phases
+        self.name = name
+        self.outer = None
+
+    def __enter__(self):
+        phases = self.phases
+        phases.charge()
+        self.outer = phases.current
+        phases.current = self.name
+
+    def __exit__(self, kind, value, traceback):
+        phases = self.phases
+        phases.charge()
+        phases.current = self.outer
+        return False
+
+
+class Phases(object):
+    """Wall time spent in each named part of a frame."""
+    def __init__(self, clock=default_timer):
+        self.clock = clock
+        self.current = None # What the main loop is doing right now
+        self.mark = clock() # Since when
+        self.totals = {}
+        self._phases = {}
+
+    def phase(self, name):
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def charge(self):
+        # Adds the time since the last change to the current phase
+        now = self.clock()
+        if self.current is not None:
+            self.totals[self.current] = (self.totals.get(self.current, 0.0)
+                                         + now - self.mark)
+        self.mark = now
+
+
+class SessionProfiler(object):
+    def __init__(self, phases, mode="cprofile", interval=0.005):
+        if mode not in ("cprofile", "sample"):
+            raise ValueError("mode is cprofile or sample, not %r" % mode)
+        self.phases = phases
+        self.mode = mode
+        self.interval = interval
+        self.profile = cProfile.Profile() if mode == "cprofile" else None
+        self.samples = {} # Collapsed stack -> times seen
+        self.thread_id = None
+        self.stopped = threading.Event()
+        self.sampler = None
+        self.started = 0.0
+        self.took = 0.0
+
+    def start(self):
+        # Call from the thread to profile (the main loop's)
+        self.thread_id = get_ident()
+        self.started = default_timer()
+        self.sampler = threading.Thread(target=self._sample, name="sampler")
+        self.sampler.daemon = True
+        self.sampler.start()
+        if self.profile is not None:
+            self.profile.enable()
+
+    def stop(self):
+        if self.profile is not None:
+            self.profile.disable()
+        self.took = default_timer() - self.started
+        self.stopped.set()
+        self.sampler.join()
+
+    def _sample(self):
+        frames = sys._current_frames
+        while not self.stopped.wait(self.interval):
+            frame = frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append("%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename),
+                                             code.co_firstlineno))
+                frame = frame.f_back
+            stack.append(self.phases.current or OTHER)
+            key = ";".join(reversed(stack))
+            self.samples[key] = self.samples.get(key, 0) + 1
+
+    def write(self, prefix):
+        """Writes prefix.pstats (cProfile only) and prefix.collapsed."""
+        written = []
+        if self.profile is not None:
+            self.profile.dump_stats(prefix + ".pstats")
+            written.append(prefix + ".pstats")
+        with open(prefix + ".collapsed", "w") as collapsed:
+            for stack in sorted(self.samples):
+                collapsed.write("%s %d\n" % (stack, self.samples[stack]))
+        written.append(prefix + ".collapsed")
+        return written
+
+    def report(self, top=15, out=None):
+        out = out or sys.stdout
+        totals = dict(self.phases.totals)
+        totals[OTHER] = max(0.0, self.took - sum(totals.values()))
+        print("%-10s %9s %6s" % ("phase", "seconds", "share"), file=out)
+        for name in sorted(totals, key=lambda name: -totals[name]):
+            print("%-10s %9.3f %5.1f%%" % (name, totals[name],
+                                            100.0 * totals[name] / self.took if self.took else 0),
+                  file=out)
+        print("%d samples every %.0f ms over %.1f s" % (
+            sum(self.samples.values()), self.interval * 1000, self.took), file=out)
+        if self.profile is not None:
+            stats = pstats.Stats(self.profile, stream=out)
+            stats.sort_stats("cumulative").print_stats(top)
+
+
+def add_arguments(parser):
+    # The --profile options both windows take
+    parser.add_argument("--profile", type=float, nargs="?", const=1.0, default=None,
+                        metavar="MINUTES",
+                        help="profile this many simulated minutes (default 1) then quit")
+    parser.add_argument("--profiler", choices=("cprofile", "sample"), default="cprofile",
+                        help="cprofile also writes pstats, sample is lighter")
+    parser.add_argument("--profile-out", default=None,
+                        help="file name prefix for the results (default profile_<script>)")